@@ -0,0 +1,110 @@
+import queue
+import sys
+import threading
+import time
+from schedule import Schedule
+
+class Incumbent:
+    '''
+    Un orar mai bun decat toate cele gasite inainte in aceeasi rulare: orarul (o copie,
+    neatinsa de cautarea care continua), numarul lui de conflicte si secundele scurse de la
+    pornirea cautarii
+    '''
+
+    __slots__ = ('schedule', 'conflicts', 'elapsed')
+
+    def __init__(self, schedule: Schedule, conflicts: int, elapsed: float) -> None:
+        self.schedule = schedule
+        self.conflicts = conflicts
+        self.elapsed = elapsed
+
+class IncumbentTracker:
+    '''
+    Primeste orarele intalnite de o cautare si apeleaza callback(Incumbent) pentru fiecare
+    orar strict mai bun decat cel mai bun de pana atunci.
+
+    Cautarile primesc un tracker optional (ca Profiler in profiling.py) si il anunta doar
+    cand conflictele lor scad sub tracker.best, asa ca orarul este copiat doar la imbunatatiri
+    '''
+
+    __slots__ = ('callback', 'best', 'start_time')
+
+    def __init__(self, callback, start_time: float | None = None) -> None:
+        self.callback = callback
+        self.best = float('inf')
+        self.start_time = start_time if start_time is not None else time.time()
+
+    def offer(self, schedule: Schedule, conflicts: int) -> None:
+        if conflicts < self.best:
+            self.best = conflicts
+            self.callback(Incumbent(schedule.clone(), conflicts, time.time() - self.start_time))
+
+class IncumbentSender:
+    '''
+    Trackerul unei cautari dintr-un proces al unui pool: fiecare orar mai bun decat cele
+    trimise inainte de acelasi proces este pus (o copie a buffer-ului si conflictele) intr-o
+    coada multiprocessing, din care procesul principal il preda trackerului sau (vezi
+    receive_incumbents)
+    '''
+
+    __slots__ = ('queue', 'best')
+
+    def __init__(self, queue) -> None:
+        self.queue = queue
+        self.best = float('inf')
+
+    def offer(self, schedule: Schedule, conflicts: int) -> None:
+        if conflicts < self.best:
+            self.best = conflicts
+            self.queue.put((schedule.data[:], conflicts))
+
+def receive_incumbents(updates, incumbent: IncumbentTracker, problem, pending, poll: float = 0.05) -> None:
+    # Preda trackerului orarele trimise de procese (IncumbentSender) pana la terminarea
+    # rezultatului asincron pending al pool-ului, apoi pe cele ramase in coada
+    while True:
+        ready = pending.ready()
+        try:
+            data, conflicts = updates.get(timeout=poll) if not ready else updates.get_nowait()
+        except queue.Empty:
+            if ready:
+                return
+            continue
+        incumbent.offer(Schedule(problem, data), conflicts)
+
+def print_incumbent(incumbent: Incumbent, file=sys.stderr) -> None:
+    # O linie pentru fiecare orar mai bun, folosita de optiunea --progress din orar.py
+    print(f'[{incumbent.elapsed:8.3f}s] conflicte: {incumbent.conflicts}', file=file, flush=True)
+
+def stream_incumbents(run):
+    '''
+    Ruleaza run(callback) intr-un fir de executie separat si intoarce, pe masura ce sunt
+    gasite, orarele trimise la callback. Exceptiile din run sunt ridicate mai departe.
+
+    Cautarea continua pana la terminarea ei (sau pana la deadline), chiar daca generatorul
+    nu mai este parcurs
+    '''
+
+    incumbents = queue.Queue()
+    done = object()
+    errors = []
+
+    def target():
+        try:
+            run(incumbents.put)
+        except BaseException as error:
+            errors.append(error)
+        finally:
+            incumbents.put(done)
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+
+    while True:
+        incumbent = incumbents.get()
+        if incumbent is done:
+            break
+        yield incumbent
+
+    thread.join()
+    if errors:
+        raise errors[0]
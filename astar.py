@@ -1,8 +1,14 @@
-import copy
-from heapq import heappop, heappush
+import math
 import time
-from check_constraints import parse_interval
-import utils
+import sys
+import zlib
+from array import array
+from collections import OrderedDict
+from check_constraints import count_mandatory_conflicts
+from problem import Problem, MAX_TEACHER_HOURS
+from schedule import Schedule
+from frontier import FRONTIERS
+import render
 
 INTERVALS = 'Intervale'
 DAYS = 'Zile'
@@ -11,134 +17,442 @@ TEACHERS = 'Profesori'
 CLASSROOMS = 'Sali'
 CAPACITY = 'Capacitate'
 
-teacher_preferences = {}
-teacher_intervals_to_avoid = {}
+# Cand este activ, conflictele calculate incremental pentru fiecare succesor sunt
+# verificate prin renumararea completa a constrangerilor
+DEBUG_CONFLICTS = False
+
+# Timpul maxim de cautare, in secunde
+TIME_LIMIT = 240
+
+# Numarul implicit de stari tinute in tabelul de transpozitii al cautarii ida
+MEMORY_LIMIT = 100000
+
+# Durata estimata a salvarii unei stari retinute intr-un checkpoint, in secunde, folosita
+# pana la prima salvare masurata a cautarii, si marja adaugata duratelor masurate (care
+# variaza de la o salvare la alta)
+CHECKPOINT_STATE_TIME = 1e-5
+CHECKPOINT_MARGIN = 1.25
 
 class State:
+    __slots__ = ('problem', 'schedule', 'conflicts_number', 'fingerprint', 'cursor',
+                 'uncovered', 'remaining_classes', 'assigned', 'starved', 'teacher_free', 'subject_free',
+                 'parent_options')
+
     def __init__(
         self,
-        input_data,
-        schedule: dict | None = None,
-        teacher_assignments: dict | None = None,
-        teacher_assignments_number: dict | None = None,
-        subjects_assignments: dict | None = None,
-        conflicts: int | None = None
+        problem: Problem,
+        schedule: Schedule | None = None,
+        conflicts: int | None = None,
+        fingerprint: int | None = None,
+        cursor: int = 0,
+        counters: tuple | None = None,
+        teacher_hours: tuple | bool | None = None
     ) -> None:
 
-        self.input_data = input_data
+        self.problem = problem
+
+        # Orarul, orele profesorilor, mastile lor de ocupare si acoperirea
+        # materiilor sunt tinute in acelasi buffer (vezi schedule.py)
+        self.schedule = schedule if schedule is not None else Schedule(problem)
 
-        self.schedule = schedule if schedule is not None else\
-                        {day: {interval: {classroom: None\
-                        for classroom in input_data[CLASSROOMS]}\
-                        for interval in input_data[INTERVALS]}\
-                        for day in input_data[DAYS]}
+        # In modul canonic, sloturile de dinaintea cursorului sunt deja decise
+        self.cursor = cursor
         
         self.conflicts_number = conflicts if conflicts is not None\
                                 else self.compute_conflicts()
 
-        self.teacher_assignments = teacher_assignments if teacher_assignments is not None\
-                                else {teacher : {day : {interval : False\
-                                for interval in input_data[INTERVALS]}\
-                                for day in input_data[DAYS]} for teacher\
-                                 in input_data[TEACHERS].keys()}
-
-        self.teacher_assignments_number = teacher_assignments_number\
-                            if teacher_assignments_number is not None\
-                            else {teacher : 0  for teacher in input_data[TEACHERS].keys()}
-        
-        self.subjects_assignments = subjects_assignments if subjects_assignments is not None\
-                                    else {subject : 0 for subject in input_data[SUBJECTS]}
+        # Amprenta Zobrist a orarului, actualizata prin XOR la fiecare asignare
+        self.fingerprint = fingerprint if fingerprint is not None\
+                           else self.compute_fingerprint()
+
+        # Contoarele folosite de euristici: materiile neacoperite, numarul minim de clase
+        # necesare pentru a le acoperi si numarul de sloturi ocupate
+        self.uncovered, self.remaining_classes, self.assigned = counters if counters is not None\
+                                                                 else self.compute_counters()
+
+        # Contoarele euristicii teacher_hours, tinute doar cand aceasta este folosita (True
+        # le calculeaza de la zero): materiile neacoperite care au nevoie de mai multe clase
+        # decat orele libere ale profesorilor lor, orele libere ale profesorilor care predau
+        # cel putin o materie neacoperita si orele libere ale profesorilor fiecarei materii
+        if teacher_hours is True:
+            teacher_hours = self.compute_teacher_hours()
+        self.starved, self.teacher_free, self.subject_free = teacher_hours or (0, 0, None)
+
+        # Pentru succesorii generati de get_mrv_next_states: numarul variantelor fiecarei
+        # materii in parinte (lista comuna tuturor fratilor) si asignarea care a creat starea
+        self.parent_options = None
    
     def check_optional_constraints(self):
-        # Calculeaza numerul constrangerilor optionale
+        # Calculeaza numarul constrangerilor optionale
         constrangeri_incalcate = 0
+        problem = self.problem
 
-        for day, intervals in self.schedule.items():
-            for interval, classrooms in intervals.items():
-                for _, assignment in classrooms.items():
-                    if assignment:
-                        teacher_name = assignment[0]
-
-                        # Profesorul nu prefera sa predea in aceasta zi
-                        if not teacher_preferences[teacher_name].get(day, True):
-                            constrangeri_incalcate += 1 
-
-                        # Profesorul nu doreste sa predea in acest interval
-                        interval = str(interval)
-                        if interval in teacher_intervals_to_avoid[teacher_name]:
-                            constrangeri_incalcate += 1
+        for day, interval, _, teacher, _ in self.schedule.assignments():
+            constrangeri_incalcate += problem.teacher_time_conflicts[teacher][day * problem.num_intervals + interval]
         
         return constrangeri_incalcate
 
     def get_next_states(self):
         next_states = []
-        schedule = self.schedule
+        slots = self.schedule.data
 
         # Iau toate salile libere si le asignez materii si profesori
-        for day in schedule.keys():
-            for interval in schedule[day].keys():
-                for classroom in schedule[day][interval].keys():
-                    if not schedule[day][interval][classroom]:
-                        new_states = self.assign_teacher_subject(day, interval, classroom)
-                        next_states = list(next_states + new_states)
+        for slot in range(self.problem.num_slots):
+            if not slots[slot]:
+                next_states.extend(self.assign_teacher_subject(slot))
         return next_states
     
-    def assign_teacher_subject(self, day, interval, classroom):
+    def get_canonical_next_states(self):
+        # Sloturile se completeaza intr-o ordine fixa: la fiecare pas se decide doar slotul
+        # de la cursor, care primeste o asignare sau ramane gol in mod explicit. Astfel,
+        # fiecare orar se obtine pe un singur drum, nu in toate ordinile asignarilor sale.
+        # Modurile canonical si mrv cauta orare cu 0 conflicte: o asignare care aduce un
+        # conflict soft nu mai poate fi anulata pe drumul curent, deci nu o mai generez
+        if self.cursor == self.problem.num_slots:
+            return []
+
+        next_states = self.assign_teacher_subject(self.cursor, self.cursor + 1, zero_soft=True)
+        next_states.append(self.skip_child())
+
+        # Renunt la succesorii in care sloturile ramase nu mai pot acoperi o materie
+        return [state for state in next_states if state.can_cover_remaining()]
+
+    def can_cover_remaining(self):
+        # Verifica daca sloturile de dupa cursor mai au capacitatea necesara fiecarei materii
+        problem = self.problem
+        schedule = self.schedule
+        for subject in range(problem.num_subjects):
+            if schedule.coverage(subject) + problem.suffix_capacity[subject][self.cursor] < problem.students[subject]:
+                return False
+        return True
+
+    def get_mrv_next_states(self):
+        # Aleg materia neacoperita cu cele mai putine variante (slot, profesor) ramase
+        # si ramific doar dupa locul urmatoarei ei clase. Clasele unei materii se aseaza
+        # in ordinea crescatoare a sloturilor, ca sa nu apara aceeasi alegere in alta ordine
+        # Variantele sunt doar numarate pentru fiecare materie (vezi option_counts) si
+        # enumerate doar pentru materia aleasa
+        last = self.last_subject_slots()
+        counts = self.option_counts(last)
+
+        best = None
+        for subject, _ in self.get_uncovered_subjects():
+            if best is None or counts[subject] < counts[best]:
+                best = subject
+
+            # O materie fara variante face starea o fundatura
+            if not counts[subject]:
+                break
+
+        if best is None or not counts[best]:
+            return []
+
+        next_states = []
+        for slot, teacher, subject in self.subject_options(best, last[best]):
+            succ = self.child(slot, teacher, subject)
+            succ.parent_options = (counts, slot, teacher, subject)
+            next_states.append(succ)
+        return next_states
+
+    def last_subject_slots(self):
+        # Ultimul slot in care se preda fiecare materie sau -1 daca nu a fost asezata inca
+        problem = self.problem
+        slots = self.schedule.data
+        last = [-1] * problem.num_subjects
+        for slot in range(problem.num_slots):
+            if slots[slot]:
+                last[problem.assignment_subject[slots[slot]]] = slot
+        return last
+
+    def subject_options(self, subject, last):
+        # Variantele (slot, profesor) ale urmatoarei clase a materiei: sloturile goale de dupa
+        # ultima ei clasa, in sali care o pot gazdui, cu profesori disponibili fara conflicte soft
+        problem = self.problem
+        schedule = self.schedule
+        slots = schedule.data
+
+        options = []
+        for slot in range(last + 1, problem.num_slots):
+            if slots[slot] or not problem.can_host[problem.slot_classroom[slot]][subject]:
+                continue
+            time = problem.slot_time[slot]
+            for teacher in problem.subject_teachers[subject]:
+                if schedule.hours(teacher) < MAX_TEACHER_HOURS\
+                    and not schedule.is_busy(teacher, time)\
+                    and not problem.teacher_time_conflicts[teacher][time]:
+                    options.append((slot, teacher, subject))
+        return options
+
+    def option_counts(self, last):
+        # Numarul variantelor fiecarei materii neacoperite (0 pentru cele acoperite). Un
+        # succesor din get_mrv_next_states le deduce din cele ale parintelui, scazand doar
+        # variantele eliminate de asignarea lui (vezi child_option_counts)
+        if self.parent_options is None:
+            return self.compute_option_counts(last)
+
+        counts = self.child_option_counts(last)
+        if DEBUG_CONFLICTS:
+            assert counts == self.compute_option_counts(last), 'Numarul variantelor mrv gresit'
+        return counts
+
+    def compute_option_counts(self, last):
+        counts = [0] * self.problem.num_subjects
+        for subject, _ in self.get_uncovered_subjects():
+            counts[subject] = len(self.subject_options(subject, last[subject]))
+        return counts
+
+    def child_option_counts(self, last):
+        # Asignarea (slot, teacher, subject) elimina, pentru celelalte materii, variantele din
+        # slotul ei si variantele profesorului din acelasi interval (sau din toate sloturile,
+        # daca profesorul a ajuns la numarul maxim de ore); materia asezata este renumarata
+        parent_counts, slot, teacher, subject = self.parent_options
+        problem = self.problem
+        schedule = self.schedule
+        slots = schedule.data
+        time = problem.slot_time[slot]
+        classroom = problem.slot_classroom[slot]
+        full = schedule.hours(teacher) == MAX_TEACHER_HOURS
+
+        counts = list(parent_counts)
+        for other in range(problem.num_subjects):
+            if other == subject or not parent_counts[other]:
+                continue
+
+            removed = 0
+            if slot > last[other] and problem.can_host[classroom][other]:
+                for candidate in problem.subject_teachers[other]:
+                    if candidate == teacher or (schedule.hours(candidate) < MAX_TEACHER_HOURS
+                                                and not schedule.is_busy(candidate, time)
+                                                and not problem.teacher_time_conflicts[candidate][time]):
+                        removed += 1
+
+            if problem.can_teach[teacher][other]:
+                if full:
+                    other_slots = range(last[other] + 1, problem.num_slots)
+                else:
+                    other_slots = range(max(time * problem.num_classrooms, last[other] + 1),
+                                        (time + 1) * problem.num_classrooms)
+                for other_slot in other_slots:
+                    other_time = problem.slot_time[other_slot]
+                    if other_slot != slot and not slots[other_slot]\
+                        and problem.can_host[problem.slot_classroom[other_slot]][other]\
+                        and (other_time == time or not schedule.is_busy(teacher, other_time))\
+                        and not problem.teacher_time_conflicts[teacher][other_time]:
+                        removed += 1
+
+            counts[other] = parent_counts[other] - removed
+
+        covered = schedule.coverage(subject) >= problem.students[subject]
+        counts[subject] = 0 if covered else len(self.subject_options(subject, last[subject]))
+        return counts
+
+    def assign_teacher_subject(self, slot, cursor=None, zero_soft=False):
         states = []
-        teachers = self.input_data[TEACHERS]
-        classrooms = self.input_data[CLASSROOMS]
+        problem = self.problem
+        schedule = self.schedule
+        classroom = problem.slot_classroom[slot]
+        time = problem.slot_time[slot]
 
         # Parcurg materiile neacoperite inca si care se pot preda in classroom
         uncovered_subjects = self.get_uncovered_subjects()
         for subject, _ in uncovered_subjects:
             # Iau profesorii disponibili in acea zi, care nu au deja 7 cursuri planificate si care pot preda materia
-            if subject in classrooms[classroom][SUBJECTS]:
-                for teacher in teachers.keys():
-                    if subject in teachers[teacher][SUBJECTS]\
-                        and self.teacher_assignments_number[teacher] < 7\
-                        and (not self.teacher_assignments[teacher][day][interval]):
-                            
-                            # Actualizez orarul
-                            new_schedule = copy.deepcopy(self.schedule)
-                            new_schedule[day][interval][classroom] = (teacher, subject)
-
-                            # Asigenz profesorul in ziua si intervalul alese
-                            new_teacher_assignments = copy.deepcopy(self.teacher_assignments)
-                            new_teacher_assignments[teacher][day][interval] = True
-
-                            # Cresc numarul de ore pentru care e asignat profesorul
-                            new_teacher_assignments_number = copy.deepcopy(self.teacher_assignments_number)
-                            new_teacher_assignments_number[teacher] = self.teacher_assignments_number[teacher] + 1
-
-                            # Actualizez acoperirea materiei
-                            new_subjects_assignments = copy.deepcopy(self.subjects_assignments)
-                            new_subjects_assignments[subject] = self.subjects_assignments[subject] + classrooms[classroom][CAPACITY]
-
-                            new_state = State(self.input_data, new_schedule, new_teacher_assignments, new_teacher_assignments_number, new_subjects_assignments)
-                            
-                            states.append(new_state)
+            if problem.can_host[classroom][subject]:
+                for teacher in problem.subject_teachers[subject]:
+                    if schedule.hours(teacher) < MAX_TEACHER_HOURS\
+                        and not schedule.is_busy(teacher, time)\
+                        and not (zero_soft and problem.teacher_time_conflicts[teacher][time]):
+
+                            states.append(self.child(slot, teacher, subject, cursor))
                     
         return states
 
+    def child(self, slot, teacher, subject, cursor=None):
+        # Succesorul obtinut prin asezarea (profesor, materie) in slotul gol dat; conflictele lui
+        # se deduc din cele ale parintelui, fara a reevalua tot orarul
+        conflicts = self.conflicts_number + self.assignment_delta(slot, teacher, subject)
+
+        cursor = self.cursor if cursor is None else cursor
+        fingerprint = self.fingerprint ^ self.problem.zobrist_key(slot, self.problem.assignment_id(teacher, subject))\
+                      ^ self.cursor_key(self.cursor) ^ self.cursor_key(cursor)
+
+        # Actualizez contoarele euristicilor doar pentru materia asezata
+        problem = self.problem
+        students_left = problem.students[subject] - self.schedule.coverage(subject)
+        new_students_left = students_left - problem.capacity[problem.slot_classroom[slot]]
+        uncovered = self.uncovered - (students_left > 0 >= new_students_left)
+        remaining_classes = self.remaining_classes - problem.classes_needed(subject, students_left)\
+                            + problem.classes_needed(subject, new_students_left)
+        counters = (uncovered, remaining_classes, self.assigned + 1)
+
+        # Copiez buffer-ul orarului si asignez profesorul si materia in slot
+        new_schedule = self.schedule.clone()
+        new_schedule.assign(slot, teacher, subject)
+        teacher_hours = self.child_teacher_hours(new_schedule, teacher, subject)\
+                        if self.subject_free is not None else None
+        new_state = State(problem, new_schedule, conflicts, fingerprint, cursor, counters, teacher_hours)
+
+        if DEBUG_CONFLICTS:
+            full_conflicts = new_state.compute_conflicts()
+            assert conflicts == full_conflicts,\
+                f'Conflicte incrementale {conflicts} != conflicte recalculate {full_conflicts}'
+            assert fingerprint == new_state.compute_fingerprint(), 'Amprenta incrementala gresita'
+            assert counters == new_state.compute_counters(), 'Contoare incrementale gresite'
+            if teacher_hours is not None:
+                assert teacher_hours == new_state.compute_teacher_hours(), 'Contoare teacher_hours gresite'
+
+        return new_state
+
+    def skip_child(self):
+        # Succesorul in care slotul de la cursor ramane gol; orarul nu se modifica,
+        # asa ca buffer-ul poate fi impartit cu parintele
+        fingerprint = self.fingerprint ^ self.cursor_key(self.cursor) ^ self.cursor_key(self.cursor + 1)
+        return State(self.problem, self.schedule, self.conflicts_number, fingerprint, self.cursor + 1,
+                     (self.uncovered, self.remaining_classes, self.assigned), self.teacher_hours())
+
+    def cursor_key(self, cursor):
+        # Cheia Zobrist a pozitiei cursorului (0 pentru cursorul initial), ca starile cu acelasi
+        # orar dar cu sloturi decise diferit sa fie distincte; slotul num_slots nu exista in orar
+        return self.problem.zobrist_key(self.problem.num_slots, cursor) if cursor else 0
+
+    def assignment_delta(self, slot, teacher, subject):
+        # Diferenta de conflicte produsa de asezarea (profesor, materie) intr-un slot gol,
+        # calculata din contoarele de ore, ocupare si acoperire tinute in orar
+        problem = self.problem
+        schedule = self.schedule
+        classroom = problem.slot_classroom[slot]
+        time = problem.slot_time[slot]
+
+        # Conflictele soft ale profesorului in ziua si intervalul slotului
+        delta = problem.teacher_time_conflicts[teacher][time]
+
+        # Profesorul preda deja in acelasi interval
+        if schedule.is_busy(teacher, time):
+            delta += 1
+
+        # Materia nu se preda in sala sau profesorul nu preda materia
+        if not problem.can_host[classroom][subject]:
+            delta += 1
+        if not problem.can_teach[teacher][subject]:
+            delta += 1
+
+        # Profesorul trece de 7 sloturi
+        if schedule.hours(teacher) == MAX_TEACHER_HOURS:
+            delta += 1
+
+        # Materia isi atinge acoperirea necesara
+        coverage = schedule.coverage(subject)
+        if coverage < problem.students[subject] <= coverage + problem.capacity[classroom]:
+            delta -= 1
+
+        return delta
+
+    def compute_fingerprint(self):
+        # Amprenta Zobrist calculata de la zero (sloturile goale au cheia 0)
+        fingerprint = self.cursor_key(self.cursor)
+        slots = self.schedule.data
+        for slot in range(self.problem.num_slots):
+            if slots[slot]:
+                fingerprint ^= self.problem.zobrist_key(slot, slots[slot])
+        return fingerprint
+
+    def compute_counters(self):
+        # Contoarele euristicilor calculate de la zero
+        problem = self.problem
+        uncovered, remaining_classes = 0, 0
+        for subject in range(problem.num_subjects):
+            students_left = problem.students[subject] - self.schedule.coverage(subject)
+            if students_left > 0:
+                uncovered += 1
+                remaining_classes += problem.classes_needed(subject, students_left)
+        return uncovered, remaining_classes, problem.num_slots - self.schedule.empty_slots()
+
+    def teacher_hours(self):
+        # Contoarele teacher_hours, pentru copiile starii (None daca nu sunt tinute)
+        if self.subject_free is None:
+            return None
+        return self.starved, self.teacher_free, self.subject_free
+
+    def compute_teacher_hours(self):
+        # Contoarele teacher_hours calculate de la zero
+        problem = self.problem
+        schedule = self.schedule
+        subject_free = tuple(sum(MAX_TEACHER_HOURS - schedule.hours(teacher) for teacher in problem.subject_teachers[subject])
+                             for subject in range(problem.num_subjects))
+        starved = sum(self.subject_needed(schedule, subject) > max(subject_free[subject], 0)
+                      for subject in range(problem.num_subjects))
+        teacher_free = sum(self.teacher_free_hours(schedule, teacher) for teacher in range(problem.num_teachers))
+        return starved, teacher_free, subject_free
+
+    def child_teacher_hours(self, new_schedule, teacher, subject):
+        # Contoarele teacher_hours ale succesorului in care profesorul preda materia: orele
+        # libere scad doar pentru materiile profesorului, clasele necesare se schimba doar
+        # pentru materia asezata, iar daca aceasta a fost acoperita, profesorii ei pot iesi
+        # din suma orelor libere
+        problem = self.problem
+        schedule = self.schedule
+        can_teach = problem.can_teach[teacher]
+        subject_free = list(self.subject_free)
+        starved = self.starved
+
+        for other in problem.teacher_subjects[teacher] if can_teach[subject] else problem.teacher_subjects[teacher] + [subject]:
+            needed = self.subject_needed(schedule, other)
+            starved -= needed > max(subject_free[other], 0)
+            if can_teach[other]:
+                subject_free[other] -= 1
+            if other == subject:
+                needed = self.subject_needed(new_schedule, other)
+            starved += needed > max(subject_free[other], 0)
+
+        teachers = [teacher]
+        if schedule.coverage(subject) < problem.students[subject] <= new_schedule.coverage(subject):
+            teachers.extend(other for other in problem.subject_teachers[subject] if other != teacher)
+        teacher_free = self.teacher_free
+        for other in teachers:
+            teacher_free += self.teacher_free_hours(new_schedule, other) - self.teacher_free_hours(schedule, other)
+        return starved, teacher_free, tuple(subject_free)
+
+    def subject_needed(self, schedule, subject):
+        # Numarul minim de clase care mai trebuie asezate pentru materie (0 daca este acoperita)
+        return self.problem.classes_needed(subject, self.problem.students[subject] - schedule.coverage(subject))
+
+    def teacher_free_hours(self, schedule, teacher):
+        # Orele libere ale profesorului, daca preda cel putin o materie neacoperita, altfel 0
+        problem = self.problem
+        for subject in problem.teacher_subjects[teacher]:
+            if schedule.coverage(subject) < problem.students[subject]:
+                return MAX_TEACHER_HOURS - schedule.hours(teacher)
+        return 0
+
+    def violations(self):
+        # Conflictele care nu tin de acoperire; asignarile din A* nu le mai pot elimina,
+        # deci o stare cu violari nu poate ajunge la un orar fara conflicte
+        return self.conflicts_number - self.uncovered
+
     def compute_conflicts(self):
          # Calculez numarul total de conflcite incalcate
-        return check_mandatory_constraints(self.schedule, self.input_data) +  self.check_optional_constraints()
+        return count_mandatory_conflicts(self.problem, self.schedule.assignments()) +  self.check_optional_constraints()
 
     def is_final(self):
         # Starea finala are 0 conflicte
         return self.conflicts_number == 0
 
     def clone(self):
-        return State(self.input_data, copy.deepcopy(self.schedule), self.conflicts_number, copy.deepcopy(self.teacher_assignments))
+        return State(self.problem, self.schedule.clone(), self.conflicts_number, self.fingerprint, self.cursor,
+                     (self.uncovered, self.remaining_classes, self.assigned), self.teacher_hours())
     
     def display(self):
-        print(self.schedule)
+        print(self.to_timetable())
+
+    def to_timetable(self):
+        # Orarul cu numele din fisierul de intrare, pentru afisare
+        return self.schedule.to_timetable()
 
     def get_uncovered_subjects(self):
         # Extrage din lista materiilor, pe cele care nu au fost acoperite in totalitate
         uncovered_subjects = []
-        for subject in self.input_data[SUBJECTS]:
-            difference = self.input_data[SUBJECTS][subject] - self.subjects_assignments[subject]
+        for subject in range(self.problem.num_subjects):
+            difference = self.problem.students[subject] - self.schedule.coverage(subject)
             if difference > 0:
                 # Salvez numarul de studenti pe care mai trebuie sa ii
                 # plasez in clase pt fiecare materie
@@ -150,121 +464,212 @@ class State:
         return sorted_uncovered_subjects
 
     def get_empty_classrooms(self):
-        # Calculeaza numarul de sali goale din orar
-        cnt = 0
-        for day in self.input_data[DAYS]:
-            for interval in self.input_data[INTERVALS]:
-                for classroom in self.input_data[CLASSROOMS]:
-                    if not self.schedule[day][interval][classroom]:
-                        cnt += 1
-        return cnt
+        # Calculeaza numarul de sali goale din orar care mai pot primi o clasa; in modul
+        # canonic acestea sunt sloturile de dupa cursor
+        if self.cursor:
+            return self.problem.num_slots - self.cursor
+        return self.problem.num_slots - self.assigned
     
     def __lt__(self, other):
-        return self.conflicts_number - other.conflicts_number
+        return self.conflicts_number < other.conflicts_number
 
     def __hash__(self):
-        # Convertesc orarul la un tuplu de tupluri
-        schedule_tuples = tuple((day, tuple((interval, tuple(classroom.items())) for interval, classroom in day_schedule.items())) for day, day_schedule in self.schedule.items())
-        return hash(schedule_tuples)
-
-def initialize_teacher_preferences(input_data):
-    global teacher_preferences
-    global teacher_intervals_to_avoid
-
-    # Parcurg preferintele fiecarui profesor
-    for teacher, details in input_data[TEACHERS].items():
-        teacher_preferences[teacher] = {}
-        teacher_intervals_to_avoid[teacher] = []
-        for const in details['Constrangeri']:
-            if const[0] != '!':
-                # Salvez zilele in care prefera sa predea
-                if const in input_data[DAYS]:
-                    teacher_preferences[teacher][const] = True
-            else:
-                const = const[1:]
-                # Salvez zilele in care prefera sa nu predea
-                if const in input_data[DAYS]:
-                    day = const
-                    teacher_preferences[teacher][day] = False
-                elif '-' in const:
-                    # Fac o lista cu intervalele in care prefera sa nu predea
-                    interval = parse_interval(const)
-                    if interval[0] != interval[1] - 2:
-                        intervals = [(i, i + 2) for i in range(interval[0], interval[1], 2)]
-                        for interval in intervals:
-                            teacher_intervals_to_avoid[teacher].append(str(interval))
-                    else:
-                        teacher_intervals_to_avoid[teacher].append(str(interval))
-
-def check_mandatory_constraints(timetable, timetable_specs):
-        # Functie de verificare a constrangerilor obligatorii din utils.py, din care am sters mesajele printate
-        constrangeri_incalcate = 0
-
-        acoperire_target = timetable_specs[SUBJECTS]
-        
-        acoperire_reala = {subject : 0 for subject in acoperire_target}
+        return self.fingerprint
 
-        ore_profesori = {prof : 0 for prof in timetable_specs[TEACHERS]}
+    def __eq__(self, other):
+        # Doua stari sunt egale daca au acelasi orar; amprenta elimina rapid majoritatea
+        # perechilor diferite, iar comparatia buffer-elor confirma egalitatea
+        return self.fingerprint == other.fingerprint and self.cursor == other.cursor\
+               and self.schedule.data == other.schedule.data
 
-        for day in timetable:
-            for interval in timetable[day]:
-                profs_in_crt_interval = []
-                for room in timetable[day][interval]:
-                    if timetable[day][interval][room]:
-                        prof, subject = timetable[day][interval][room]
-                        acoperire_reala[subject] += timetable_specs[CLASSROOMS][room]['Capacitate']
+class ClosedKey:
+    '''
+    O stare din lista closed a unei cautari reluate dintr-un checkpoint: se pastreaza doar
+    amprenta Zobrist si cursorul, nu si orarul, asa ca egalitatea cu o stare noua se
+    decide doar dupa amprenta (pe 64 de biti)
+    '''
 
-                        # PROFESORUL PREDĂ 2 MATERII ÎN ACELAȘI INTERVAL
-                        if prof in profs_in_crt_interval:
-                            constrangeri_incalcate += 1
-                        else:
-                            profs_in_crt_interval.append(prof)
+    __slots__ = ('fingerprint', 'cursor')
 
-                        # MATERIA NU SE PREDA IN SALA
-                        if subject not in timetable_specs[CLASSROOMS][room][SUBJECTS]:
-                            constrangeri_incalcate += 1
+    def __init__(self, fingerprint: int, cursor: int) -> None:
+        self.fingerprint = fingerprint
+        self.cursor = cursor
 
-                        # PROFESORUL NU PREDA MATERIA
-                        if subject not in timetable_specs[TEACHERS][prof][SUBJECTS]:
-                            constrangeri_incalcate += 1
-
-                        ore_profesori[prof] += 1
-
-        # CONDITIA DE ACOPERIRE
-        for subject in acoperire_target:
-            if acoperire_reala[subject] < acoperire_target[subject]:
-                constrangeri_incalcate += 1
-
-        # CONDITIA DE MAXIM 7 ORE PE SĂPTĂMÂNĂ
-        for prof in ore_profesori:
-            if ore_profesori[prof] > 7:
-                constrangeri_incalcate += 1
-
-        return constrangeri_incalcate
+    def __hash__(self):
+        return self.fingerprint
+
+    def __eq__(self, other):
+        return self.fingerprint == other.fingerprint and self.cursor == other.cursor
+
+def pack_states(states):
+    # Starile intr-un format compact: buffer-ele orarelor, puse cap la cap si comprimate,
+    # si cate un array pentru conflicte, amprente, cursoare si contoarele euristicilor
+    schedules = b''.join([state.schedule.data for state in states])
+    conflicts = array('i', [state.conflicts_number for state in states])
+    fingerprints = array('Q', [state.fingerprint for state in states])
+    cursors = array('i', [state.cursor for state in states])
+    counters = array('i', [value for state in states
+                           for value in (state.uncovered, state.remaining_classes, state.assigned)])
+    return zlib.compress(schedules, 1), conflicts, fingerprints, cursors, counters
+
+def unpack_states(problem, packed, teacher_hours=False):
+    # Operatia inversa lui pack_states; contoarele teacher_hours nu sunt salvate, ci se
+    # recalculeaza daca euristica le foloseste
+    data, conflicts, fingerprints, cursors, counters = packed
+    schedules = array('i')
+    schedules.frombytes(zlib.decompress(data))
+    size = problem.schedule_size
+    return [State(problem, Schedule(problem, schedules[index * size:(index + 1) * size]), conflicts[index],
+                  fingerprints[index], cursors[index], tuple(counters[3 * index:3 * index + 3]), teacher_hours or None)
+            for index in range(len(conflicts))]
+
+def astar_checkpoint(open_list, discovered, best):
+    # Starea cautarii A*: nodurile frontierei, in ordinea extragerii, cu f si cheia lor, si
+    # din lista closed doar amprentele, cursoarele si costurile g
+    entries = list(open_list.entries())
+    return {
+        'f': array('i', [f for f, _, _ in entries]),
+        'keys': array('i', [key for _, key, _ in entries]),
+        'frontier': pack_states([state for _, _, state in entries]),
+        'closed': (array('Q', [state.fingerprint for state in discovered]),
+                   array('i', [state.cursor for state in discovered]),
+                   array('i', discovered.values())),
+        'best': pack_states([best]),
+    }
+
+def checkpoint_cost(checkpoint, states, saved_states):
+    # Durata estimata a unei salvari cu states stari retinute: ultima salvare masurata (si
+    # cea a rularii anterioare, dupa reluare), scalata cu numarul de stari retinute de atunci
+    if checkpoint.save_time:
+        return CHECKPOINT_MARGIN * checkpoint.save_time * states / saved_states
+    return CHECKPOINT_STATE_TIME * states
+
+def restore_astar(problem, checkpoint, open_list, teacher_hours=False):
+    # Reface frontiera si lista closed dintr-un checkpoint; intoarce lista closed si cea
+    # mai buna stare
+    states = unpack_states(problem, checkpoint['frontier'], teacher_hours)
+    for f, key, state in zip(checkpoint['f'], checkpoint['keys'], states):
+        open_list.push(f, key, state)
+
+    fingerprints, cursors, costs = checkpoint['closed']
+    discovered = {ClosedKey(fingerprint, cursor): g for fingerprint, cursor, g in zip(fingerprints, cursors, costs)}
+    return discovered, unpack_states(problem, checkpoint['best'], teacher_hours)[0]
+
+# Cheia secundara din frontiera la cost_f egal: intai nodurile mai adanci (depth)
+# sau cele cu euristica mai mica (h); la egalitate, ordinea inserarii
+TIE_BREAKS = {
+    'depth': lambda g, h_value, max_depth: max_depth - g,
+    'h': lambda g, h_value, max_depth: h_value,
+}
 
 def heuristic(state):
-    return state.conflicts_number +  len(state.get_uncovered_subjects()) * state.get_empty_classrooms()
-
-def astar(start, h, start_time):
-    # Lista open in care adaug tupluri (cost_f, nod)
-    frontier = []
-    heappush(frontier, (0 + h(start), start))
-
-    # Lista closed in care salvez costul pana la nod
-    discovered = {start: (0)}
+    return state.conflicts_number +  state.uncovered * state.get_empty_classrooms()
+
+def capacity_heuristic(state):
+    # Numarul minim de clase care mai trebuie asezate: pentru fiecare materie, studentii
+    # ramasi impartiti la capacitatea celei mai mari sali eligibile, plus violarile
+    return state.remaining_classes + state.violations()
+
+def teacher_hours_heuristic(state):
+    # Marginea de capacitate, la care se adauga verificarea orelor libere ale profesorilor:
+    # daca o materie (sau toate materiile neacoperite la un loc) are nevoie de mai multe
+    # clase decat orele ramase ale profesorilor care o pot preda, starea este o fundatura
+    # (contoarele starved si teacher_free, tinute incremental de starile create cu
+    # teacher_hours, vezi COUNTED_HEURISTICS)
+    h = capacity_heuristic(state)
+    starved, teacher_free, _ = state.teacher_hours() or state.compute_teacher_hours()
+    if starved or state.remaining_classes > teacher_free:
+        return h + dead_end_penalty(state.problem)
+    return h
+
+def dead_end_penalty(problem):
+    # Penalizarea unei stari din care nu se mai poate ajunge la un orar valid: mai mare decat
+    # orice numar de asignari ramase, dar suficient de mica pentru cozile pe bucket-uri
+    return problem.num_slots + 1
+
+# Euristicile disponibile; capacity si teacher_hours nu supraestimeaza numarul de asignari
+# ramase pana la un orar fara conflicte (o stare cu violari nu mai poate ajunge la unul)
+HEURISTICS = {
+    'default': heuristic,
+    'capacity': capacity_heuristic,
+    'teacher_hours': teacher_hours_heuristic,
+}
+ADMISSIBLE_HEURISTICS = {'capacity', 'teacher_hours'}
+
+# Euristicile care folosesc contoarele teacher_hours; starile initiale ale cautarilor cu
+# aceste euristici le tin incremental (vezi State.child_teacher_hours)
+COUNTED_HEURISTICS = {'teacher_hours'}
+
+def get_heuristic(name='default', weight=1.0):
+    # Intoarce euristica aleasa, inmultita cu factorul weighted A* (weight > 1 renunta la
+    # optimalitate in schimbul unei cautari mai rapide); valorile raman intregi
+    h = HEURISTICS[name]
+    if weight == 1:
+        return h
+    return lambda state: math.ceil(weight * h(state))
+
+# Generatoarele de succesori: toate asignarile din toate sloturile goale (all), completarea
+# sloturilor in ordine fixa (canonical) sau materia cea mai constransa intai (mrv)
+SUCCESSORS = {
+    'all': State.get_next_states,
+    'canonical': State.get_canonical_next_states,
+    'mrv': State.get_mrv_next_states,
+}
+
+def astar(start, h, start_time, frontier='bucket', tie_break='depth', successors='all', time_limit=TIME_LIMIT,
+          profiler=None, incumbent=None, checkpoint=None, resume=None):
+    # Lista open: o coada de prioritati dupa cost_f, cu o cheie secundara pentru
+    # departajarea nodurilor cu acelasi cost_f (vezi frontier.py)
+    open_list = FRONTIERS[frontier]()
+    push, pop = open_list.push, open_list.pop
+    secondary_key = TIE_BREAKS[tie_break]
+    get_next_states = SUCCESSORS[successors]
+    max_depth = start.problem.num_slots
+
+    # Cu profilare, fazele cautarii sunt cronometrate; restul timpului (lista closed,
+    # adica __hash__ si __eq__ ale starilor, si testul starii finale) apare ca other
+    if profiler is not None:
+        push = profiler.timed('frontier_push', push)
+        pop = profiler.timed('frontier_pop', pop)
+        h = profiler.timed('heuristic', h)
+        get_next_states = profiler.timed('successors', get_next_states)
+
+    if resume is None:
+        start_h = h(start)
+        push(0 + start_h, secondary_key(0, start_h, max_depth), start)
+
+        # Lista closed in care salvez costul pana la nod
+        discovered = {start: (0)}
+
+        # Nodul extras cu cele mai putine conflicte, intors daca timpul se termina inainte de
+        # gasirea unei stari finale
+        best = start
+    else:
+        # Continui cautarea salvata intr-un checkpoint
+        discovered, best = restore_astar(start.problem, resume, open_list, start.subject_free is not None)
+    if incumbent is not None:
+        incumbent.offer(best.schedule, best.conflicts_number)
+
+    # Timpul rezervat pentru salvarea finala a checkpoint-ului
+    reserve, saved_states = 0.0, len(discovered)
     
-    while frontier:
+    while open_list:
         # Extrag primul nod din frontiera
-        node = heappop(frontier)[1]
+        node = pop()
 
         # Calculez costul nodului curent
         node_g = discovered[node]
 
+        if node.conflicts_number < best.conflicts_number:
+            best = node
+            if incumbent is not None:
+                incumbent.offer(best.schedule, best.conflicts_number)
+
         # Daca este final, opresc cautarea
         if node.is_final():
           break
 
-        next_states = node.get_next_states()
+        next_states = get_next_states(node)
         # Cautam toate starile vecine
         for succ in next_states:
             # Costul catre nodul copil este costul nodului curent + 1
@@ -273,27 +678,193 @@ def astar(start, h, start_time):
             # Daca nodul nu a fost descoperit inca sau am gasit un drum cu un cost mai bun
             if succ not in discovered or succ_g < discovered[succ]:
                 discovered[succ] = succ_g
-                heappush(frontier, (succ_g + h(succ), succ))
+                succ_h = h(succ)
+                push(succ_g + succ_h, secondary_key(succ_g, succ_h, max_depth), succ)
 
         curr_time = time.time()
-        if(curr_time - start_time > 240):
+        if checkpoint is not None:
+            # Rezerv din limita de timp durata salvarii finale
+            reserve = checkpoint_cost(checkpoint, len(discovered), saved_states)
+        if(curr_time - start_time > time_limit - reserve):
             break
 
-    return node, len(discovered.keys())
-
-def start(input_data, input_file):
-    initialize_teacher_preferences(input_data)
-
-    start_time = time.time()
-
-    init_state = State(input_data)
-
-    final_state, nr_states = astar(init_state, heuristic, start_time)
-
-    end_time = time.time()
-
-    print("Generated states " + str(nr_states))
-    print("Final state conflicts " + str(final_state.conflicts_number))
-    print("Execution time for astar:", end_time - start_time, "seconds")
+        # O salvare periodica este facuta doar daca dupa ea mai incape si salvarea finala
+        if checkpoint is not None and checkpoint.due(curr_time) and\
+                curr_time - start_time + 2 * reserve <= time_limit:
+            checkpoint.save(lambda: astar_checkpoint(open_list, discovered, best))
+            saved_states = len(discovered)
+
+    # Cautarea oprita de limita de timp poate fi continuata (de exemplu cu o limita mai
+    # mare); altfel checkpoint-ul nu mai este necesar. Dupa expirarea limitei de timp
+    # salvarea finala nu mai porneste, iar reluarea continua din ultimul checkpoint
+    if checkpoint is not None:
+        if best.is_final() or not open_list:
+            checkpoint.remove()
+        elif time.time() - start_time <= time_limit:
+            checkpoint.save(lambda: astar_checkpoint(open_list, discovered, best))
+
+    if profiler is not None:
+        profiler.count('discovered', len(discovered))
+    return best, len(discovered.keys())
+
+def ida_star(start, h, start_time, successors='all', memory_limit=MEMORY_LIMIT, time_limit=TIME_LIMIT,
+             profiler=None, incumbent=None):
+    # IDA*: cautari in adancime repetate, limitate de un prag pe cost_f. In memorie raman
+    # doar drumul curent cu fratii nodurilor de pe el si un tabel de transpozitii, in total
+    # cel mult memory_limit stari (plus cate un succesor pe fiecare nivel al drumului).
+    # Intoarce si daca spatiul a fost epuizat fara solutie intr-o iteratie incompleta din
+    # cauza limitei de memorie (memory_limited)
+    get_next_states = SUCCESSORS[successors]
+    if profiler is not None:
+        h = profiler.timed('heuristic', h)
+        get_next_states = profiler.timed('successors', get_next_states)
+
+    bound = h(start)
+    best = start
+    if incumbent is not None:
+        incumbent.offer(best.schedule, best.conflicts_number)
+    nr_states = 1
+    peak_states = 1
+
+    while True:
+        # Tabelul de transpozitii: costul g cu care a fost expandata fiecare stare in
+        # iteratia curenta; cand se umple, renunt la cea mai veche intrare
+        expanded = OrderedDict()
+        nr_expanded = 0
+
+        # Cate noduri au fost oprite de prag, pentru fiecare cost_f
+        pruned = {}
+        truncated = False
+
+        # Pe fiecare nivel, fratii neexplorati inca, sortati descrescator dupa cost_f
+        path = [[(bound, start)]]
+        retained = 1
+
+        while path:
+            siblings = path[-1]
+            if not siblings:
+                path.pop()
+                continue
+
+            node_f, node = siblings.pop()
+            retained -= 1
+            node_g = len(path) - 1
+
+            if node.conflicts_number < best.conflicts_number:
+                best = node
+                if incumbent is not None:
+                    incumbent.offer(best.schedule, best.conflicts_number)
+
+            # Daca este final, opresc cautarea
+            if node.is_final():
+                return node, nr_states, peak_states, False
+
+            if node_f > bound:
+                pruned[node_f] = pruned.get(node_f, 0) + 1
+                continue
+
+            # Starea a fost deja expandata in aceasta iteratie cu un cost mai mic sau egal
+            if expanded.get(node, math.inf) <= node_g:
+                continue
+
+            if len(expanded) >= memory_limit:
+                expanded.popitem(last=False)
+            expanded[node] = node_g
+            nr_expanded += 1
+
+            next_states = get_next_states(node)
+            nr_states += len(next_states)
+
+            # Succesorul cu cost_f minim ajunge ultimul in lista, deci este explorat primul
+            children = sorted(((node_g + 1 + h(succ), succ) for succ in next_states),
+                              key=lambda child: child[0], reverse=True)
+
+            # Daca succesorii nu mai incap in limita de memorie, eliberez intai intrari din
+            # tabelul de transpozitii, apoi renunt la succesorii cu cost_f mare (pastrez cel
+            # putin unul); iteratia nu mai este completa, deci cautarea poate rata solutia
+            room = memory_limit - retained - len(expanded)
+            while len(children) > room and expanded:
+                expanded.popitem(last=False)
+                room += 1
+            if len(children) > max(room, 1):
+                children = children[-max(room, 1):]
+                truncated = True
+
+            path.append(children)
+            retained += len(children)
+            peak_states = max(peak_states, retained + len(expanded))
+
+            if time.time() - start_time > time_limit:
+                return best, nr_states, peak_states, False
+
+        # Spatiul de cautare a fost epuizat fara un orar fara conflicte
+        if not pruned:
+            return best, nr_states, peak_states, truncated
+
+        # Noul prag este cel mai mic cost_f pentru care iteratia urmatoare trece de cel putin
+        # doua ori mai multe noduri (IDA*_CR), ca pragul sa nu creasca cu cate o unitate
+        bound = next_bound(pruned, nr_expanded)
+        if profiler is not None:
+            profiler.count('iterations')
+
+def next_bound(pruned, nr_expanded):
+    # Aleg costul f la care numarul nodurilor oprite de prag ajunge la nr_expanded
+    count = 0
+    for f in sorted(pruned):
+        count += pruned[f]
+        if count >= nr_expanded:
+            return f
+    return f
+
+def start(problem, frontier='bucket', tie_break='depth', successors='all',
+          heuristic_name='default', weight=1.0, search='astar', memory_limit=MEMORY_LIMIT, profiler=None,
+          time_limit=TIME_LIMIT, callback=None, checkpoint=None):
+    # Cautarea este cea din biblioteca (solver.run_astar); aici raman doar mesajele
+    import solver
+
+    if checkpoint is not None and search == 'ida':
+        print("Checkpoint-urile sunt disponibile doar pentru cautarea astar")
+        checkpoint = None
+    if checkpoint is not None and checkpoint.resume and not checkpoint.exists():
+        print("Nu exista niciun checkpoint; cautarea porneste de la inceput")
+
+    result = solver.solve(problem, 'astar', time_limit=time_limit, callback=callback, frontier=frontier,
+                          tie_break=tie_break, successors=successors, heuristic=heuristic_name, weight=weight,
+                          search=search, memory_limit=memory_limit, profiler=profiler, checkpoint=checkpoint)
+
+    print("Generated states " + str(result.states))
+    print("Peak retained states " + str(result.details['peak_states']))
+    if result.details['memory_limited']:
+        print("IDA* a atins limita de memorie; cautarea nu a fost completa")
+    print("Final state conflicts " + str(result.conflicts))
+    print("Execution time for astar:", checkpoint.elapsed() if checkpoint is not None else result.solve_time, "seconds")
     print("Result shedule:")
-    print(utils.pretty_print_timetable_aux_zile(final_state.schedule, input_file))
\ No newline at end of file
+    render.write_text(result.schedule, sys.stdout)
+    return result.schedule
+
+def add_arguments(parser):
+    # Optiunile liniei de comanda pentru astar (vezi orar.py)
+    parser.add_argument('--frontier', choices=sorted(FRONTIERS), default='bucket',
+                        help='Coada de prioritati folosita de astar (implicit bucket)')
+    parser.add_argument('--tie-break', choices=sorted(TIE_BREAKS), default='depth',
+                        help='Departajarea nodurilor cu acelasi cost f in astar (implicit depth)')
+    parser.add_argument('--successors', choices=sorted(SUCCESSORS), default='all',
+                        help='Generarea succesorilor in astar: all, canonical sau mrv (implicit all)')
+    parser.add_argument('--heuristic', choices=sorted(HEURISTICS), default='default',
+                        help='Euristica folosita de astar (implicit default)')
+    parser.add_argument('--weight', type=float, default=1.0,
+                        help='Factorul weighted A* cu care se inmulteste euristica (implicit 1)')
+    parser.add_argument('--search', choices=['astar', 'ida'], default='astar',
+                        help='Cautarea folosita de astar: A* clasic sau IDA* cu memorie limitata (implicit astar)')
+    parser.add_argument('--memory-limit', type=int, default=MEMORY_LIMIT,
+                        help='Numarul maxim de stari din tabelul de transpozitii al cautarii ida')
+    parser.add_argument('--time-limit', type=float, default=TIME_LIMIT,
+                        help='Timpul maxim de cautare in secunde (implicit 240)')
+    parser.add_argument('--debug', action='store_true',
+                        help='Verifica scorarea incrementala prin renumararea completa a conflictelor')
+
+def run(problem, args, profiler=None, callback=None, checkpoint=None):
+    global DEBUG_CONFLICTS
+    DEBUG_CONFLICTS = args.debug
+    return start(problem, args.frontier, args.tie_break, args.successors, args.heuristic, args.weight,
+                 args.search, args.memory_limit, profiler, args.time_limit, callback, checkpoint)
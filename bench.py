@@ -0,0 +1,162 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import solver
+
+# Intrarile si fisierele implicite ale benchmark-ului
+INPUTS = 'inputs/*.yaml'
+RESULTS_FILE = 'bench_results.json'
+BASELINE_FILE = 'bench_baseline.json'
+
+# Numarul de seed-uri si limita de timp (in secunde) a fiecarei rulari
+SEEDS = 3
+TIME_LIMIT = 30
+
+# Cat de mult pot creste timpul si memoria fata de baseline (ca fractie) si conflictele
+# medii (ca numar absolut) inainte ca diferenta sa fie semnalata ca regresie
+TIME_TOLERANCE = 0.25
+RSS_TOLERANCE = 0.25
+CONFLICTS_TOLERANCE = 0.5
+
+# Algoritmii rulati de benchmark: toti, mai putin cei care au nevoie de un orar anterior
+ALGORITHMS = [algorithm for algorithm in solver.ALGORITHMS if algorithm not in solver.WARM_START_ALGORITHMS]
+
+# Timpii foarte mici variaza mult intre rulari si nu sunt comparati
+MIN_COMPARED_TIME = 0.05
+
+def bench_run(input_file, algorithm, seed, time_limit):
+    # O rulare, intr-un proces nou, ca memoria maxima sa fie doar a acestei rulari
+    result = solver.solve(input_file, algorithm, time_limit=time_limit, seed=seed)
+
+    # Pe Linux ru_maxrss este in KB
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        'input': os.path.basename(input_file),
+        'algorithm': algorithm,
+        'seed': seed,
+        'time': result.compile_time + result.solve_time,
+        'states': result.states,
+        'iterations': result.iterations,
+        'conflicts': result.conflicts,
+        'peak_rss_mb': peak_rss,
+    }
+
+def bench_starmap(task):
+    return bench_run(*task)
+
+def summarize(runs):
+    # Mediile rularilor fiecarei perechi (intrare, algoritm)
+    groups = {}
+    for run in runs:
+        groups.setdefault(f"{run['input']}/{run['algorithm']}", []).append(run)
+
+    summary = {}
+    for key, group in groups.items():
+        conflicts = [run['conflicts'] for run in group if run['conflicts'] is not None]
+        summary[key] = {
+            'runs': len(group),
+            'time': statistics.mean(run['time'] for run in group),
+            'states': statistics.mean(run['states'] for run in group),
+            'iterations': statistics.mean(run['iterations'] for run in group),
+            'conflicts': statistics.mean(conflicts) if conflicts else None,
+            'peak_rss_mb': max(run['peak_rss_mb'] for run in group),
+        }
+    return summary
+
+def find_regressions(summary, baseline, time_tolerance=TIME_TOLERANCE, rss_tolerance=RSS_TOLERANCE,
+                     conflicts_tolerance=CONFLICTS_TOLERANCE):
+    # Diferentele fata de baseline care depasesc tolerantele, ca mesaje
+    regressions = []
+    for key, current in sorted(summary.items()):
+        if key not in baseline:
+            continue
+        previous = baseline[key]
+
+        if previous['conflicts'] is not None and (current['conflicts'] is None or
+                                                  current['conflicts'] > previous['conflicts'] + conflicts_tolerance):
+            regressions.append(f"{key}: conflicts {previous['conflicts']:.2f} -> {current['conflicts']}")
+        if max(current['time'], previous['time']) >= MIN_COMPARED_TIME\
+            and current['time'] > previous['time'] * (1 + time_tolerance):
+            regressions.append(f"{key}: time {previous['time']:.3f}s -> {current['time']:.3f}s")
+        if current['peak_rss_mb'] > previous['peak_rss_mb'] * (1 + rss_tolerance):
+            regressions.append(f"{key}: peak RSS {previous['peak_rss_mb']:.1f}MB -> {current['peak_rss_mb']:.1f}MB")
+
+    return regressions
+
+def print_summary(summary):
+    print(f"{'Input/algorithm':<40} {'Runs':>4} {'Time':>9} {'States':>12} {'Iters':>10} {'Conflicts':>9} {'RSS MB':>8}")
+    for key, row in sorted(summary.items()):
+        conflicts = f"{row['conflicts']:.2f}" if row['conflicts'] is not None else '-'
+        print(f"{key:<40} {row['runs']:>4} {row['time']:>8.3f}s {row['states']:>12.0f} {row['iterations']:>10.0f} "
+              f"{conflicts:>9} {row['peak_rss_mb']:>8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark-ul algoritmilor pe fisierele de intrare, comparat cu un baseline')
+    parser.add_argument('--inputs', nargs='+', default=sorted(glob.glob(INPUTS)),
+                        help='Fisierele yaml de intrare (implicit inputs/*.yaml)')
+    parser.add_argument('--algorithms', nargs='+', choices=sorted(ALGORITHMS), default=sorted(ALGORITHMS),
+                        help='Algoritmii rulati (implicit toti, in afara de repair)')
+    parser.add_argument('--seeds', type=int, default=SEEDS,
+                        help='Numarul de seed-uri, 0..N-1, pentru fiecare intrare si algoritm')
+    parser.add_argument('--time-limit', type=float, default=TIME_LIMIT,
+                        help='Timpul maxim al fiecarei rulari, in secunde')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Numarul de rulari simultane (timpii sunt comparabili doar cu 1)')
+    parser.add_argument('--output', default=RESULTS_FILE,
+                        help='Fisierul json in care se scriu rezultatele')
+    parser.add_argument('--baseline', default=BASELINE_FILE,
+                        help='Fisierul json cu rezultatele de referinta')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Scrie rezultatele si ca baseline, in loc sa le compare')
+    args = parser.parse_args()
+
+    config = {'inputs': [os.path.basename(input_file) for input_file in args.inputs],
+              'algorithms': args.algorithms, 'seeds': args.seeds, 'time_limit': args.time_limit}
+    tasks = [(input_file, algorithm, seed, args.time_limit)
+             for input_file in args.inputs for algorithm in args.algorithms for seed in range(args.seeds)]
+
+    # Fiecare rulare are propriul proces (maxtasksperchild=1), pentru o memorie maxima corecta
+    runs = []
+    with multiprocessing.Pool(args.jobs, maxtasksperchild=1) as pool:
+        for run in pool.imap(bench_starmap, tasks):
+            print(f"{run['input']}/{run['algorithm']} seed {run['seed']}: {run['time']:.3f}s, "
+                  f"{run['conflicts']} conflicts", file=sys.stderr)
+            runs.append(run)
+
+    summary = summarize(runs)
+    results = {'config': config, 'summary': summary, 'runs': runs}
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print_summary(summary)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline scris in {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"Nu exista baseline-ul {args.baseline}; rulati cu --update-baseline pentru a-l crea")
+        return
+
+    with open(args.baseline, 'r') as file:
+        baseline = json.load(file)
+    if baseline['config']['seeds'] != args.seeds or baseline['config']['time_limit'] != args.time_limit:
+        print(f"Atentie: baseline-ul a fost rulat cu {baseline['config']['seeds']} seed-uri si limita "
+              f"{baseline['config']['time_limit']}s")
+
+    regressions = find_regressions(summary, baseline['summary'])
+    if regressions:
+        print("Regresii fata de baseline:")
+        for regression in regressions:
+            print("  " + regression)
+        sys.exit(1)
+    print("Nicio regresie fata de baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+import math
+import random
+import sys
+import time
+import render
+from check_constraints import count_mandatory_conflicts
+from problem import Problem, MAX_TEACHER_HOURS
+from schedule import Schedule
+from construct import build_schedule
+from hill_climbing import State, random_restart_hill_climbing
+
+# Timpul maxim de cautare, in secunde
+TIME_LIMIT = 60
+
+# Conditia lui Hall se verifica pe toate submultimile de materii doar pana la acest numar
+# de materii neacoperite (2^n submultimi)
+HALL_SUBJECTS = 6
+
+# Fractia din limita de timp in care hill climbing cu restart-uri imbunatateste orarul
+# greedy initial, inainte de ramificare (se opreste mai devreme la un orar fara conflicte),
+# cu numarul de restart-uri si de iteratii ale fiecarei cautari, ca in hill_climbing.start
+LOCAL_SEARCH_SHARE = 0.1
+LOCAL_SEARCH_RESTARTS = 50
+LOCAL_SEARCH_ITERS = 100
+
+class BranchAndBound:
+    '''
+    Cautare exacta in adancime cu ramificare si marginire (branch and bound) pentru orarele
+    care respecta toate constrangerile obligatorii, minimizand conflictele soft.
+
+    Sloturile se decid in ordine cronologica: fiecare slot primeste o clasa (profesor,
+    materie) a unei materii neacoperite sau ramane gol.
+    - ocuparea profesorilor este tinuta in masti de biti pe momente, din care se verifica
+      inainte ca materiile neacoperite sa mai poata fi acoperite in sloturile ramase (si pe
+      grupuri de materii care isi impart salile si profesorii)
+    - marginea inferioara adauga costului curent costul minim al studentilor ramasi (rucsac
+      fractionar pe sloturile ramase, dupa conflictele soft), pe fiecare materie si pe toate
+      materiile la un loc
+    - salile identice (aceeasi capacitate si aceleasi materii) sunt interschimbabile in
+      acelasi moment, asa ca asignarile lor trebuie sa fie crescatoare, cu salile goale intai
+    - marginea superioara initiala este orarul greedy, imbunatatit de o cautare hill climbing
+      scurta; un orar fara conflicte gasit astfel este optim imediat (marginea inferioara
+      este 0)
+    '''
+
+    def __init__(self, problem: Problem, time_limit: float = TIME_LIMIT, incumbent=None) -> None:
+        self.problem = problem
+        self.penalty = penalty = problem.teacher_time_conflicts
+        self.time_limit = time_limit
+
+        # IncumbentTracker optional, anuntat la fiecare orar mai bun (vezi anytime.py)
+        self.incumbent = incumbent
+
+        num_times = problem.num_times
+        self.all_times = (1 << num_times) - 1
+
+        # Momentele mai mari sau egale cu un moment dat
+        self.after = [self.all_times & ~((1 << time) - 1) for time in range(num_times + 1)]
+
+        # Momentele in care fiecare profesor are 0, 1 sau 2 conflicte soft
+        self.max_penalty = max((max(row) for row in penalty), default=0)
+        self.penalty_masks = [[sum(1 << time for time in range(num_times) if penalty[teacher][time] == p)
+                               for p in range(self.max_penalty + 1)] for teacher in range(problem.num_teachers)]
+
+        # Sala identica precedenta fiecarei sali (aceeasi capacitate si aceleasi materii) sau -1
+        self.twin = []
+        for classroom in range(problem.num_classrooms):
+            twins = [other for other in range(classroom)
+                     if problem.capacity[other] == problem.capacity[classroom]
+                     and problem.can_host[other] == problem.can_host[classroom]]
+            self.twin.append(twins[-1] if twins else -1)
+
+        self.decided = [0] * problem.num_slots
+        self.teacher_busy = [0] * problem.num_teachers
+        self.hours = [0] * problem.num_teachers
+        self.coverage = [0] * problem.num_subjects
+        self.cost = 0
+        self.placed = []
+
+        # Pentru fiecare submultime de materii (masca pe biti): masca profesorilor lor si, pentru
+        # fiecare sala de inceput, sumele prefix ale capacitatilor descrescatoare ale salilor
+        # de la ea incolo care gazduiesc macar una dintre materii; calculate la prima folosire
+        self.subset_supply = {}
+
+        self.best_cost = math.inf
+        self.best = None
+        self.nodes = 0
+
+        # Inceputul cautarii, inclusiv constructia si imbunatatirea orarului initial
+        self.start_time = None
+
+        # Marginile inferioare ale nodurilor de pe drumul curent, pentru certificatul final
+        self.open_bounds = []
+
+    def set_incumbent(self, assignments, cost):
+        # Orarul cunoscut de la care porneste marginea superioara
+        self.best = list(assignments)
+        self.best_cost = cost
+        if self.incumbent is not None:
+            self.incumbent.offer(self.to_schedule(self.best), cost)
+
+    def set_greedy_incumbent(self, rng=random):
+        # Un orar construit greedy (cu departajarile generatorului rng) si imbunatatit de o
+        # cautare hill climbing scurta da marginea superioara initiala, daca respecta
+        # constrangerile obligatorii; intoarce numarul total de conflicte al orarului greedy
+        self.start_time = time.time()
+        problem = self.problem
+        initial = build_schedule(problem, rng=rng)
+        mandatory, cost = self.offer_schedule(initial)
+
+        # Orarul greedy este anuntat si cand incalca constrangeri obligatorii, ca primul
+        # orar disponibil pana la gasirea unuia valid; la fel orarele cautarii hill climbing
+        if self.incumbent is not None:
+            self.incumbent.offer(initial, mandatory + cost)
+        if mandatory + cost:
+            _, _, _, improved, _ = random_restart_hill_climbing(
+                State(problem, initial, rng=rng), LOCAL_SEARCH_RESTARTS, LOCAL_SEARCH_ITERS,
+                deadline=self.start_time + self.time_limit * LOCAL_SEARCH_SHARE, incumbent=self.incumbent)
+            self.offer_schedule(improved.schedule)
+        return mandatory + cost
+
+    def offer_schedule(self, schedule):
+        # Orarul devine marginea superioara daca respecta constrangerile obligatorii si are
+        # mai putine conflicte soft; intoarce conflictele lui obligatorii si soft
+        problem = self.problem
+        mandatory = count_mandatory_conflicts(problem, schedule.assignments())
+        placed = [(problem.slot(day, interval, classroom), teacher, subject)
+                  for day, interval, classroom, teacher, subject in schedule.assignments()]
+        cost = sum(self.penalty[teacher][problem.slot_time[slot]] for slot, teacher, _ in placed)
+        if mandatory == 0 and cost < self.best_cost:
+            self.set_incumbent(placed, cost)
+        return mandatory, cost
+
+    def teacher_free(self):
+        # Momentele libere ale fiecarui profesor care nu are deja 7 ore
+        all_times = self.all_times
+        return [~busy & all_times if hours < MAX_TEACHER_HOURS else 0
+                for busy, hours in zip(self.teacher_busy, self.hours)]
+
+    def room_free(self, cursor):
+        # Momentele ramase de decis pentru fiecare sala: cele de dupa momentul cursorului,
+        # plus momentul cursorului pentru salile care nu au fost inca decise in el
+        problem = self.problem
+        if cursor == problem.num_slots:
+            return [0] * problem.num_classrooms
+
+        time = problem.slot_time[cursor]
+        later = self.after[time + 1]
+        return [later | (1 << time) if classroom >= problem.slot_classroom[cursor] else later
+                for classroom in range(problem.num_classrooms)]
+
+    def subject_levels(self, subject, teacher_free):
+        # Momentele in care cel mai bun profesor liber al materiei are p conflicte soft,
+        # pentru fiecare p
+        seen = 0
+        levels = []
+        for p in range(self.max_penalty + 1):
+            mask = 0
+            for teacher in self.problem.subject_teachers[subject]:
+                mask |= teacher_free[teacher] & self.penalty_masks[teacher][p]
+            mask &= ~seen
+            seen |= mask
+            levels.append(mask)
+        return levels
+
+    def knapsack_bound(self, items, left):
+        # Rucsac fractionar: studentii ramasi ocupa intai sloturile cu cel mai mic cost pe
+        # student; intoarce costul minim sau None daca sloturile nu ajung
+        bound = 0
+        for _, p, capacity, count in sorted(items):
+            if left <= 0:
+                break
+            take = min(left, capacity * count)
+            bound += p * take / capacity
+            left -= take
+
+        if left > 0:
+            return None
+        return bound
+
+    def lower_bound(self, cursor):
+        # Marginea inferioara a costului oricarui orar complet care extinde nodul curent,
+        # sau None daca nodul este o fundatura
+        problem = self.problem
+        teacher_free = self.teacher_free()
+        room_free = self.room_free(cursor)
+        free_hours = [MAX_TEACHER_HOURS - hours for hours in self.hours]
+
+        # Salile difera doar prin momentul cursorului (ramas liber in salile nedecise inca),
+        # asa ca sloturile ramase se numara o singura data pe nivel de conflicte soft
+        if cursor < problem.num_slots:
+            later = self.after[problem.slot_time[cursor] + 1]
+            current = problem.slot_time[cursor]
+            first_classroom = problem.slot_classroom[cursor]
+        else:
+            later, current, first_classroom = 0, 0, problem.num_classrooms
+
+        bound = 0
+        needed_total = 0
+        teachers_needed = set()
+        uncovered = []
+        levels = {}
+
+        for subject in range(problem.num_subjects):
+            left = problem.students[subject] - self.coverage[subject]
+            needed = problem.classes_needed(subject, left)
+            if not needed:
+                continue
+            uncovered.append(subject)
+
+            # Orele libere ale profesorilor materiei trebuie sa ajunga pentru clasele ramase
+            teachers = problem.subject_teachers[subject]
+            if needed > sum(free_hours[teacher] for teacher in teachers):
+                return None
+            needed_total += needed
+            teachers_needed.update(teachers)
+
+            # Sloturile ramase ale materiei: (cost pe student, conflicte soft, capacitate, numar)
+            levels[subject] = self.subject_levels(subject, teacher_free)
+            counts = [((mask & later).bit_count(), mask >> current & 1) for mask in levels[subject]]
+            items = []
+            for classroom in problem.subject_classrooms[subject]:
+                capacity = problem.capacity[classroom]
+                undecided = classroom >= first_classroom
+                for p, (count, now) in enumerate(counts):
+                    if undecided:
+                        count += now
+                    if count:
+                        items.append((p / capacity, p, capacity, count))
+
+            subject_bound = self.knapsack_bound(items, left)
+            if subject_bound is None:
+                return None
+            bound += subject_bound
+
+        if needed_total > sum(free_hours[teacher] for teacher in teachers_needed):
+            return None
+
+        if len(uncovered) > 1:
+            # Materiile isi impart salile si profesorii: fiecare grup de materii trebuie sa
+            # incapa in clasele care se mai pot tine (conditia lui Hall pe capacitati)
+            if len(uncovered) <= HALL_SUBJECTS and not self.hall_condition(uncovered, cursor, teacher_free):
+                return None
+
+            # Marginea comuna: fiecare slot ramas primeste cel mult o clasa, cu costul celui
+            # mai bun profesor dintre materiile neacoperite pe care le gazduieste sala
+            items = []
+            for classroom in range(problem.num_classrooms):
+                hosted = [subject for subject in uncovered if problem.can_host[classroom][subject]]
+                if not hosted:
+                    continue
+                capacity = problem.capacity[classroom]
+                seen = 0
+                for p in range(self.max_penalty + 1):
+                    mask = 0
+                    for subject in hosted:
+                        mask |= levels[subject][p]
+                    mask &= room_free[classroom] & ~seen
+                    seen |= mask
+                    count = mask.bit_count()
+                    if count:
+                        items.append((p / capacity, p, capacity, count))
+
+            left = sum(problem.students[subject] - self.coverage[subject] for subject in uncovered)
+            joint_bound = self.knapsack_bound(items, left)
+            if joint_bound is None:
+                return None
+            bound = max(bound, joint_bound)
+
+        return self.cost + math.ceil(bound - 1e-9)
+
+    def hall_condition(self, uncovered, cursor, teacher_free):
+        # Pentru fiecare submultime de materii neacoperite, studentii ramasi nu depasesc
+        # capacitatea claselor care se mai pot tine: in fiecare moment, cel mult cate o clasa
+        # pentru fiecare profesor liber al acestor materii, in cele mai mari sali ramase
+        # (la momentul cursorului, doar salile nedecise inca)
+        problem = self.problem
+        if cursor == problem.num_slots:
+            return False
+        time = problem.slot_time[cursor]
+        first_classroom = problem.slot_classroom[cursor]
+
+        # Profesorii liberi (masca pe biti) in fiecare moment ramas
+        free_teachers = [0] * problem.num_times
+        for teacher, free in enumerate(teacher_free):
+            free &= self.after[time]
+            while free:
+                bit = free & -free
+                free ^= bit
+                free_teachers[bit.bit_length() - 1] |= 1 << teacher
+
+        for subset in range(1, 1 << len(uncovered)):
+            mask = 0
+            demand = 0
+            for i, subject in enumerate(uncovered):
+                if subset >> i & 1:
+                    mask |= 1 << subject
+                    demand += problem.students[subject] - self.coverage[subject]
+
+            teachers, prefixes = self.subset_data(mask)
+            current, later = prefixes[first_classroom], prefixes[0]
+            supply = current[min((free_teachers[time] & teachers).bit_count(), len(current) - 1)]
+            for other_time in range(time + 1, problem.num_times):
+                if supply >= demand:
+                    break
+                supply += later[min((free_teachers[other_time] & teachers).bit_count(), len(later) - 1)]
+
+            if demand > supply:
+                return False
+        return True
+
+    def subset_data(self, mask):
+        # Masca profesorilor si sumele prefix ale capacitatilor pentru submultimea de materii
+        # mask (vezi subset_supply)
+        data = self.subset_supply.get(mask)
+        if data is None:
+            problem = self.problem
+            chosen = [subject for subject in range(problem.num_subjects) if mask >> subject & 1]
+            teachers = 0
+            for subject in chosen:
+                for teacher in problem.subject_teachers[subject]:
+                    teachers |= 1 << teacher
+
+            prefixes = []
+            for first in range(problem.num_classrooms):
+                capacities = sorted((problem.capacity[classroom] for classroom in range(first, problem.num_classrooms)
+                                     if any(problem.can_host[classroom][subject] for subject in chosen)), reverse=True)
+                prefix = [0]
+                for capacity in capacities:
+                    prefix.append(prefix[-1] + capacity)
+                prefixes.append(prefix)
+            data = self.subset_supply[mask] = (teachers, prefixes)
+        return data
+
+    def candidates(self, cursor):
+        # Asignarile posibile ale slotului de la cursor, cele fara conflicte soft intai; la
+        # salile identice, asignarea trebuie sa fie mai mare decat cea din sala precedenta
+        problem = self.problem
+        time = problem.slot_time[cursor]
+        classroom = problem.slot_classroom[cursor]
+        bit = 1 << time
+
+        twin = self.twin[classroom]
+        minimum = self.decided[cursor - classroom + twin] if twin >= 0 else 0
+
+        candidates = []
+        for subject in problem.classroom_subjects[classroom]:
+            left = problem.students[subject] - self.coverage[subject]
+            if left <= 0:
+                continue
+            for teacher in problem.subject_teachers[subject]:
+                assignment = problem.assignment_id(teacher, subject)
+                if assignment > minimum and self.hours[teacher] < MAX_TEACHER_HOURS\
+                    and not self.teacher_busy[teacher] & bit:
+                    candidates.append((self.penalty[teacher][time], -left, assignment, teacher, subject))
+
+        candidates.sort()
+        return candidates
+
+    def place(self, cursor, teacher, subject, assignment, delta):
+        problem = self.problem
+        self.decided[cursor] = assignment
+        self.teacher_busy[teacher] |= 1 << problem.slot_time[cursor]
+        self.hours[teacher] += 1
+        self.coverage[subject] += problem.capacity[problem.slot_classroom[cursor]]
+        self.cost += delta
+        self.placed.append((cursor, teacher, subject))
+
+    def remove(self, cursor, teacher, subject, delta):
+        problem = self.problem
+        self.decided[cursor] = 0
+        self.teacher_busy[teacher] &= ~(1 << problem.slot_time[cursor])
+        self.hours[teacher] -= 1
+        self.coverage[subject] -= problem.capacity[problem.slot_classroom[cursor]]
+        self.cost -= delta
+        self.placed.pop()
+
+    def search(self, cursor):
+        # Un nod al cautarii; intoarce False daca timpul s-a terminat
+        self.nodes += 1
+        if time.time() - self.start_time > self.time_limit:
+            return False
+
+        bound = self.lower_bound(cursor)
+        if bound is None or bound >= self.best_cost:
+            return True
+
+        # Toate materiile sunt acoperite: un orar mai bun decat cel cunoscut
+        if all(self.coverage[subject] >= self.problem.students[subject] for subject in range(self.problem.num_subjects)):
+            self.set_incumbent(self.placed, self.cost)
+            return True
+
+        self.open_bounds.append(bound)
+        for delta, _, assignment, teacher, subject in self.candidates(cursor):
+            if self.cost + delta >= self.best_cost:
+                break
+            self.place(cursor, teacher, subject, assignment, delta)
+            finished = self.search(cursor + 1)
+            self.remove(cursor, teacher, subject, delta)
+            if not finished:
+                return False
+
+        # Slotul ramane gol; la salile identice, doar daca si sala precedenta a ramas goala
+        twin = self.twin[self.problem.slot_classroom[cursor]]
+        if twin < 0 or not self.decided[cursor - self.problem.slot_classroom[cursor] + twin]:
+            if not self.search(cursor + 1):
+                return False
+
+        self.open_bounds.pop()
+        return True
+
+    def solve(self):
+        '''
+        Returneaza (orarul optim sau cel mai bun gasit, costul lui, marginea inferioara
+        demonstrata, daca optimalitatea este demonstrata). Orarul este o lista de tupluri
+        (slot, profesor, materie) sau None daca nu exista niciun orar care sa respecte
+        constrangerile obligatorii.
+        '''
+
+        if self.start_time is None:
+            self.start_time = time.time()
+        root_bound = self.lower_bound(0)
+
+        # Fiecare slot decis adauga un nivel de recursie
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), self.problem.num_slots + 100))
+        finished = self.search(0)
+
+        if finished:
+            # Cautarea completa: marginea inferioara este chiar costul optim
+            lower_bound = self.best_cost
+        else:
+            # Tot ce nu a fost explorat se afla sub nodurile de pe drumul curent
+            lower_bound = min(self.open_bounds + [self.best_cost])
+            if root_bound is not None:
+                lower_bound = max(lower_bound, root_bound)
+
+        return self.best, self.best_cost, lower_bound, finished
+
+    def to_schedule(self, placed):
+        # Orarul cu clasele (slot, profesor, materie) date
+        schedule = Schedule(self.problem)
+        for slot, teacher, subject in placed:
+            schedule.assign(slot, teacher, subject)
+        return schedule
+
+def start(problem, time_limit=TIME_LIMIT, seed=None, callback=None):
+    # Cautarea este cea din biblioteca (solver.run_branch_and_bound); aici raman doar mesajele
+    import solver
+
+    result = solver.solve(problem, 'exact', time_limit=time_limit, seed=seed, callback=callback)
+
+    print("Execution time for exact:", result.solve_time, "seconds")
+    print("Explored nodes " + str(result.states))
+    if result.schedule is None:
+        if result.details['optimal']:
+            print("Nu exista niciun orar care sa respecte toate constrangerile obligatorii")
+        else:
+            print("Nu a fost gasit niciun orar valid in timpul alocat")
+        return None
+
+    print("Final state conflicts " + str(result.conflicts))
+    print("Lower bound " + str(result.details['lower_bound']))
+    print("Proven optimal " + str(result.details['optimal']))
+    print("Result shedule:")
+    render.write_text(result.schedule, sys.stdout)
+    return result.schedule
+
+def add_arguments(parser):
+    # Optiunile liniei de comanda pentru exact (vezi orar.py)
+    parser.add_argument('--time-limit', type=float, default=TIME_LIMIT,
+                        help='Timpul maxim de cautare in secunde')
+
+def run(problem, args, profiler=None, callback=None, checkpoint=None):
+    return start(problem, args.time_limit, args.seed, callback)
@@ -1,7 +1,10 @@
 import yaml
 import argparse
+import json
+import os
 import sys
 from utils import read_yaml_file, get_profs_initials, pretty_print_timetable
+from problem import compile_problem, parse_interval_key, MAX_TEACHER_HOURS
 
 
 ##################### MACROURI #####################
@@ -43,10 +46,27 @@ def parse_subject_room_prof(subject_room_prof : str, nick_to_prof : dict):
     return subject, room, prof
 
 
+def get_timetable_json(timetable_specs : dict, output_name : str):
+    '''
+    Citește orarul dintr-un fișier json scris de render.write_json (lista asignărilor), fără parsarea tabelului text
+    '''
+    timetable = {day : {parse_interval_key(interval) : {room : None for room in timetable_specs[SALI]}
+                        for interval in timetable_specs[INTERVALE]} for day in timetable_specs[ZILE]}
+
+    with open(output_name, 'r', encoding='utf-8') as file:
+        for record in json.load(file)['assignments']:
+            timetable[record['day']][parse_interval_key(record['interval'])][record['classroom']] = record['teacher'], record['subject']
+
+    return timetable
+
+
 def get_timetable(timetable_specs : dict, output_name : str, debug_flag : bool = False):
     '''
     Pe baza specificațiilor din fișierul de intrare, se reprezintă intern orarul din fișierul de ieșire.
     '''
+    if output_name.endswith('.json'):
+        return get_timetable_json(timetable_specs, output_name)
+
     timetable = {day : {eval(interval) : {} for interval in timetable_specs[INTERVALE]} for day in timetable_specs[ZILE]}
 
     _, initials_to_prof = get_profs_initials(timetable_specs[PROFESORI])
@@ -95,62 +115,73 @@ def get_timetable(timetable_specs : dict, output_name : str, debug_flag : bool =
     return timetable
 
 
-def check_mandatory_constraints(timetable : {str : {(int, int) : {str : (str, str)}}}, timetable_specs : dict):
+def count_mandatory_conflicts(problem, assignments, verbose : bool = False):
     '''
-    Se verifică dacă orarul generat respectă cerințele obligatorii pentru a fi un orar valid.
+    Se numără constrângerile obligatorii încălcate de un orar reprezentat pe modelul compilat (vezi problem.py).
+
+    assignments este un iterabil de tupluri de id-uri (zi, interval, sală, profesor, materie).
     '''
 
     constrangeri_incalcate = 0
 
-    acoperire_target = timetable_specs[MATERII]
-    
-    acoperire_reala = {subject : 0 for subject in acoperire_target}
-
-    ore_profesori = {prof : 0 for prof in timetable_specs[PROFESORI]}
-
-    for day in timetable:
-        for interval in timetable[day]:
-            profs_in_crt_interval = []
-            for room in timetable[day][interval]:
-                if timetable[day][interval][room]:
-                    prof, subject = timetable[day][interval][room]
-                    acoperire_reala[subject] += timetable_specs[SALI][room][CAPACITATE]
-
-                    # PROFESORUL PREDĂ 2 MATERII ÎN ACELAȘI INTERVAL
-                    if prof in profs_in_crt_interval:
-                        print(f'Profesorul {prof} preda 2 materii in acelasi interval!')
-                        constrangeri_incalcate += 1
-                    else:
-                        profs_in_crt_interval.append(prof)
+    acoperire_reala = [0] * problem.num_subjects
+
+    ore_profesori = [0] * problem.num_teachers
+
+    profs_in_interval = set()
 
-                    # MATERIA NU SE PREDA IN SALA
-                    if subject not in timetable_specs[SALI][room][MATERII]:
-                        print(f'Materia {subject} nu se preda în sala {room}!')
-                        constrangeri_incalcate += 1
+    for day, interval, room, prof, subject in assignments:
+        acoperire_reala[subject] += problem.capacity[room]
 
-                    # PROFESORUL NU PREDA MATERIA
-                    if subject not in timetable_specs[PROFESORI][prof][MATERII]:
-                        print(f'Profesorul {prof} nu poate preda materia {subject}!')
-                        constrangeri_incalcate += 1
+        # PROFESORUL PREDĂ 2 MATERII ÎN ACELAȘI INTERVAL
+        if (day, interval, prof) in profs_in_interval:
+            if verbose:
+                print(f'Profesorul {problem.teachers[prof]} preda 2 materii in acelasi interval!')
+            constrangeri_incalcate += 1
+        else:
+            profs_in_interval.add((day, interval, prof))
+
+        # MATERIA NU SE PREDA IN SALA
+        if not problem.can_host[room][subject]:
+            if verbose:
+                print(f'Materia {problem.subjects[subject]} nu se preda în sala {problem.classrooms[room]}!')
+            constrangeri_incalcate += 1
+
+        # PROFESORUL NU PREDA MATERIA
+        if not problem.can_teach[prof][subject]:
+            if verbose:
+                print(f'Profesorul {problem.teachers[prof]} nu poate preda materia {problem.subjects[subject]}!')
+            constrangeri_incalcate += 1
 
-                    ore_profesori[prof] += 1
+        ore_profesori[prof] += 1
 
     # CONDITIA DE ACOPERIRE
-    for subject in acoperire_target:
-        if acoperire_reala[subject] < acoperire_target[subject]:
-            print(f'Materia {subject} nu are acoperirea necesară!')
-            # print("Acoperirea reala este " + str(acoperire_reala[subject]) + " iar cea target " + str(acoperire_target[subject]))
+    for subject in range(problem.num_subjects):
+        if acoperire_reala[subject] < problem.students[subject]:
+            if verbose:
+                print(f'Materia {problem.subjects[subject]} nu are acoperirea necesară!')
             constrangeri_incalcate += 1
 
     # CONDITIA DE MAXIM 7 ORE PE SĂPTĂMÂNĂ
-    for prof in ore_profesori:
-        if ore_profesori[prof] > 7:
-            print(f'Profesorul {prof} tine mai mult de 7 sloturi!')
+    for prof in range(problem.num_teachers):
+        if ore_profesori[prof] > MAX_TEACHER_HOURS:
+            if verbose:
+                print(f'Profesorul {problem.teachers[prof]} tine mai mult de 7 sloturi!')
             constrangeri_incalcate += 1
 
     return constrangeri_incalcate
 
 
+def check_mandatory_constraints(timetable : {str : {(int, int) : {str : (str, str)}}}, timetable_specs : dict):
+    '''
+    Se verifică dacă orarul generat respectă cerințele obligatorii pentru a fi un orar valid.
+    '''
+
+    problem = compile_problem(timetable_specs)
+
+    return count_mandatory_conflicts(problem, problem.assignments_from_timetable(timetable), verbose=True)
+
+
 def check_optional_constraints(timetable : {str : {(int, int) : {str : (str, str)}}}, timetable_specs : dict):
     '''
     Se verifică dacă orarul generat respectă cerințele profesorilor pentru a fi un orar valid.
@@ -189,8 +220,6 @@ def check_optional_constraints(timetable : {str : {(int, int) : {str : (str, str
                     for day in timetable:
                         for interval in intervals:
                             if interval in timetable[day]:
-                                interval = str(interval)
-
                                 for room in timetable[day][interval]:
                                     if timetable[day][interval][room]:
                                         crt_prof, _ = timetable[day][interval][room]
@@ -215,6 +244,10 @@ if __name__ == '__main__':
     input_name = f'inputs/{name}.yaml'
     output_name = f'outputs/{name}.txt'
 
+    # Orarele exportate ca json (orar.py --output ...json) sunt citite direct
+    if not os.path.exists(output_name) and os.path.exists(f'outputs/{name}.json'):
+        output_name = f'outputs/{name}.json'
+
     timetable_specs = read_yaml_file(input_name)
 
     debug_flag = False
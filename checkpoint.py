@@ -0,0 +1,120 @@
+import hashlib
+import os
+import pickle
+import time
+
+# Intervalul implicit dintre doua checkpoint-uri, in secunde
+CHECKPOINT_INTERVAL = 5
+
+# Fractia maxima din timpul cautarii petrecuta in salvari: cand o salvare dureaza mult
+# (frontiera A* mare), urmatoarea este amanata pana cand costul ei revine sub aceasta fractie
+MAX_OVERHEAD = 0.03
+
+# Versiunea formatului; checkpoint-urile scrise de alta versiune nu sunt reluate
+CHECKPOINT_VERSION = 2
+
+def problem_signature(problem) -> str:
+    # Amprenta datelor problemei, ca un checkpoint sa fie reluat doar pe aceeasi intrare
+    data = (problem.days, problem.intervals, problem.classrooms, problem.teachers, problem.subjects,
+            problem.students, problem.capacity, problem.subject_teachers, problem.subject_classrooms,
+            problem.teacher_time_conflicts)
+    return hashlib.blake2b(repr(data).encode(), digest_size=16).hexdigest()
+
+class Checkpointer:
+    '''
+    Salvarea periodica a starii unei cautari lungi (astar, hc) intr-un fisier local, ca o
+    rulare oprita sa poata fi reluata cu --resume.
+
+    Cautarile primesc un Checkpointer optional (ca Profiler in profiling.py) si il intreaba
+    din cand in cand daca este timpul unei salvari (due); starea este scrisa cu pickle
+    intr-un fisier temporar, mutat apoi atomic peste checkpoint-ul anterior, ca o oprire in
+    timpul scrierii sa nu strice ultimul checkpoint. La terminarea normala a cautarii,
+    fisierul este sters.
+
+    Durata fiecarei salvari este masurata (save_time) si scrisa in checkpoint, ca sa fie
+    cunoscuta si dupa reluare: intervalul dintre salvari creste cat este nevoie ca salvarile
+    sa ocupe cel mult MAX_OVERHEAD din timpul cautarii, iar cautarile o pot folosi ca sa
+    rezerve timp pentru salvarea finala in limita de timp.
+
+    Checkpoint-ul retine algoritmul si amprenta problemei; load refuza un checkpoint scris
+    de alt algoritm sau pentru alta intrare
+    '''
+
+    __slots__ = ('path', 'algorithm', 'signature', 'interval', 'resume', 'start_time', 'last_save', 'saves', 'save_time')
+
+    def __init__(self, path: str, problem, algorithm: str, interval: float = CHECKPOINT_INTERVAL,
+                 resume: bool = False) -> None:
+        self.path = path
+        self.algorithm = algorithm
+        self.signature = problem_signature(problem)
+        self.interval = interval
+        self.resume = resume
+
+        # Inceputul cautarii (mutat inapoi cu timpul deja petrecut, la reluare)
+        self.start_time = time.time()
+        self.last_save = time.time()
+        self.saves = 0
+        self.save_time = 0.0
+
+    def due(self, now: float | None = None) -> bool:
+        interval = max(self.interval, self.save_time / MAX_OVERHEAD)
+        return (now if now is not None else time.time()) - self.last_save >= interval
+
+    def elapsed(self) -> float:
+        return time.time() - self.start_time
+
+    def save(self, snapshot) -> None:
+        # snapshot() intoarce starea cautarii; construirea ei (de exemplu impachetarea
+        # frontierei A*) intra in durata masurata a salvarii
+        save_start = time.time()
+        state = pickle.dumps(snapshot(), protocol=pickle.HIGHEST_PROTOCOL)
+
+        # Starea este serializata inainte de antet, ca antetul sa contina si durata salvarii
+        # (fara scrierea pe disc, care nu depinde de cautare)
+        save_time = time.time() - save_start
+        temporary_file = f'{self.path}.{os.getpid()}.tmp'
+        with open(temporary_file, 'wb') as file:
+            pickle.dump({'version': CHECKPOINT_VERSION, 'algorithm': self.algorithm, 'signature': self.signature,
+                         'elapsed': self.elapsed(), 'save_time': save_time, 'state': state}, file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file, self.path)
+        self.last_save = time.time()
+        self.save_time = self.last_save - save_start
+        self.saves += 1
+
+    def load(self) -> dict | None:
+        '''
+        Intoarce starea salvata a cautarii sau None daca nu exista niciun checkpoint.
+        Timpul petrecut inainte de checkpoint este adaugat la start_time, ca limitele de
+        timp sa continue de unde au ramas; citirea checkpoint-ului si refacerea cautarii
+        din el intra si ele in timpul cautarii
+        '''
+
+        load_start = time.time()
+        try:
+            with open(self.path, 'rb') as file:
+                checkpoint = pickle.load(file)
+        except FileNotFoundError:
+            return None
+
+        if checkpoint.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f'Checkpoint-ul {self.path} a fost scris de alta versiune')
+        if checkpoint['algorithm'] != self.algorithm:
+            raise ValueError(f"Checkpoint-ul {self.path} este al algoritmului {checkpoint['algorithm']}")
+        if checkpoint['signature'] != self.signature:
+            raise ValueError(f'Checkpoint-ul {self.path} a fost scris pentru alta intrare')
+
+        self.start_time = load_start - checkpoint['elapsed']
+        self.save_time = checkpoint['save_time']
+        return pickle.loads(checkpoint['state'])
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def resume_state(self) -> dict | None:
+        # Starea de la care continua cautarea: ultimul checkpoint, daca s-a cerut reluarea
+        return self.load() if self.resume else None
+
+    def remove(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,141 @@
+import random
+import numpy as np
+from problem import Problem, MAX_TEACHER_HOURS
+from schedule import Schedule
+
+# Numarul maxim de intoarceri (backtracking) ale unei constructii si numarul de constructii
+# incercate, fiecare cu alte departajari aleatoare, pana la renuntare
+MAX_BACKTRACKS = 200
+MAX_TRIES = 5
+
+def subject_options(problem: Problem, schedule: Schedule):
+    # Numarul de variante (slot liber, profesor) ramase pentru fiecare materie: sloturile
+    # libere din salile materiei, inmultite cu profesorii materiei liberi in momentul slotului
+    data = np.frombuffer(schedule.data, dtype=np.intc)
+    free = data[:problem.num_slots] == 0
+
+    # Profesorii care mai pot primi o clasa in fiecare moment (zi, interval)
+    hours = data[problem.hours_offset:problem.coverage_offset]
+    busy = data[problem.busy_offset:].reshape(problem.num_teachers, problem.busy_words)
+    available = ((busy[:, problem.time_word_array] & problem.time_mask_array) == 0) & (hours < MAX_TEACHER_HOURS)[:, None]
+
+    # Profesori disponibili pentru fiecare (materie, moment), apoi pentru fiecare (slot, materie)
+    teachers = problem.teacher_subject.T.astype(np.int64) @ available
+    slot_teachers = teachers[:, problem.slot_time_array].T
+
+    hosts = problem.classroom_subject[problem.slot_classroom_array] & free[:, None]
+    return (slot_teachers * hosts).sum(axis=0)
+
+def is_dead_end(problem: Problem, schedule: Schedule, options):
+    # Verificarea inainte (forward checking): o materie neacoperita fara variante sau care
+    # are nevoie de mai multe clase decat orele libere ale profesorilor ei face orarul
+    # partial imposibil de completat
+    for subject in range(problem.num_subjects):
+        needed = problem.classes_needed(subject, problem.students[subject] - schedule.coverage(subject))
+        if not needed:
+            continue
+        if not options[subject]:
+            return True
+        if needed > sum(MAX_TEACHER_HOURS - schedule.hours(teacher) for teacher in problem.subject_teachers[subject]):
+            return True
+    return False
+
+def most_constrained_subject(problem: Problem, schedule: Schedule, options, rng=random):
+    # Materia neacoperita cu cele mai putine variante; egalitatile se departajeaza aleator
+    uncovered = [subject for subject in range(problem.num_subjects)
+                 if schedule.coverage(subject) < problem.students[subject]]
+    if not uncovered:
+        return None
+
+    fewest = min(options[subject] for subject in uncovered)
+    return rng.choice([subject for subject in uncovered if options[subject] == fewest])
+
+def subject_candidates(problem: Problem, schedule: Schedule, subject, rng=random):
+    # Variantele (slot, profesor, materie) ale materiei, ordonate astfel incat ultima din
+    # lista sa fie cea mai buna: fara conflicte soft, in sala cea mai mare, apoi aleator
+    candidates = []
+    slots = schedule.data
+    for classroom in problem.subject_classrooms[subject]:
+        capacity = problem.capacity[classroom]
+        for time in range(problem.num_times):
+            slot = time * problem.num_classrooms + classroom
+            if slots[slot]:
+                continue
+            for teacher in problem.subject_teachers[subject]:
+                if schedule.hours(teacher) < MAX_TEACHER_HOURS and not schedule.is_busy(teacher, time):
+                    candidates.append((problem.teacher_time_conflicts[teacher][time], -capacity, rng.random(), slot, teacher))
+
+    candidates.sort(reverse=True)
+    return [(slot, teacher, subject) for _, _, _, slot, teacher in candidates]
+
+def build_schedule(problem: Problem, max_backtracks: int = MAX_BACKTRACKS, max_tries: int = MAX_TRIES,
+                   initial: Schedule | None = None, rng=random):
+    '''
+    Construieste un orar care respecta constrangerile obligatorii, asezand pe rand cate o
+    clasa a materiei cu cele mai putine variante ramase (MRV). Dupa fiecare asezare se
+    verifica inainte ca toate materiile neacoperite sa mai poata fi acoperite; daca nu,
+    se incearca urmatoarea varianta, iar cand acestea se termina se revine la clasa
+    precedenta, de cel mult max_backtracks ori.
+
+    Variantele fara conflicte soft (vezi Problem.teacher_time_conflicts) sunt alese intai.
+
+    Cu un orar partial initial, constructia il completeaza: clasele lui raman pe loc, iar
+    intoarcerile ajung cel mult pana la ele.
+
+    Departajarile aleatoare folosesc generatorul rng (un random.Random, implicit cel global
+    al modulului random).
+
+    Returneaza orarul construit sau, daca nicio incercare nu reuseste, orarul incercarii
+    care a acoperit cele mai multe materii
+    '''
+
+    best = None
+    for _ in range(max_tries):
+        schedule, complete = construct(problem, max_backtracks, initial, rng)
+        if complete:
+            return schedule
+
+        covered = sum(schedule.coverage(subject) >= problem.students[subject] for subject in range(problem.num_subjects))
+        if best is None or covered > best[0]:
+            best = (covered, schedule)
+
+    return best[1]
+
+def construct(problem: Problem, max_backtracks: int, initial: Schedule | None = None, rng=random):
+    # O constructie cu intoarceri limitate; pe stiva se tin variantele ramase si slotul
+    # ales pentru fiecare clasa asezata
+    schedule = initial.clone() if initial is not None else Schedule(problem)
+    frames = []
+    backtracks = 0
+
+    options = subject_options(problem, schedule)
+    subject = most_constrained_subject(problem, schedule, options, rng)
+    candidates = subject_candidates(problem, schedule, subject, rng) if subject is not None else []
+
+    while subject is not None:
+        placed = False
+        while candidates:
+            slot, teacher, subject = candidates.pop()
+            schedule.assign(slot, teacher, subject)
+
+            options = subject_options(problem, schedule)
+            if not is_dead_end(problem, schedule, options):
+                frames.append((candidates, slot))
+                placed = True
+                break
+            schedule.unassign(slot)
+
+        if placed:
+            subject = most_constrained_subject(problem, schedule, options, rng)
+            candidates = subject_candidates(problem, schedule, subject, rng) if subject is not None else []
+            continue
+
+        # Nicio varianta nu mai lasa orarul completabil: revin la clasa precedenta
+        if not frames or backtracks >= max_backtracks:
+            return schedule, False
+        backtracks += 1
+
+        candidates, slot = frames.pop()
+        _, subject = schedule.unassign(slot)
+
+    return schedule, True
@@ -0,0 +1,101 @@
+from collections import deque
+from heapq import heappop, heappush
+
+
+class BucketQueue:
+    '''
+    Coada de prioritati pentru valori f intregi si mici (dial queue): buckets[f][key] este o
+    coada FIFO, deci la f egal se extrage intai cheia secundara cea mai mica, iar la cheie
+    egala nodul introdus primul. Adaugarea si extragerea sunt O(1) amortizat.
+    '''
+
+    def __init__(self) -> None:
+        self.buckets = []
+        self.counts = []
+        self.min_keys = []
+        self.min_f = 0
+        self.size = 0
+
+    def push(self, f: int, key: int, item) -> None:
+        buckets = self.buckets
+        while len(buckets) <= f:
+            buckets.append([])
+            self.counts.append(0)
+            self.min_keys.append(0)
+
+        level = buckets[f]
+        while len(level) <= key:
+            level.append(deque())
+
+        level[key].append(item)
+
+        if self.counts[f] == 0 or key < self.min_keys[f]:
+            self.min_keys[f] = key
+        self.counts[f] += 1
+
+        if self.size == 0 or f < self.min_f:
+            self.min_f = f
+        self.size += 1
+
+    def pop(self):
+        if self.size == 0:
+            raise IndexError('pop from an empty frontier')
+
+        # Avansez pana la primul bucket f nevid, apoi pana la prima cheie nevida din el
+        f = self.min_f
+        while self.counts[f] == 0:
+            f += 1
+        self.min_f = f
+
+        level = self.buckets[f]
+        key = self.min_keys[f]
+        while not level[key]:
+            key += 1
+        self.min_keys[f] = key
+
+        self.counts[f] -= 1
+        self.size -= 1
+        return level[key].popleft()
+
+    def entries(self):
+        # Tuplurile (f, cheie, nod) din coada, in ordinea extragerii (pentru checkpoint-uri)
+        for f in range(self.min_f, len(self.buckets)):
+            if self.counts[f]:
+                for key, items in enumerate(self.buckets[f]):
+                    for item in items:
+                        yield f, key, item
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class HeapQueue:
+    '''
+    Coada de prioritati pe heap binar, cu aceeasi ordine ca BucketQueue: (f, cheie, numarul
+    de ordine al inserarii). Comparatiile nu ajung niciodata la nodurile propriu-zise.
+    '''
+
+    def __init__(self) -> None:
+        self.heap = []
+        self.counter = 0
+
+    def push(self, f: int, key: int, item) -> None:
+        heappush(self.heap, (f, key, self.counter, item))
+        self.counter += 1
+
+    def pop(self):
+        return heappop(self.heap)[3]
+
+    def entries(self):
+        # Tuplurile (f, cheie, nod) din coada, in ordinea extragerii (pentru checkpoint-uri)
+        for f, key, _, item in sorted(self.heap, key=lambda entry: entry[:3]):
+            yield f, key, item
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+
+FRONTIERS = {
+    'bucket': BucketQueue,
+    'heap': HeapQueue,
+}
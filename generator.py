@@ -0,0 +1,135 @@
+import argparse
+import math
+import random
+import yaml
+from problem import MAX_TEACHER_HOURS
+
+DAYS = ['Luni', 'Marti', 'Miercuri', 'Joi', 'Vineri', 'Sambata', 'Duminica']
+
+# Prima ora a zilei; intervalele au cate 2 ore, ca in fisierele din inputs/
+FIRST_HOUR = 8
+
+FIRST_NAMES = ['Alexandru', 'Andreea', 'Andrei', 'Ana', 'Bogdan', 'Cristian', 'Daniel', 'Diana', 'Elena', 'Florin',
+               'Gabriel', 'Ioana', 'Ion', 'Laura', 'Maria', 'Mihai', 'Mircea', 'Monica', 'Radu', 'Raluca', 'Sorin',
+               'Stefan', 'Teodora', 'Vlad', 'Victor']
+LAST_NAMES = ['Popa', 'Ionescu', 'Popescu', 'Dumitrescu', 'Gheorghe', 'Stan', 'Stoica', 'Munteanu', 'Constantin',
+              'Marin', 'Tudor', 'Dobre', 'Ilie', 'Andronescu', 'Barbu', 'Nistor', 'Florea', 'Lungu', 'Matei',
+              'Rusu', 'Sandu', 'Toma', 'Vasile', 'Zamfir', 'Neagu']
+
+# Capacitatile salilor, ca in fisierele din inputs/
+CAPACITIES = [20, 25, 30, 35, 40, 60, 85, 100]
+
+# Probabilitatea ca o sala sa poata gazdui o materie
+ROOM_SUBJECT_DENSITY = 0.6
+
+# Numarul de materii predate de un profesor si probabilitatile lor
+TEACHER_SUBJECTS = [1, 2, 3]
+TEACHER_SUBJECT_WEIGHTS = [0.45, 0.4, 0.15]
+
+# Orele profesorilor unei materii trebuie sa depaseasca de atatea ori clasele ei necesare
+TEACHER_HOURS_MARGIN = 1.5
+
+def generate(days: int = 5, intervals: int = 6, rooms: int = 6, teachers: int = 36, subjects: int = 8,
+             tightness: float = 0.5, preferences: float = 0.3, seed: int = 0) -> dict:
+    '''
+    Genereaza datele unei probleme in formatul fisierelor yaml de intrare (vezi inputs/).
+
+    - tightness: fractia din capacitatea totala a salilor (capacitate x zile x intervale)
+      ocupata de studentii tuturor materiilor; cu cat este mai mare, cu atat acoperirea
+      este mai greu de realizat
+    - preferences: probabilitatea ca un profesor sa nu doreasca sa predea intr-o zi sau
+      intr-un interval (constrangerile cu '!')
+
+    Fiecare materie are cel putin o sala si destui profesori pentru clasele ei, dar
+    existenta unui orar fara conflicte nu este garantata. Acelasi seed da aceleasi date
+    '''
+
+    if not 1 <= days <= len(DAYS):
+        raise ValueError(f'Numarul de zile trebuie sa fie intre 1 si {len(DAYS)}')
+    if teachers > len(FIRST_NAMES) * len(LAST_NAMES):
+        raise ValueError(f'Cel mult {len(FIRST_NAMES) * len(LAST_NAMES)} profesori')
+
+    rng = random.Random(seed)
+    day_names = DAYS[:days]
+    hours = [(FIRST_HOUR + 2 * i, FIRST_HOUR + 2 * i + 2) for i in range(intervals)]
+    subject_names = [f'M{subject + 1}' for subject in range(subjects)]
+    room_names = [f'S{room + 1:03d}' for room in range(rooms)]
+    teacher_names = [f'{first} {last}' for first, last in
+                     rng.sample([(first, last) for first in FIRST_NAMES for last in LAST_NAMES], teachers)]
+
+    # Salile si materiile pe care le pot gazdui; fiecare materie are cel putin o sala
+    capacity = [rng.choice(CAPACITIES) for _ in range(rooms)]
+    hosts = [[subject for subject in range(subjects) if rng.random() < ROOM_SUBJECT_DENSITY] for _ in range(rooms)]
+    for subject in range(subjects):
+        if not any(subject in hosted for hosted in hosts):
+            hosts[rng.randrange(rooms)].append(subject)
+
+    # Studentii: tightness din capacitatea totala, impartiti intre materii dupa o pondere
+    # aleatoare si dupa capacitatea salilor in care se pot preda, rotunjiti la zeci
+    room_capacity = [sum(capacity[room] for room in range(rooms) if subject in hosts[room]) for subject in range(subjects)]
+    weights = [rng.uniform(0.5, 1.5) * room_capacity[subject] for subject in range(subjects)]
+    total = tightness * sum(capacity) * days * intervals
+    students = [max(10, 10 * round(total * weight / sum(weights) / 10)) for weight in weights]
+
+    # Profesorii: fiecare preda 1-3 materii, iar fiecare materie primeste profesori pana
+    # cand orele lor acopera de TEACHER_HOURS_MARGIN ori clasele necesare
+    taught = [set(rng.sample(range(subjects), min(subjects, rng.choices(TEACHER_SUBJECTS, TEACHER_SUBJECT_WEIGHTS)[0])))
+              for _ in range(teachers)]
+    for subject in range(subjects):
+        largest = max(capacity[room] for room in range(rooms) if subject in hosts[room])
+        needed = math.ceil(TEACHER_HOURS_MARGIN * students[subject] / largest)
+        candidates = [teacher for teacher in range(teachers) if subject not in taught[teacher]]
+        rng.shuffle(candidates)
+        while sum(subject in subject_set for subject_set in taught) * MAX_TEACHER_HOURS < needed and candidates:
+            taught[candidates.pop()].add(subject)
+
+    def constraint(name):
+        return f'!{name}' if rng.random() < preferences else name
+
+    return {
+        'Intervale': [f'({start}, {end})' for start, end in hours],
+        'Materii': {subject_names[subject]: students[subject] for subject in range(subjects)},
+        'Profesori': {
+            teacher_names[teacher]: {
+                'Constrangeri': [constraint(day) for day in day_names] +
+                                [constraint(f'{start}-{end}') for start, end in hours],
+                'Materii': [subject_names[subject] for subject in sorted(taught[teacher])],
+            } for teacher in range(teachers)
+        },
+        'Sali': {
+            room_names[room]: {
+                'Capacitate': capacity[room],
+                'Materii': [subject_names[subject] for subject in sorted(hosts[room])],
+            } for room in range(rooms)
+        },
+        'Zile': day_names,
+    }
+
+def write_yaml(data: dict, path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as file:
+        yaml.safe_dump(data, file, allow_unicode=True)
+
+def add_arguments(parser):
+    # Parametrii generatorului, folositi si de scaling.py
+    parser.add_argument('--days', type=int, default=5, help='Numarul de zile (cel mult 7)')
+    parser.add_argument('--intervals', type=int, default=6, help='Numarul de intervale de cate 2 ore dintr-o zi')
+    parser.add_argument('--rooms', type=int, default=6, help='Numarul de sali')
+    parser.add_argument('--teachers', type=int, default=36, help='Numarul de profesori')
+    parser.add_argument('--subjects', type=int, default=8, help='Numarul de materii')
+    parser.add_argument('--tightness', type=float, default=0.5,
+                        help='Fractia din capacitatea totala a salilor ocupata de studenti (implicit 0.5)')
+    parser.add_argument('--preferences', type=float, default=0.3,
+                        help='Probabilitatea unei zile sau a unui interval nedorit de un profesor (implicit 0.3)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed-ul generatorului (implicit 0)')
+
+def main():
+    parser = argparse.ArgumentParser(description='Generarea unui fisier de intrare sintetic, in formatul celor din inputs/')
+    parser.add_argument('output_file', help='Fisierul yaml scris')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    write_yaml(generate(args.days, args.intervals, args.rooms, args.teachers, args.subjects, args.tightness,
+                        args.preferences, args.seed), args.output_file)
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,21 @@
-import copy
 import random
 import time
-import utils
-from check_constraints import parse_interval
-import matplotlib.pyplot as plt
+import multiprocessing
+import sys
+import numpy as np
+import render
+from check_constraints import count_mandatory_conflicts
+from problem import Problem, MAX_TEACHER_HOURS
+from schedule import Schedule
+from construct import build_schedule
+from anytime import IncumbentSender, receive_incumbents
 
 MAX_NUMBER_GENERATED_STATES = 10
 MAX_CLASSROOM_TO_MOVE = 60
 
+# Numarul maxim de mutari pastrate pentru fiecare clasa aleasa (None = toate mutarile bune)
+MAX_MOVES_PER_CLASS = None
+
 INTERVALS = 'Intervale'
 DAYS = 'Zile'
 SUBJECTS = 'Materii'
@@ -15,370 +23,295 @@ TEACHERS = 'Profesori'
 CLASSROOMS = 'Sali'
 CAPACITY = 'Capacitate'
 
-teacher_preferences = {}
-teacher_intervals_to_avoid = {}
+# Problema compilata, evenimentul de oprire si coada orarelor mai bune, setate in fiecare
+# proces al pool-ului
+worker_problem = None
+worker_stop = None
+worker_updates = None
+
+class Move:
+    '''
+    Descrierea unei mutari din vecinatatea unei stari: clasa din from_slot trece in to_slot,
+    iar daca swap_partner este adevarat, clasa din to_slot trece in from_slot. delta este
+    diferenta de conflicte pe care o produce mutarea (negativa pentru mutarile bune).
+
+    Daca teacher este dat, clasa ramane in slot (from_slot == to_slot) si este preluata
+    de acest profesor.
+    '''
+
+    __slots__ = ('from_slot', 'to_slot', 'swap_partner', 'delta', 'teacher')
+
+    def __init__(self, from_slot: int, to_slot: int, swap_partner: bool, delta: int, teacher: int | None = None) -> None:
+        self.from_slot = from_slot
+        self.to_slot = to_slot
+        self.swap_partner = swap_partner
+        self.delta = delta
+        self.teacher = teacher
 
 class State:
+    __slots__ = ('problem', 'schedule', 'conflicts_number', 'rng')
+
     def __init__(
         self,
-        input_data,
-        schedule: dict | None = None,
+        problem: Problem,
+        schedule: Schedule | None = None,
         conflicts: int | None = None,
-        teacher_assignments: dict | None = None
+        rng = random
     ) -> None:
 
-        self.input_data = input_data
+        self.problem = problem
 
-        self.schedule = schedule if schedule is not None else\
-                        self.generate_schedule(self.input_data[INTERVALS],
-                        self.input_data[SUBJECTS], self.input_data[TEACHERS],
-                        self.input_data[CLASSROOMS], self.input_data[DAYS])
+        # Generatorul aleator al cautarii (un random.Random, implicit cel global), folosit de
+        # constructia orarului initial si de alegerea mutarilor; starile derivate il mostenesc
+        self.rng = rng
+
+        # Orarul, orele profesorilor si mastile lor de ocupare sunt tinute
+        # in acelasi buffer (vezi schedule.py)
+        self.schedule = schedule if schedule is not None else self.generate_schedule()
         
         self.conflicts_number = conflicts if conflicts is not None else self.compute_conflicts()
 
-        self.teacher_assignments = teacher_assignments if teacher_assignments\
-                                 is not None else self.compute_teacher_assignments()
-
-    def generate_schedule(self, intervals, subjects, teachers, classrooms, days):
-        # Generarea unui orar care satisface toate constrangerile obligatoriii
-        tries = 50
-        while tries > 0:
-            schedule = {day: {interval: {classroom: None for classroom in classrooms} for interval in intervals} for day in days}
-
-            available_classrooms = {day: {interval: {subject: [classroom for classroom in classrooms if subject in classrooms[classroom][SUBJECTS]] for subject in subjects} for interval in intervals} for day in days}
-            
-            subjects_capacity = {subject : 0 for subject in subjects}
-
-            teacher_total_assignments = {teacher : 0  for teacher in teachers.keys()}
-
-            teacher_assignments = {teacher : {day : {interval : False for interval in intervals} for day in days} for teacher in teachers.keys()}
-
-            subjects_list = list(subjects.keys())
-            number_of_subjects_chosen = 0
-
-            # Ma opresc atunci cand am alocat toate materiile in sali
-            while number_of_subjects_chosen < len(subjects):
-                subject = random.choice(subjects_list)
-                number_of_subjects_chosen += 1
-
-                subject_assigned = False
-                attempts = 0
-
-                # Cat timp nu am terminat de alocat toti studentii acestei materii
-                while not subject_assigned:
-                    # Aleg o zi si un interval random
-                    day = random.choice(days)
-                    interval = random.choice(intervals)
-
-                    # Aleg random o sala din salile disponibile in ziua si intervalul alese
-                    available = available_classrooms[day][interval][subject]
-                    if not available:
-                        attempts += 1
-                        if attempts >= 20:
-                            break
-                        continue
-                    classroom = random.choice(available)
-
-                    # Selectez profesorii care pot preda materia aleasa si care nu au deja
-                    # un curs asignat in ziua si intervalul alese
-                    valid_teachers = []
-                    for teacher in teachers.keys():
-                        if subject in teachers[teacher][SUBJECTS]\
-                            and teacher_total_assignments[teacher] < 7\
-                            and (not teacher_assignments[teacher][day][interval]):
-                    
-                            valid_teachers.append(teacher)
-
-                    if not valid_teachers:
-                        attempts += 1
-                        if attempts >= 20:
-                            break
-                        continue
-
-                    # Aleg random un profesor si il asigenz in ziua, intervalul, clasa alese
-                    teacher = random.choice(valid_teachers)
-                    teacher_total_assignments[teacher] += 1
-                    teacher_assignments[teacher][day][interval] = True
-
-                    schedule[day][interval][classroom] = (teacher, subject)
-
-                    # Sterg clasa aleasa din listele tututror materiilor care pot fi tinute in acea sala
-                    for subj in subjects:
-                        available_classrooms[day][interval][subj] = [c for c in available_classrooms[day][interval][subj] if c != classroom]
-
-                    # Actualizez acoperirea materiei
-                    subjects_capacity[subject] += classrooms[classroom]['Capacitate']
-
-                    # Am atins capacitatea dorita
-                    if subjects_capacity[subject] >= subjects[subject]:
-                        subject_assigned = True
-                        # Sterg materia din lista de materii
-                        subjects_list.remove(subject)
-            
-            # Ma opresc din cautare atunci cand orarul generat are indeplinite
-            # toate constrangerile obligatorii
-            if check_mandatory_constraints(schedule, self.input_data) == 0:
-                break            
-            tries -= 1
-
-        self.teacher_assignments = teacher_assignments
-        
-        return schedule
+    def generate_schedule(self):
+        # Generarea unui orar care satisface toate constrangerile obligatorii (vezi construct.py)
+        return build_schedule(self.problem, rng=self.rng)
    
     def check_optional_constraints(self):
-        # Calculeaza numerul constrangerilor optionale
+        # Calculeaza numarul constrangerilor optionale
         constrangeri_incalcate = 0
 
-        for day, intervals in self.schedule.items():
-            for interval, classrooms in intervals.items():
-                for _, assignment in classrooms.items():
-                    if assignment:
-                        teacher_name = assignment[0]
-
-                        # Profesorul nu prefera sa predea in aceasta zi
-                        if not teacher_preferences[teacher_name].get(day, True):
-                            constrangeri_incalcate += 1 
-
-                        # Profesorul nu doreste sa predea in acest interval
-                        if str(interval) in teacher_intervals_to_avoid[teacher_name]:
-                            constrangeri_incalcate += 1
+        for day, interval, _, teacher, _ in self.schedule.assignments():
+            constrangeri_incalcate += self.soft_constraints(teacher, day, interval)
 
         return constrangeri_incalcate
 
-    def get_next_states(self):
-        # Generez stari vecine pentru starea curenta
-        next_states = []
-        schedule = self.schedule
+    def get_moves(self):
+        # Generez, pe rand, mutarile catre stari vecine ale starii curente; starile vecine
+        # nu sunt construite, doar descrise, iar hill_climbing aplica doar mutarea aleasa
+        problem = self.problem
+        slots = self.schedule.data
         
-        # Ma opresc cand am gasim MAX_NUMBER_GENERATED_STATES de stari vecine diferite
+        # Ma opresc cand am gasim MAX_NUMBER_GENERATED_STATES de mutari diferite
         # sau cand am incercat sa fac mutari pentru MAX_CLASSROOM_TO_MOVE clase
         iters = 0
-        while len(next_states) < MAX_NUMBER_GENERATED_STATES and iters < MAX_CLASSROOM_TO_MOVE:
+        moves = 0
+        while moves < MAX_NUMBER_GENERATED_STATES and iters < MAX_CLASSROOM_TO_MOVE:
             # Aleg random o zi, un interval, o clasa
-            day = random.choice(list(schedule.keys()))
-            interval = random.choice(list(schedule[day].keys()))
-            classroom = random.choice(list(schedule[day][interval].keys()))
+            slot = self.rng.randrange(problem.num_slots)
 
             # Realizez mutari ale clasei daca aceasta exista in orar
-            if schedule[day][interval][classroom]:
+            if slots[slot]:
                 iters += 1
-                new_states = self.apply_move(day, interval, classroom)
-                next_states = list(set(next_states + new_states))
-
-        return next_states
-    
-    def apply_move(self, prev_day, prev_interval, prev_classroom):
-        states = []
+                for move in self.slot_moves(slot, MAX_MOVES_PER_CLASS):
+                    moves += 1
+                    yield move
+
+    def soft_constraints(self, teacher, day, interval):
+        # Conflictele soft generate de asezarea profesorului in ziua si intervalul date
+        return self.problem.teacher_time_conflicts[teacher][day * self.problem.num_intervals + interval]
+
+    def slot_moves(self, prev_slot, top_k=None):
+        # Mutarile bune ale clasei din prev_slot, in ordinea sloturilor tinta; cu top_k se
+        # pastreaza doar cele mai bune top_k mutari, alese cu argpartition
+        targets, deltas, swaps = self.move_deltas(prev_slot)
+
+        if top_k is not None and len(targets) > top_k:
+            best = np.argpartition(deltas, top_k - 1)[:top_k]
+            best = best[np.argsort(deltas[best], kind='stable')]
+            targets, deltas, swaps = targets[best], deltas[best], swaps[best]
+
+        return [Move(prev_slot, slot, swap, delta)
+                for slot, delta, swap in zip(targets.tolist(), deltas.tolist(), swaps.tolist())]
+
+    def move_deltas(self, prev_slot, improving=True):
+        '''
+        Calculeaza intr-o singura trecere NumPy diferenta de conflicte soft pentru mutarea
+        clasei din prev_slot in fiecare slot al orarului (sau interschimbarea cu clasa de acolo).
+
+        Un slot tinta este valid daca:
+        - profesorul clasei este liber in ziua si intervalul slotului
+        - materia poate fi predata in sala slotului, iar salile au aceeasi capacitate
+        - la interschimbare, profesorul clasei din slot este liber in ziua si intervalul
+          lui prev_slot, iar materia lui poate fi predata in sala lui prev_slot
+
+        Returneaza sloturile tinta valide (doar cele care scad numarul de conflicte, daca
+        improving este adevarat), diferentele lor de conflicte si daca mutarea este o
+        interschimbare
+        '''
+
+        problem = self.problem
+        data = np.frombuffer(self.schedule.data, dtype=np.intc)
+        slots = data[:problem.num_slots]
+
+        prev_assignment = data[prev_slot]
+        teacher = problem.assignment_teacher[prev_assignment]
+        subject = problem.assignment_subject[prev_assignment]
+        prev_time = problem.slot_time[prev_slot]
+        prev_classroom = problem.slot_classroom[prev_slot]
+
+        times = problem.slot_time_array
+        classrooms = problem.slot_classroom_array
+
+        # Salile in care se poate muta clasa
+        room_mask = problem.classroom_subject[:, subject]\
+                    & (problem.classroom_capacity == problem.capacity[prev_classroom])
+
+        # Momentele in care profesorul clasei preda deja (inclusiv cel al lui prev_slot)
+        words = data[problem.busy_offset + teacher * problem.busy_words:][:problem.busy_words]
+        teacher_busy = (words[problem.time_word_array] & problem.time_mask_array) != 0
+
+        valid = room_mask[classrooms] & ~teacher_busy[times]
+
+        # Interschimbarile: profesorii ocupati in momentul lui prev_slot, din cuvantul
+        # corespunzator al mastii fiecarui profesor
+        empty = slots == 0
+        other_teachers = problem.assignment_teacher_array[slots]
+        other_subjects = problem.assignment_subject_array[slots]
+        busy_at_prev = (data[problem.busy_offset + problem.time_word[prev_time]::problem.busy_words]
+                        & problem.time_mask[prev_time]) != 0
+        swap_mask = ~busy_at_prev[other_teachers] & problem.classroom_subject[prev_classroom][other_subjects]
+        valid &= empty | swap_mask
+
+        # Diferenta de conflicte soft: profesorul clasei trece din prev_time in momentul
+        # slotului, iar la interschimbare celalalt profesor face drumul invers
+        penalty = problem.teacher_time_penalty
+        deltas = penalty[teacher, times] - penalty[teacher, prev_time]
+        deltas += np.where(empty, 0, penalty[other_teachers, prev_time] - penalty[other_teachers, times])
+
+        targets = np.flatnonzero(valid & (deltas < 0) if improving else valid)
+        return targets, deltas[targets], ~empty[targets]
+
+    def teacher_deltas(self, slot):
+        '''
+        Calculeaza diferenta de conflicte soft pentru preluarea clasei din slot de fiecare
+        profesor care poate preda materia, este liber in ziua si intervalul slotului si nu
+        are deja 7 ore
+
+        Returneaza profesorii valizi si diferentele lor de conflicte
+        '''
+
+        problem = self.problem
         schedule = self.schedule
-        prev_teacher, subject = schedule[prev_day][prev_interval][prev_classroom]
-
-        # Caut noi zile, intervale, clase pentru care se satisfac urmatoarele conditii:
-        # - profesorul materiei poate preda in ziua si intervalul nou
-        # - materia poate fi predata in clasa noua
-        # - clasele interschimbate au aceeasi capacitate 
-
-        for day in self.input_data[DAYS]:
-            for interval in self.input_data[INTERVALS]:
-                if not self.teacher_assignments[prev_teacher][day][interval]:
-                    for classroom in self.input_data[CLASSROOMS]:
-                        if (subject in self.input_data[CLASSROOMS][classroom][SUBJECTS]) and \
-                            self.input_data[CLASSROOMS][classroom]['Capacitate'] == self.input_data[CLASSROOMS][prev_classroom]['Capacitate']\
-                            and (day != prev_day or interval != prev_interval or classroom != prev_classroom):
-                            
-                            new_schedule = copy.deepcopy(schedule)
-
-                            # Caclulez conflictele soft generate de asezarea profesorului in
-                            # ziua, intervalul si sala curenta 
-                            prev_constraints = 0
-                            if prev_interval in teacher_intervals_to_avoid[prev_teacher]:
-                                prev_constraints += 1
-                            if not teacher_preferences[prev_teacher][prev_day]:
-                                prev_constraints += 1
-
-                            # Calculez conflictele soft pe care le-ar genera mutarea
-                            # profesorului in ziua, intervalul si sala noua
-                            next_constraints = 0
-                            if interval in teacher_intervals_to_avoid[prev_teacher]:
-                                next_constraints += 1
-                            if not teacher_preferences[prev_teacher][day]:
-                                next_constraints += 1
-
-                            # Sala in care vreau sa ma mut nu este ocupata
-                            if schedule[day][interval][classroom] == None:
-                                # Realizez mutarea doar daca ma avantajeaza noua structura
-                                if prev_constraints > next_constraints:
-                                    # Eliberez sala in ziua si intervalul precedent
-                                    new_schedule[prev_day][prev_interval][prev_classroom] = None
-                                    new_schedule[day][interval][classroom] = (prev_teacher, subject)
-                                    
-                                    # Calculez noul numar de conflicte
-                                    new_confl = self.conflicts_number - (prev_constraints - next_constraints)
-
-                                    # Asignez profesorul in ziua, intervalul si sala noua
-                                    new_teach_assignm = copy.deepcopy(self.teacher_assignments)
-                                    new_teach_assignm[prev_teacher][prev_day][prev_interval] = False
-                                    new_teach_assignm[prev_teacher][day][interval] = True
-
-                                    states.append(State(self.input_data, new_schedule, new_confl, new_teach_assignm))
-
-                            # Sala este ocupata
-                            else:
-                                new_teacher, _ = schedule[day][interval][classroom]
-
-                                # Fac interschimbarea claselor daca profesorul nou nu preda in ziua si
-                                #  intervalul in care vreau sa il mut
-                                if not self.teacher_assignments[new_teacher][prev_day][prev_interval] and\
-                                    schedule[day][interval][classroom][1] in self.input_data[CLASSROOMS][prev_classroom][SUBJECTS]:
-
-                                    # Caclulez conflictele soft generate de asezarea profesorului cu care
-                                    #  fac schimbul in ziua, intervalul si sala in care tine cursul
-                                    if interval in teacher_intervals_to_avoid[new_teacher]:
-                                        prev_constraints += 1
-                                    if not teacher_preferences[new_teacher][day]:
-                                        prev_constraints += 1
-                                    
-                                    # Caclulez conflictele soft generate de asezarea profesorului cu care
-                                    # fac schimbul in ziua, intervalul si sala in care vreau sa il mut
-                                    if prev_interval in teacher_intervals_to_avoid[new_teacher]:
-                                        next_constraints += 1
-                                    if not teacher_preferences[new_teacher][prev_day]:
-                                        next_constraints += 1
-
-                                    # Daca noua structura a orarului produce mai putine conflicte, aleg sa
-                                    # fac inetrschimbarea
-                                    if prev_constraints > next_constraints:
-                                        new_schedule[prev_day][prev_interval][prev_classroom] = schedule[day][interval][classroom]
-                                        new_schedule[day][interval][classroom] = (prev_teacher, subject)
-
-                                        # Calculez noul numar de conflicte
-                                        new_confl = self.conflicts_number - (prev_constraints - next_constraints)
-
-                                        # Asignez profesorul in ziua, intervalul si sala noua in care va preda
-                                        new_teach_assignm = copy.deepcopy(self.teacher_assignments)
-                                        new_teach_assignm[prev_teacher][prev_day][prev_interval] = False
-                                        new_teach_assignm[prev_teacher][day][interval] = True
-                                        new_teach_assignm[new_teacher][day][interval] = False
-                                        new_teach_assignm[new_teacher][prev_day][prev_interval] = True
-
-                                        states.append(State(self.input_data, new_schedule, new_confl, new_teach_assignm))
-
-        return states
+        teacher, subject = schedule.get(slot)
+        time = problem.slot_time[slot]
+
+        teachers = np.array([other for other in problem.subject_teachers[subject]
+                             if other != teacher and schedule.hours(other) < MAX_TEACHER_HOURS
+                             and not schedule.is_busy(other, time)], dtype=np.int64)
+        if not len(teachers):
+            return teachers, teachers
+
+        return teachers, problem.teacher_time_penalty[teachers, time] - problem.teacher_time_penalty[teacher, time]
+
+    def class_moves(self, slot):
+        # Toate mutarile valide ale clasei din slot (mutari, interschimbari si schimbari de
+        # profesor), ca vectori NumPy: sloturile tinta, diferentele de conflicte,
+        # interschimbarile si profesorii noi (-1 daca profesorul ramane acelasi)
+        targets, deltas, swaps = self.move_deltas(slot, improving=False)
+        teachers, teacher_deltas = self.teacher_deltas(slot)
+
+        return (np.concatenate((targets, np.full(len(teachers), slot))),
+                np.concatenate((deltas, teacher_deltas)),
+                np.concatenate((swaps, np.zeros(len(teachers), dtype=bool))),
+                np.concatenate((np.full(len(targets), -1), teachers)))
+
+    def apply_move(self, move, in_place=False):
+        # Starea vecina obtinuta prin mutare; orarul se copiaza o singura data, iar cu
+        # in_place mutarea se face direct in starea curenta
+        schedule = self.schedule if in_place else self.schedule.clone()
+        teacher, subject = schedule.unassign(move.from_slot)
+        if move.teacher is not None:
+            teacher = move.teacher
+
+        # La interschimbare, clasa din slotul nou ia locul celei mutate
+        if move.swap_partner:
+            new_teacher, new_subject = schedule.unassign(move.to_slot)
+            schedule.assign(move.from_slot, new_teacher, new_subject)
+        schedule.assign(move.to_slot, teacher, subject)
+
+        if in_place:
+            self.conflicts_number += move.delta
+            return self
+        return State(self.problem, schedule, self.conflicts_number + move.delta, self.rng)
 
     def compute_conflicts(self):
         # Calculez numarul total de conflcite incalcate
-        return check_mandatory_constraints(self.schedule, self.input_data) +  self.check_optional_constraints()
-
-    def compute_teacher_assignments(self):
-        # Parcurg orarul si marchez zilele si intervalele in care un profesor preda
-        teacher_assignments = {teacher : {day : {interval : False for interval in self.input_data[INTERVALS]} for day in self.input_data[DAYS]} for teacher in self.input_data[TEACHERS].keys()}
-
-        for day, intervals in self.schedule.items():
-            for interval, classrooms in intervals.items():
-                for _, assignment in classrooms.items():
-                    if assignment:
-                        teacher_name = assignment[0]
-                        teacher_assignments[teacher_name][day][interval] = True
-        
-        return teacher_assignments
+        return count_mandatory_conflicts(self.problem, self.schedule.assignments()) +  self.check_optional_constraints()
 
     def is_final(self):
         # Starea finala are 0 conflicte
         return self.conflicts_number == 0
 
     def clone(self):
-        return State(self.input_data, copy.deepcopy(self.schedule), self.conflicts_number, copy.deepcopy(self.teacher_assignments))
+        return State(self.problem, self.schedule.clone(), self.conflicts_number, self.rng)
     
     def display(self):
-        print(self.schedule)
-
-def check_mandatory_constraints(timetable, timetable_specs):
-        # Functie de verificare a constrangerilor obligatorii din utils.py, din care am sters mesajele printate
-        constrangeri_incalcate = 0
-
-        acoperire_target = timetable_specs[SUBJECTS]
-        
-        acoperire_reala = {subject : 0 for subject in acoperire_target}
-
-        ore_profesori = {prof : 0 for prof in timetable_specs[TEACHERS]}
-
-        for day in timetable:
-            for interval in timetable[day]:
-                profs_in_crt_interval = []
-                for room in timetable[day][interval]:
-                    if timetable[day][interval][room]:
-                        prof, subject = timetable[day][interval][room]
-                        acoperire_reala[subject] += timetable_specs[CLASSROOMS][room]['Capacitate']
-
-                        # PROFESORUL PREDĂ 2 MATERII ÎN ACELAȘI INTERVAL
-                        if prof in profs_in_crt_interval:
-                            constrangeri_incalcate += 1
-                        else:
-                            profs_in_crt_interval.append(prof)
-
-                        # MATERIA NU SE PREDA IN SALA
-                        if subject not in timetable_specs[CLASSROOMS][room][SUBJECTS]:
-                            constrangeri_incalcate += 1
+        print(self.to_timetable())
 
-                        # PROFESORUL NU PREDA MATERIA
-                        if subject not in timetable_specs[TEACHERS][prof][SUBJECTS]:
-                            constrangeri_incalcate += 1
+    def to_timetable(self):
+        # Orarul cu numele din fisierul de intrare, pentru afisare
+        return self.schedule.to_timetable()
 
-                        ore_profesori[prof] += 1
-
-        # CONDITIA DE ACOPERIRE
-        for subject in acoperire_target:
-            if acoperire_reala[subject] < acoperire_target[subject]:
-                constrangeri_incalcate += 1
-
-        # CONDITIA DE MAXIM 7 ORE PE SĂPTĂMÂNĂ
-        for prof in ore_profesori:
-            if ore_profesori[prof] > 7:
-                constrangeri_incalcate += 1
-
-        return constrangeri_incalcate
-
-def hill_climbing(initial: State, max_iters: int = 1000):
+def hill_climbing(initial: State, max_iters: int = 1000, improvement: str = 'best', profiler=None,
+                  deadline=None, incumbent=None):
     iters, states = 0, 0
     state = initial.clone()
+    if incumbent is not None:
+        incumbent.offer(state.schedule, state.conflicts_number)
     
     while iters < max_iters:
+        # Timpul de cautare s-a terminat; intorc starea curenta
+        if deadline is not None and time.time() > deadline:
+            break
+
         iters += 1
 
         # Return daca starea curenta este cea finala 
         if state.is_final():
             return state.is_final(), iters, states, state
-        
-        # Construiesc starile vecine ale starii curente
-        next_states = list(state.get_next_states())
 
-        # Adun la numarul total de stari construite
-        states += len(next_states)
-        
-        # Daca nu gasesc stari vecine, ma opresc
-        if len(next_states) == 0:
-            return state.is_final(), iters, states, state
+        if profiler is not None:
+            clock = time.perf_counter()
 
-        # Salvez starea vecina cu cele mai putine conflicte
-        minState = next_states[0]
-        minConflicts = minState.conflicts_number
+        # Caut mutarea cu cea mai mare scadere a conflictelor (best) sau prima mutare care
+        # scade conflictele (first); toate mutarile generate scad numarul de conflicte
+        best_move = None
+        for move in state.get_moves():
+            # Adun la numarul total de stari construite
+            states += 1
 
-        for succ in next_states:
-            if succ.conflicts_number < minConflicts:
-                minState = succ
-                minConflicts = succ.conflicts_number
+            if best_move is None or move.delta < best_move.delta:
+                best_move = move
+            if improvement == 'first':
+                break
 
-        # Nu am gasit o stare vecina mai buna
-        if minConflicts >= state.conflicts_number:
+        if profiler is not None:
+            clock = profiler.record('neighbours', clock)
+
+        # Daca nu gasesc stari vecine mai bune, ma opresc
+        if best_move is None:
             return state.is_final(), iters, states, state
-        
-        state = minState
+
+        state = state.apply_move(best_move)
+        if profiler is not None:
+            profiler.record('apply_move', clock)
+
+        # Anunt orarul daca este cel mai bun gasit pana acum (vezi anytime.py)
+        if incumbent is not None:
+            incumbent.offer(state.schedule, state.conflicts_number)
         
     return state.is_final(), iters, states, state
 
 def random_restart_hill_climbing(
     initial: State,
     max_restarts: int = 100, 
-    run_max_iters: int = 100):
+    run_max_iters: int = 100,
+    stop = None,
+    improvement: str = 'best',
+    profiler = None,
+    deadline = None,
+    incumbent = None,
+    checkpoint = None,
+    resume = None):
 
     is_final = False
     total_iters, total_states = 0, 0
@@ -388,13 +321,35 @@ def random_restart_hill_climbing(
 
     restarts = 0
     state = initial
+    init_state_conflicts = initial.conflicts_number
+
+    # Continui restart-urile salvate intr-un checkpoint
+    if resume is not None:
+        state, best_state, restarts, total_iters, total_states, init_state_conflicts =\
+            restore_restarts(initial.problem, resume, initial.rng)
+        if incumbent is not None:
+            incumbent.offer(best_state.schedule, best_state.conflicts_number)
 
+    timed_out = False
     while restarts < max_restarts:
+        # Alt proces a gasit deja o stare finala
+        if stop is not None and stop.is_set():
+            break
+
+        if checkpoint is not None and checkpoint.due():
+            checkpoint.save(lambda: restart_checkpoint(state, best_state, restarts, total_iters, total_states,
+                                                       init_state_conflicts))
+
+        # Timpul de cautare s-a terminat
+        if deadline is not None and time.time() > deadline:
+            timed_out = True
+            break
+
         restarts += 1
 
         init_state_conflicts = state.conflicts_number
 
-        is_final, iters, states, state = hill_climbing(state, run_max_iters)
+        is_final, iters, states, state = hill_climbing(state, run_max_iters, improvement, profiler, deadline, incumbent)
 
         if state.conflicts_number < best_state.conflicts_number:
             best_state = state
@@ -402,64 +357,151 @@ def random_restart_hill_climbing(
         # Adun numarul de iteratii si stari create de alg hill_climbing
         total_iters += iters
         total_states += states
+        if profiler is not None:
+            profiler.count('restarts')
+            profiler.count('iterations', iters)
+            profiler.count('moves', states)
 
         # Daca am ajuns intr-o stare finala, ma opresc
         if is_final:
+            if stop is not None:
+                stop.set()
+            if checkpoint is not None:
+                checkpoint.remove()
             return is_final, total_iters, total_states, state, init_state_conflicts
 
-        state = State(state.input_data)
+        # Orarul initial al restart-ului urmator: constructia si numararea conflictelor
+        if profiler is not None:
+            clock = time.perf_counter()
+        state = State(state.problem, rng=state.rng)
+        if profiler is not None:
+            profiler.record('restart', clock)
     
+    # Cautarea oprita de limita de timp poate fi continuata (de exemplu cu o limita mai
+    # mare); altfel checkpoint-ul nu mai este necesar
+    if checkpoint is not None:
+        if timed_out:
+            checkpoint.save(lambda: restart_checkpoint(state, best_state, restarts, total_iters, total_states,
+                                                       init_state_conflicts))
+        else:
+            checkpoint.remove()
+
     # Am epuizat numarul de restart-rui, intorc cea mai buna stare gasita
     return is_final, total_iters, total_states, best_state, init_state_conflicts
 
-def initialize_teacher_preferences(input_data):
-    global teacher_preferences
-    global teacher_intervals_to_avoid
-    
-    # Parcurg preferintele fiecarui profesor
-    for teacher, details in input_data[TEACHERS].items():
-        teacher_preferences[teacher] = {}
-        teacher_intervals_to_avoid[teacher] = []
-        for const in details['Constrangeri']:
-            if const[0] != '!':
-                # Salvez zilele in care prefera sa predea
-                if const in input_data[DAYS]:
-                    teacher_preferences[teacher][const] = True
-            else:
-                const = const[1:]
-                # Salvez zilele in care prefera sa nu predea
-                if const in input_data[DAYS]:
-                    day = const
-                    teacher_preferences[teacher][day] = False
-                elif '-' in const:
-                    # Fac o lista cu intervalele in care prefera sa nu predea
-                    interval = parse_interval(const)
-                    if interval[0] != interval[1] - 2:
-                        intervals = [(i, i + 2) for i in range(interval[0], interval[1], 2)]
-                        for interval in intervals:
-                            teacher_intervals_to_avoid[teacher].append(str(interval))
-                    else:
-                        teacher_intervals_to_avoid[teacher].append(str(interval))
-
-def start(input_data, input_file):
-    # Initializez preferintele profesorilor in functie de datele de intrare
-    initialize_teacher_preferences(input_data)
-
-    # Setez seed random
-    random.seed(random.random())
-
-    start_time = time.time()
-    # Creez starea initiala
-    init_state = State(input_data)
-
-    # Rulez algoritmul
-    is_final, iter_num, num_states, final_state, init_state_conflicts = random_restart_hill_climbing(init_state, 50, 100)
-    end_time = time.time()
-
-    print("Initial state conflicts number: ", init_state_conflicts)
-    print("Execution time for hc:", end_time - start_time, "seconds")
-    print("Generated states " + str(num_states))
-    print("Final state conflicts " + str(final_state.conflicts_number))
-    print("Total iters ", iter_num)
+def restart_checkpoint(state, best_state, restarts, total_iters, total_states, init_state_conflicts):
+    # Starea random_restart_hill_climbing la inceputul unui restart: orarul de pornire al
+    # restart-ului, cea mai buna stare, contoarele si starea generatorului aleator
+    return {
+        'state': (state.schedule.data, state.conflicts_number),
+        'best': (best_state.schedule.data, best_state.conflicts_number),
+        'restarts': restarts,
+        'iters': total_iters,
+        'states': total_states,
+        'init_state_conflicts': init_state_conflicts,
+        'random': state.rng.getstate(),
+    }
+
+def restore_restarts(problem, checkpoint, rng=random):
+    # Operatia inversa lui restart_checkpoint; reface si starea generatorului aleator rng
+    rng.setstate(checkpoint['random'])
+    state = State(problem, Schedule(problem, checkpoint['state'][0]), checkpoint['state'][1], rng)
+    best_state = State(problem, Schedule(problem, checkpoint['best'][0]), checkpoint['best'][1], rng)
+    return (state, best_state, checkpoint['restarts'], checkpoint['iters'], checkpoint['states'],
+            checkpoint['init_state_conflicts'])
+
+def init_worker(problem, stop, updates=None):
+    # Initializarea unui proces din pool: problema compilata, primita o singura data,
+    # evenimentul prin care procesele isi semnaleaza ca s-a gasit o stare finala si coada
+    # (optionala) prin care isi trimit orarele mai bune procesului principal
+    global worker_problem
+    global worker_stop
+    global worker_updates
+
+    worker_problem = problem
+    worker_stop = stop
+    worker_updates = updates
+
+def restart_worker(worker, seed, max_restarts, run_max_iters, improvement, deadline):
+    # Restart-urile unui proces, cu un sir de numere aleatoare propriu, determinat de
+    # seed si de numarul procesului; orarul intors este buffer-ul celei mai bune stari
+    rng = random.Random(f'{seed}:{worker}')
+
+    init_state = State(worker_problem, rng=rng)
+    incumbent = IncumbentSender(worker_updates) if worker_updates is not None else None
+    is_final, iters, states, state, init_state_conflicts =\
+        random_restart_hill_climbing(init_state, max_restarts, run_max_iters, worker_stop, improvement,
+                                     deadline=deadline, incumbent=incumbent)
+
+    return is_final, iters, states, state.schedule.data, state.conflicts_number, init_state_conflicts
+
+def parallel_random_restart_hill_climbing(
+    problem: Problem,
+    max_restarts: int = 100,
+    run_max_iters: int = 100,
+    workers: int = 2,
+    seed: int = 0,
+    improvement: str = 'best',
+    deadline = None,
+    incumbent = None):
+
+    # Impart restart-urile intre procese; fiecare proces le ruleaza pe ale sale pe rand
+    restarts = [max_restarts // workers + (worker < max_restarts % workers) for worker in range(workers)]
+    tasks = [(worker, seed, restarts[worker], run_max_iters, improvement, deadline) for worker in range(workers) if restarts[worker]]
+
+    # Cu un tracker, procesele isi trimit orarele mai bune printr-o coada, iar procesul
+    # principal le anunta pe masura ce sosesc
+    stop = multiprocessing.Event()
+    updates = multiprocessing.Queue() if incumbent is not None else None
+    with multiprocessing.Pool(len(tasks), initializer=init_worker, initargs=(problem, stop, updates)) as pool:
+        pending = pool.starmap_async(restart_worker, tasks)
+        if incumbent is not None:
+            receive_incumbents(updates, incumbent, problem, pending)
+        results = pending.get()
+
+    # Adun iteratiile si starile tuturor proceselor si pastrez cea mai buna stare
+    total_iters = sum(result[1] for result in results)
+    total_states = sum(result[2] for result in results)
+    is_final, _, _, data, conflicts, init_state_conflicts = min(results, key=lambda result: result[4])
+
+    best_state = State(problem, Schedule(problem, data), conflicts)
+    if incumbent is not None:
+        incumbent.offer(best_state.schedule, best_state.conflicts_number)
+    return is_final, total_iters, total_states, best_state, init_state_conflicts
+
+def start(problem, workers=1, seed=None, improvement='best', profiler=None, time_limit=None, callback=None,
+          checkpoint=None):
+    # Cautarea este cea din biblioteca (solver.run_hill_climbing); aici raman doar mesajele
+    import solver
+
+    if checkpoint is not None and workers > 1:
+        print("Checkpoint-urile sunt disponibile doar pentru hc cu --workers 1")
+        checkpoint = None
+    if checkpoint is not None and checkpoint.resume and not checkpoint.exists():
+        print("Nu exista niciun checkpoint; cautarea porneste de la inceput")
+
+    result = solver.solve(problem, 'hc', time_limit=time_limit, seed=seed, workers=workers, callback=callback,
+                          improvement=improvement, profiler=profiler, checkpoint=checkpoint)
+
+    print("Initial state conflicts number: ", result.initial_conflicts)
+    print("Execution time for hc:", checkpoint.elapsed() if checkpoint is not None else result.solve_time, "seconds")
+    print("Generated states " + str(result.states))
+    print("Final state conflicts " + str(result.conflicts))
+    print("Total iters ", result.iterations)
     print("Result shedule:")
-    print(utils.pretty_print_timetable_aux_zile(final_state.schedule, input_file))
+    render.write_text(result.schedule, sys.stdout)
+    return result.schedule
+
+def add_arguments(parser):
+    # Optiunile liniei de comanda pentru hc (vezi orar.py)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Numarul de procese intre care se impart restart-urile hc (implicit 1)')
+    parser.add_argument('--improvement', choices=['best', 'first'], default='best',
+                        help='Mutarea aleasa de hc: cea mai buna dintre vecini sau prima care scade conflictele')
+    parser.add_argument('--time-limit', type=float, default=None,
+                        help='Timpul maxim de cautare al hc, in secunde (implicit fara limita)')
+
+def run(problem, args, profiler=None, callback=None, checkpoint=None):
+    if profiler is not None and args.workers > 1:
+        print("Raportul contine doar procesul principal; rulati cu --workers 1 pentru profilarea cautarii")
+    return start(problem, args.workers, args.seed, args.improvement, profiler, args.time_limit, callback, checkpoint)
@@ -1,26 +1,111 @@
-import sys
-import yaml
-import astar
-import hill_climbing
+import argparse
+import importlib
+import render
+from problem import load_problem
+
+# Modulul fiecarui algoritm, importat doar cand algoritmul este ales; fiecare modul are
+# add_arguments(parser), pentru optiunile proprii, si run(problem, args, profiler, callback, checkpoint)
+ALGORITHMS = {
+    'astar': 'astar',
+    'hc': 'hill_climbing',
+    'tabu': 'tabu_search',
+    'sa': 'simulated_annealing',
+    'exact': 'branch_and_bound',
+    'repair': 'repair',
+}
+
+# Algoritmii ale caror bucle de cautare pot fi profilate pe faze (--profile)
+PROFILED_ALGORITHMS = ('astar', 'hc')
+
+# Algoritmii care pot salva periodic starea cautarii si o pot relua (--checkpoint, --resume)
+CHECKPOINTED_ALGORITHMS = ('astar', 'hc')
+
+def build_parser(add_help=True):
+    # Fara add_help, parserul doar afla algoritmul: argumentele pozitionale devin optionale,
+    # iar --help si optiunile algoritmilor sunt lasate pentru parserul complet
+    positional = None if add_help else '?'
+
+    parser = argparse.ArgumentParser(description='Generarea unui orar cu A*, Hill Climbing, Tabu Search, Simulated Annealing sau Branch and Bound, '
+                                                 'ori repararea unui orar anterior',
+                                     epilog='Optiunile fiecarui algoritm: python orar.py <algoritm> <fisier> --help',
+                                     add_help=add_help)
+    parser.add_argument('algorithm', nargs=positional, choices=list(ALGORITHMS), help='Algoritmi: astar, hc, tabu, sa, exact, repair')
+    parser.add_argument('input_file', nargs=positional, help='Fisierul yaml de intrare')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Seed-ul generatorului aleator pentru hc, tabu, sa, exact si repair (implicit unul ales la intamplare)')
+    parser.add_argument('--output', metavar='FILE',
+                        help='Scrie orarul gasit si in fisierul dat, in formatul dat de --format')
+    parser.add_argument('--format', choices=sorted(render.FORMATS), default=None,
+                        help='Formatul fisierului --output: text, json sau csv (implicit dupa extensie)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Nu citeste si nu scrie fisierul cache cu problema compilata')
+    parser.add_argument('--progress', action='store_true',
+                        help='Afiseaza la stderr fiecare orar mai bun, cu conflictele si timpul scurs')
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help='Salveaza periodic starea cautarii astar sau hc in fisierul dat (sters la terminarea cautarii)')
+    parser.add_argument('--checkpoint-interval', type=float, default=None,
+                        help='Secundele dintre doua checkpoint-uri (implicit 5)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continua cautarea din fisierul --checkpoint, daca exista')
+    parser.add_argument('--profile', metavar='JSON',
+                        help='Cronometreaza fazele cautarii astar sau hc si scrie raportul json in fisierul dat')
+    parser.add_argument('--cprofile', metavar='PSTATS',
+                        help='Ruleaza algoritmul sub cProfile si salveaza statisticile pstats in fisierul dat')
+    return parser
 
 def main():
-    if len(sys.argv) != 3:
-        print("Mod de folosire: python orar.py <algorithm> <input_file>")
-        return
+    # Aflu intai algoritmul, apoi import doar modulul lui, care isi adauga optiunile
+    algorithm = build_parser(add_help=False).parse_known_args()[0].algorithm
+
+    parser = build_parser()
+    if algorithm is not None:
+        module = importlib.import_module(ALGORITHMS[algorithm])
+        module.add_arguments(parser.add_argument_group(f'optiunile algoritmului {algorithm}'))
+    args = parser.parse_args()
 
-    algorithm = sys.argv[1]
-    input_file = sys.argv[2]
+    # Extrag datele de intrare, compilate o singura data pentru fiecare continut al fisierului
+    problem = load_problem(args.input_file, cache=not args.no_cache)
 
-    # Extrag datele de intrare
-    with open(input_file, 'r') as file:
-        input_data = yaml.safe_load(file)
+    # Modulul de profilare se incarca doar la cerere
+    if args.profile or args.cprofile:
+        import profiling
 
-    if algorithm == "astar":
-        astar.start(input_data, input_file)
-    elif algorithm == "hc":
-        hill_climbing.start(input_data, input_file)
+    profiler = None
+    if args.profile:
+        if algorithm in PROFILED_ALGORITHMS:
+            profiler = profiling.Profiler()
+        else:
+            print("Profilarea pe faze este disponibila doar pentru astar si hc")
+
+    # Modulul checkpoint-urilor se incarca tot doar la cerere
+    checkpoint = None
+    if args.checkpoint:
+        if algorithm in CHECKPOINTED_ALGORITHMS:
+            from checkpoint import Checkpointer, CHECKPOINT_INTERVAL
+            interval = args.checkpoint_interval if args.checkpoint_interval is not None else CHECKPOINT_INTERVAL
+            checkpoint = Checkpointer(args.checkpoint, problem, algorithm, interval, args.resume)
+        else:
+            print("Checkpoint-urile sunt disponibile doar pentru astar si hc")
+    elif args.resume:
+        parser.error('--resume are nevoie de --checkpoint')
+
+    callback = None
+    if args.progress:
+        from anytime import print_incumbent
+        callback = print_incumbent
+
+    if args.cprofile:
+        schedule = profiling.run_cprofile(module.run, args.cprofile, problem, args, profiler, callback,
+                                          checkpoint)
     else:
-        print("Algoritmul nu exista. Algoritmi: astar, hc")
+        schedule = module.run(problem, args, profiler, callback, checkpoint)
+
+    if args.output and schedule is not None:
+        render.export(schedule, args.output, args.format)
+
+    if profiler is not None:
+        profiler.print_report()
+        profiler.dump(args.profile)
 
 if __name__ == "__main__":
     main()
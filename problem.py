@@ -0,0 +1,300 @@
+import hashlib
+import os
+import pickle
+import yaml
+import numpy as np
+from utils import YAML_LOADER
+
+INTERVALS = 'Intervale'
+DAYS = 'Zile'
+SUBJECTS = 'Materii'
+TEACHERS = 'Profesori'
+CLASSROOMS = 'Sali'
+CAPACITY = 'Capacitate'
+CONSTRAINTS = 'Constrangeri'
+
+MAX_TEACHER_HOURS = 7
+
+# Numarul de momente (zi, interval) codificate intr-un cuvant din mastile de ocupare ale
+# profesorilor; buffer-ul orarului are elemente 'i' cu semn, deci bitul 31 nu se foloseste
+BUSY_BITS = 31
+
+MASK64 = (1 << 64) - 1
+
+# Fisierul cache al unei intrari se afla langa ea, cu extensia de mai jos. Antetul lui
+# contine versiunea formatului si hash-ul continutului fisierului yaml; versiunea trebuie
+# crescuta la orice schimbare a atributelor lui Problem, ca vechile cache-uri sa fie ignorate
+CACHE_SUFFIX = '.problem'
+CACHE_VERSION = 2
+
+
+def splitmix64(x: int) -> int:
+    # Amesteca bitii unui intreg pe 64 de biti (finalizatorul SplitMix64)
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+def parse_interval_key(interval) -> tuple:
+    '''
+    Primeste un interval fie ca tuplu (8, 10), fie ca string-ul "(8, 10)" din fisierul yaml
+
+    Returneaza tuplul de int-uri corespunzator, fara a folosi eval()
+    '''
+
+    if isinstance(interval, tuple):
+        return interval
+
+    start, end = interval.strip('() ').split(',')
+    return int(start), int(end)
+
+
+class Problem:
+    '''
+    Modelul compilat al unui fisier de intrare: zilele, intervalele, salile, profesorii si
+    materiile primesc id-uri intregi (pozitia lor in fisierul yaml), iar relatiile dintre ele
+    sunt tinute in vectori si matrici NumPy.
+
+    Pentru accesul scalar din buclele solverelor se pastreaza si liste Python echivalente,
+    indexarea unui element dintr-un ndarray fiind mai lenta decat intr-o lista.
+    '''
+
+    def __init__(self, input_data: dict) -> None:
+        self.days = list(input_data[DAYS])
+        self.intervals = list(input_data[INTERVALS])
+        self.classrooms = list(input_data[CLASSROOMS])
+        self.teachers = list(input_data[TEACHERS])
+        self.subjects = list(input_data[SUBJECTS])
+
+        self.day_ids = {day: i for i, day in enumerate(self.days)}
+        self.interval_ids = {interval: i for i, interval in enumerate(self.intervals)}
+        self.classroom_ids = {classroom: i for i, classroom in enumerate(self.classrooms)}
+        self.teacher_ids = {teacher: i for i, teacher in enumerate(self.teachers)}
+        self.subject_ids = {subject: i for i, subject in enumerate(self.subjects)}
+
+        # Intervalele pot fi cautate si dupa tuplul (start, end) folosit de check_constraints
+        for interval, i in list(self.interval_ids.items()):
+            self.interval_ids[parse_interval_key(interval)] = i
+
+        self.num_days = len(self.days)
+        self.num_intervals = len(self.intervals)
+        self.num_classrooms = len(self.classrooms)
+        self.num_teachers = len(self.teachers)
+        self.num_subjects = len(self.subjects)
+
+        # Capacitatea salilor si numarul de studenti de acoperit pentru fiecare materie
+        self.classroom_capacity = np.array([input_data[CLASSROOMS][c][CAPACITY] for c in self.classrooms], dtype=np.int64)
+        self.subject_students = np.array([input_data[SUBJECTS][s] for s in self.subjects], dtype=np.int64)
+
+        # Matrici de eligibilitate profesor x materie si sala x materie
+        self.teacher_subject = np.zeros((self.num_teachers, self.num_subjects), dtype=bool)
+        for t, teacher in enumerate(self.teachers):
+            for subject in input_data[TEACHERS][teacher][SUBJECTS]:
+                if subject in self.subject_ids:
+                    self.teacher_subject[t, self.subject_ids[subject]] = True
+
+        self.classroom_subject = np.zeros((self.num_classrooms, self.num_subjects), dtype=bool)
+        for c, classroom in enumerate(self.classrooms):
+            for subject in input_data[CLASSROOMS][classroom][SUBJECTS]:
+                if subject in self.subject_ids:
+                    self.classroom_subject[c, self.subject_ids[subject]] = True
+
+        # Preferintele profesorilor, compilate in penalizari: zilele (profesor x zi) si
+        # intervalele (profesor x interval) in care fiecare profesor prefera sa nu predea
+        self.teacher_day_penalty = np.zeros((self.num_teachers, self.num_days), dtype=np.int64)
+        self.teacher_interval_penalty = np.zeros((self.num_teachers, self.num_intervals), dtype=np.int64)
+        for t, teacher in enumerate(self.teachers):
+            for constraint in input_data[TEACHERS][teacher][CONSTRAINTS]:
+                if constraint[0] != '!':
+                    continue
+
+                constraint = constraint[1:]
+                if constraint in self.day_ids:
+                    self.teacher_day_penalty[t, self.day_ids[constraint]] = 1
+                elif '-' in constraint:
+                    # Un interval mai lung, de exemplu 10-16, acopera intervalele de cate 2 ore din el
+                    start, end = (int(hour) for hour in constraint.split('-'))
+                    for hour in range(start, end, 2):
+                        if (hour, hour + 2) in self.interval_ids:
+                            self.teacher_interval_penalty[t, self.interval_ids[(hour, hour + 2)]] = 1
+
+        # Oglinzi Python ale datelor de mai sus
+        self.capacity = self.classroom_capacity.tolist()
+        self.students = self.subject_students.tolist()
+        self.can_teach = self.teacher_subject.tolist()
+        self.can_host = self.classroom_subject.tolist()
+        self.subject_teachers = [np.flatnonzero(self.teacher_subject[:, s]).tolist() for s in range(self.num_subjects)]
+        self.teacher_subjects = [np.flatnonzero(self.teacher_subject[t]).tolist() for t in range(self.num_teachers)]
+        self.subject_classrooms = [np.flatnonzero(self.classroom_subject[:, s]).tolist() for s in range(self.num_subjects)]
+        self.classroom_subjects = [np.flatnonzero(self.classroom_subject[c]).tolist() for c in range(self.num_classrooms)]
+
+        # Sloturile orarului: slot = (zi * nr_intervale + interval) * nr_sali + sala,
+        # iar momentul (zi, interval) al unui slot este time = zi * nr_intervale + interval
+        self.num_times = self.num_days * self.num_intervals
+        self.num_slots = self.num_times * self.num_classrooms
+        self.slot_time = [slot // self.num_classrooms for slot in range(self.num_slots)]
+        self.slot_day = [time // self.num_intervals for time in self.slot_time]
+        self.slot_interval = [time % self.num_intervals for time in self.slot_time]
+        self.slot_classroom = [slot % self.num_classrooms for slot in range(self.num_slots)]
+
+        # Asignarile (profesor, materie) sunt codificate ca id = profesor * nr_materii + materie + 1,
+        # 0 insemnand sala goala
+        self.num_assignments = self.num_teachers * self.num_subjects + 1
+        self.assignment_teacher = [-1] + [a // self.num_subjects for a in range(self.num_assignments - 1)]
+        self.assignment_subject = [-1] + [a % self.num_subjects for a in range(self.num_assignments - 1)]
+
+        # Asezarea datelor in buffer-ul unui schedule.Schedule: sloturile, orele profesorilor,
+        # acoperirea materiilor si mastile de ocupare (busy_words cuvinte pentru fiecare profesor)
+        self.busy_words = (self.num_times + BUSY_BITS - 1) // BUSY_BITS
+        self.hours_offset = self.num_slots
+        self.coverage_offset = self.hours_offset + self.num_teachers
+        self.busy_offset = self.coverage_offset + self.num_subjects
+        self.schedule_size = self.busy_offset + self.num_teachers * self.busy_words
+        self.time_word = [time // BUSY_BITS for time in range(self.num_times)]
+        self.time_mask = [1 << (time % BUSY_BITS) for time in range(self.num_times)]
+
+        # Variante NumPy ale tabelelor de mai sus, pentru calculele vectorizate
+        self.slot_time_array = np.array(self.slot_time, dtype=np.int64)
+        self.slot_classroom_array = np.array(self.slot_classroom, dtype=np.int64)
+        self.assignment_teacher_array = np.array(self.assignment_teacher, dtype=np.int64)
+        self.assignment_subject_array = np.array(self.assignment_subject, dtype=np.int64)
+        self.time_word_array = np.array(self.time_word, dtype=np.int64)
+        self.time_mask_array = np.array(self.time_mask, dtype=np.intc)
+
+        # Conflictele soft ale fiecarui profesor pentru fiecare moment (zi, interval)
+        self.teacher_time_penalty = (self.teacher_day_penalty[:, :, None]
+                                     + self.teacher_interval_penalty[:, None, :]).reshape(self.num_teachers, self.num_times)
+        self.teacher_time_conflicts = self.teacher_time_penalty.tolist()
+
+        # Cea mai mare sala in care se poate preda fiecare materie (0 daca nu exista niciuna)
+        self.subject_max_capacity = [max((self.capacity[c] for c in self.subject_classrooms[s]), default=0)
+                                     for s in range(self.num_subjects)]
+
+        # Capacitatea totala a sloturilor de la k pana la final in care se poate preda fiecare
+        # materie, folosita ca sa taie ramurile in care studentii ramasi nu mai incap
+        self.suffix_capacity = []
+        for subject in range(self.num_subjects):
+            suffix = [0] * (self.num_slots + 1)
+            for slot in range(self.num_slots - 1, -1, -1):
+                classroom = self.slot_classroom[slot]
+                suffix[slot] = suffix[slot + 1] + (self.capacity[classroom] if self.can_host[classroom][subject] else 0)
+            self.suffix_capacity.append(suffix)
+
+    def classes_needed(self, subject: int, students: int) -> int:
+        '''
+        Margine inferioara pentru numarul de clase necesare ca sa acopere studentii ramasi ai
+        materiei: fiecare clasa are cel mult capacitatea celei mai mari sali eligibile.
+        O materie fara sali eligibile are nevoie de mai multe clase decat sloturi exista.
+        '''
+
+        if students <= 0:
+            return 0
+        max_capacity = self.subject_max_capacity[subject]
+        if not max_capacity:
+            return self.num_slots + 1
+        return -(-students // max_capacity)
+
+    def slot(self, day: int, interval: int, classroom: int) -> int:
+        return (day * self.num_intervals + interval) * self.num_classrooms + classroom
+
+    def assignment_id(self, teacher: int, subject: int) -> int:
+        return teacher * self.num_subjects + subject + 1
+
+    def zobrist_key(self, slot: int, assignment: int) -> int:
+        '''
+        Cheia Zobrist pe 64 de biti a asignarii date in slotul dat. Amprenta unui orar este
+        XOR-ul cheilor asignarilor sale, deci se actualizeaza in O(1) la fiecare asezare.
+
+        Cheile sunt derivate determinist din pereche, fara un tabel slot x asignare in memorie.
+        '''
+
+        return splitmix64(slot * self.num_assignments + assignment)
+
+    def assignments_from_timetable(self, timetable: dict) -> list:
+        '''
+        Primeste un orar sub forma de dictionar {zi : {interval : {sala : (profesor, materie)}}}
+
+        Returneaza lista asignarilor sale ca tupluri de id-uri (zi, interval, sala, profesor, materie)
+        '''
+
+        assignments = []
+        for day, intervals in timetable.items():
+            d = self.day_ids[day]
+            for interval, classrooms in intervals.items():
+                i = self.interval_ids[interval]
+                for classroom, assignment in classrooms.items():
+                    if assignment:
+                        teacher, subject = assignment
+                        assignments.append((d, i, self.classroom_ids[classroom],
+                                            self.teacher_ids[teacher], self.subject_ids[subject]))
+        return assignments
+
+    def timetable_from_assignments(self, assignments) -> dict:
+        '''
+        Operatia inversa lui assignments_from_timetable: construieste orarul cu numele din fisierul
+        de intrare, in formatul asteptat de utils.pretty_print_timetable
+        '''
+
+        timetable = {day: {interval: {classroom: None for classroom in self.classrooms}
+                     for interval in self.intervals} for day in self.days}
+
+        for day, interval, classroom, teacher, subject in assignments:
+            timetable[self.days[day]][self.intervals[interval]][self.classrooms[classroom]] =\
+                (self.teachers[teacher], self.subjects[subject])
+
+        return timetable
+
+
+def compile_problem(input_data: dict) -> Problem:
+    '''
+    Primeste dictionarul citit din fisierul yaml de intrare
+
+    Returneaza modelul compilat cu id-uri intregi folosit de solvere si de check_constraints
+    '''
+
+    return Problem(input_data)
+
+def cache_header(content: bytes) -> bytes:
+    # Antetul cache-ului: versiunea formatului si hash-ul continutului fisierului de intrare
+    return b'orar %d %s\n' % (CACHE_VERSION, hashlib.blake2b(content, digest_size=16).hexdigest().encode())
+
+def load_problem(input_file: str, cache: bool = True) -> Problem:
+    '''
+    Primeste calea unui fisier yaml de intrare
+
+    Returneaza modelul compilat. Cu cache, modelul este salvat binar (pickle) langa fisierul
+    de intrare (input_file + CACHE_SUFFIX), iar urmatoarele incarcari ale aceluiasi continut
+    il citesc direct, fara parsarea yaml si fara compilare. Cache-ul este ignorat si rescris
+    daca fisierul de intrare s-a schimbat sau daca a fost scris de alta versiune
+    '''
+
+    with open(input_file, 'rb') as file:
+        content = file.read()
+
+    cache_file = input_file + CACHE_SUFFIX
+    header = cache_header(content)
+    if cache:
+        try:
+            with open(cache_file, 'rb') as file:
+                if file.readline() == header:
+                    return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass
+
+    problem = compile_problem(yaml.load(content, Loader=YAML_LOADER))
+
+    # Scriu cache-ul intr-un fisier temporar, mutat apoi atomic peste cel vechi; un director
+    # fara drept de scriere doar dezactiveaza cache-ul
+    if cache:
+        temporary_file = f'{cache_file}.{os.getpid()}.tmp'
+        try:
+            with open(temporary_file, 'wb') as file:
+                file.write(header)
+                pickle.dump(problem, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_file, cache_file)
+        except OSError:
+            if os.path.exists(temporary_file):
+                os.remove(temporary_file)
+
+    return problem
@@ -0,0 +1,87 @@
+import cProfile
+import json
+import sys
+import time
+
+# Numarul de functii afisate din raportul cProfile
+CPROFILE_LINES = 25
+
+class Profiler:
+    '''
+    Contoare si cronometre pentru fazele buclelor de cautare (astar, ida_star, hill_climbing,
+    random_restart_hill_climbing). Cautarile primesc un Profiler optional; fara el, singurul
+    cost ramas este cate un test `profiler is not None` pe iteratie.
+
+    Functiile apelate des (euristica, generarea succesorilor, operatiile frontierei) sunt
+    inlocuite, doar cand profilarea este pornita, cu variante cronometrate (vezi timed), asa
+    ca buclele interioare raman neschimbate
+    '''
+
+    __slots__ = ('calls', 'times', 'counters', 'start_time')
+
+    def __init__(self) -> None:
+        self.calls = {}
+        self.times = {}
+        self.counters = {}
+        self.start_time = time.perf_counter()
+
+    def record(self, phase, start, calls=1):
+        # Adauga la faza timpul scurs de la start; intoarce momentul curent, ca inceput al
+        # fazei urmatoare
+        now = time.perf_counter()
+        self.times[phase] = self.times.get(phase, 0.0) + now - start
+        self.calls[phase] = self.calls.get(phase, 0) + calls
+        return now
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def timed(self, phase, function):
+        # Varianta cronometrata a unei functii
+        record = self.record
+        clock = time.perf_counter
+
+        def timed_function(*args):
+            start = clock()
+            result = function(*args)
+            record(phase, start)
+            return result
+
+        return timed_function
+
+    def report(self):
+        # Timpul total, timpul si numarul de apeluri ale fiecarei faze, ponderea ei din
+        # timpul total si contoarele; restul timpului este trecut la other
+        total = time.perf_counter() - self.start_time
+        phases = {phase: {'calls': self.calls[phase], 'time': self.times[phase],
+                          'share': self.times[phase] / total if total else 0.0}
+                  for phase in sorted(self.times, key=self.times.get, reverse=True)}
+        other = max(total - sum(self.times.values()), 0.0)
+        phases['other'] = {'calls': None, 'time': other, 'share': other / total if total else 0.0}
+        return {'total_time': total, 'phases': phases, 'counters': dict(self.counters)}
+
+    def dump(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.report(), file, indent=2)
+
+    def print_report(self, file=sys.stderr):
+        report = self.report()
+        print(f"Profile ({report['total_time']:.3f}s):", file=file)
+        for phase, row in report['phases'].items():
+            calls = row['calls'] if row['calls'] is not None else '-'
+            print(f"  {phase:<20} {row['time']:>9.3f}s {100 * row['share']:>6.1f}% {calls:>12}", file=file)
+        for name, value in report['counters'].items():
+            print(f"  {name:<20} {value:>12}", file=file)
+
+def run_cprofile(function, path, *args, **kwargs):
+    # Ruleaza functia sub cProfile, salveaza statisticile in path (pentru pstats sau
+    # snakeviz) si afiseaza functiile cu cel mai mare timp cumulat; pstats este lent de
+    # importat, asa ca se incarca doar aici
+    import pstats
+
+    profile = cProfile.Profile()
+    try:
+        return profile.runcall(function, *args, **kwargs)
+    finally:
+        profile.dump_stats(path)
+        pstats.Stats(profile, stream=sys.stderr).sort_stats('cumulative').print_stats(CPROFILE_LINES)
@@ -0,0 +1,149 @@
+import csv
+import io
+import json
+from problem import Problem, parse_interval_key
+from schedule import Schedule
+from utils import get_profs_initials, allign_string_with_spaces
+
+# Latimea unei coloane din tabelul text
+CELL_WIDTH = 30
+
+# Coloanele exporturilor csv
+CSV_FIELDS = ('day', 'interval', 'classroom', 'teacher', 'subject')
+
+class TimetableRenderer:
+    '''
+    Scrie orarul unei probleme in formatul text al lui utils.pretty_print_timetable (o linie
+    pe interval si sala, o coloana pe zi), direct intr-un stream.
+
+    Antetul, delimitatorul, etichetele intervalelor, celulele salilor goale si initialele
+    profesorilor sunt calculate o singura data pentru problema; celulele ocupate sunt tinute
+    intr-un cache dupa (asignare, sala), asa ca randarea unui orar doar le concateneaza
+    '''
+
+    __slots__ = ('problem', 'initials', 'header', 'delimiter', 'interval_cells', 'blank_cell', 'empty_cells', 'cells')
+
+    def __init__(self, problem: Problem) -> None:
+        self.problem = problem
+
+        prof_to_initials, _ = get_profs_initials(problem.teachers)
+        self.initials = [prof_to_initials[teacher] for teacher in problem.teachers]
+
+        columns = ['Interval'] + problem.days
+        self.header = '|' + '|'.join(allign_string_with_spaces(column, CELL_WIDTH, 'center') for column in columns) + '|\n'
+        self.delimiter = '-' * (1 + (CELL_WIDTH + 1) * len(columns)) + '\n'
+
+        self.interval_cells = []
+        for interval in problem.intervals:
+            start, end = parse_interval_key(interval)
+            self.interval_cells.append(allign_string_with_spaces(f'{start} - {end}', CELL_WIDTH, 'center'))
+        self.blank_cell = ' ' * CELL_WIDTH
+
+        self.empty_cells = [allign_string_with_spaces(f'{classroom} - goala', CELL_WIDTH, 'left')
+                            for classroom in problem.classrooms]
+        self.cells = {}
+
+    def cell(self, assignment, classroom):
+        # Celula unei sale ocupate: materie, sala si initialele profesorului
+        key = assignment * self.problem.num_classrooms + classroom
+        cell = self.cells.get(key)
+        if cell is None:
+            problem = self.problem
+            teacher, subject = problem.assignment_teacher[assignment], problem.assignment_subject[assignment]
+            cell = allign_string_with_spaces(f'{problem.subjects[subject]} : ({problem.classrooms[classroom]} - '
+                                             f'{self.initials[teacher]})', CELL_WIDTH, 'left')
+            self.cells[key] = cell
+        return cell
+
+    def write(self, schedule: Schedule, stream) -> None:
+        problem = self.problem
+        slots = schedule.data
+        num_classrooms = problem.num_classrooms
+        day_stride = problem.num_intervals * num_classrooms
+
+        stream.write(self.header)
+        stream.write(self.delimiter)
+        for interval in range(problem.num_intervals):
+            lines = []
+            for classroom in range(num_classrooms):
+                row = [self.interval_cells[interval] if classroom == 0 else self.blank_cell]
+                slot = interval * num_classrooms + classroom
+                for _ in range(problem.num_days):
+                    assignment = slots[slot]
+                    row.append(self.cell(assignment, classroom) if assignment else self.empty_cells[classroom])
+                    slot += day_stride
+                lines.append('|' + '|'.join(row) + '|\n')
+            stream.write(''.join(lines))
+            stream.write(self.delimiter)
+
+    def render(self, schedule: Schedule) -> str:
+        stream = io.StringIO()
+        self.write(schedule, stream)
+        return stream.getvalue()
+
+def schedule_records(schedule: Schedule):
+    # Asignarile orarului cu numele din fisierul de intrare, in ordinea (zi, interval, sala)
+    problem = schedule.problem
+    for day, interval, classroom, teacher, subject in sorted(schedule.assignments()):
+        yield {
+            'day': problem.days[day],
+            'interval': problem.intervals[interval],
+            'classroom': problem.classrooms[classroom],
+            'teacher': problem.teachers[teacher],
+            'subject': problem.subjects[subject],
+        }
+
+def write_json(schedule: Schedule, stream) -> None:
+    '''
+    Scrie orarul ca json: zilele, intervalele si salile problemei si lista asignarilor
+    (zi, interval, sala, profesor, materie); salile goale nu apar in lista
+    '''
+
+    problem = schedule.problem
+    json.dump({
+        'days': problem.days,
+        'intervals': problem.intervals,
+        'classrooms': problem.classrooms,
+        'assignments': list(schedule_records(schedule)),
+    }, stream, indent=2, ensure_ascii=False)
+    stream.write('\n')
+
+def write_csv(schedule: Schedule, stream) -> None:
+    # O linie pentru fiecare sala ocupata, cu antetul CSV_FIELDS
+    writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS, lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(schedule_records(schedule))
+
+def write_text(schedule: Schedule, stream) -> None:
+    TimetableRenderer(schedule.problem).write(schedule, stream)
+
+# Formatele in care poate fi scris un orar
+FORMATS = {
+    'text': write_text,
+    'json': write_json,
+    'csv': write_csv,
+}
+
+def export(schedule: Schedule, path: str, format: str | None = None) -> None:
+    # Scrie orarul in fisier; fara format, acesta se deduce din extensie (implicit text)
+    if format is None:
+        extension = path.rsplit('.', 1)[-1].lower()
+        format = extension if extension in FORMATS else 'text'
+    with open(path, 'w', newline='' if format == 'csv' else None, encoding='utf-8') as file:
+        FORMATS[format](schedule, file)
+
+def read_json(problem: Problem, path: str) -> Schedule:
+    '''
+    Operatia inversa lui write_json: citeste asignarile dintr-un fisier json si intoarce
+    orarul problemei date
+    '''
+
+    with open(path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+
+    schedule = Schedule(problem)
+    for record in data['assignments']:
+        slot = problem.slot(problem.day_ids[record['day']], problem.interval_ids[record['interval']],
+                            problem.classroom_ids[record['classroom']])
+        schedule.assign(slot, problem.teacher_ids[record['teacher']], problem.subject_ids[record['subject']])
+    return schedule
@@ -0,0 +1,205 @@
+import json
+import random
+import time
+import sys
+from collections import defaultdict
+import numpy as np
+import render
+from check_constraints import parse_interval, parse_subject_room_prof, PROFESORI
+from problem import Problem, MAX_TEACHER_HOURS, parse_interval_key
+from utils import get_profs_initials, read_yaml_file
+from schedule import Schedule
+from construct import build_schedule
+from hill_climbing import State
+from tabu_search import tabu_search, TABU_TENURE
+
+# Timpul maxim al reparatiei, in secunde; prima jumatate este folosita doar pentru clasele
+# reasezate, restul (daca mai sunt conflicte) pentru tot orarul
+TIME_LIMIT = 10
+
+def read_previous_text(path: str, initials_to_prof: dict):
+    '''
+    Citeste clasele (zi, interval, sala, profesor, materie) dintr-un tabel text din outputs/
+    sau refs/. Zilele sunt cele din antetul tabelului, nu cele ale problemei noi, iar
+    initialele care nu apar in initials_to_prof dau profesorul None
+    '''
+
+    # Initialele necunoscute (profesori scosi din intrare) nu opresc citirea
+    nick_to_prof = defaultdict(type(None), initials_to_prof)
+    days, interval = [], None
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            if line[0] != '|':
+                continue
+
+            cells = [cell.strip() for cell in line.strip().split('|')][1:-1]
+            if cells[0] == 'Interval':
+                days = cells[1:]
+                continue
+            if cells[0]:
+                interval = parse_interval(cells[0])
+
+            for day, cell in zip(days, cells[1:]):
+                subject, room, prof = parse_subject_room_prof(cell, nick_to_prof)
+                if subject:
+                    yield day, interval, room, prof, subject
+
+def read_previous_json(path: str):
+    # Clasele unui export json (render.write_json), cu numele din intrarea anterioara
+    with open(path, 'r', encoding='utf-8') as file:
+        for record in json.load(file)['assignments']:
+            yield record['day'], record['interval'], record['classroom'], record['teacher'], record['subject']
+
+def load_previous(problem: Problem, path: str, previous_teachers=None):
+    '''
+    Citeste un orar anterior (tabelul text din outputs/ sau refs/, ori un export json) si il
+    aseaza pe datele problemei noi.
+
+    Tabelul text retine doar initialele profesorilor, calculate (vezi utils.get_profs_initials)
+    din lista profesorilor intrarii anterioare; previous_teachers este aceasta lista, iar
+    fara ea initialele sunt cautate printre profesorii problemei noi.
+
+    Returneaza orarul si numarul claselor care nu mai exista in problema (zi, interval,
+    sala, profesor sau materie disparute)
+    '''
+
+    if path.endswith('.json'):
+        records = read_previous_json(path)
+    else:
+        _, initials_to_prof = get_profs_initials(previous_teachers if previous_teachers is not None else problem.teachers)
+        records = read_previous_text(path, initials_to_prof)
+
+    schedule = Schedule(problem)
+    dropped = 0
+    for day, interval, classroom, teacher, subject in records:
+        ids = (problem.day_ids.get(day), problem.interval_ids.get(parse_interval_key(interval)),
+               problem.classroom_ids.get(classroom), problem.teacher_ids.get(teacher), problem.subject_ids.get(subject))
+        if None in ids:
+            dropped += 1
+            continue
+        schedule.assign(problem.slot(*ids[:3]), ids[3], ids[4])
+    return schedule, dropped
+
+def read_previous_teachers(path: str):
+    # Profesorii fisierului de intrare anterior, in ordinea din care se calculeaza initialele
+    return list(read_yaml_file(path)[PROFESORI])
+
+def affected_slots(problem: Problem, schedule: Schedule):
+    '''
+    Sloturile ale caror clase incalca o constrangere a problemei noi: profesorul nu poate
+    preda materia, materia nu se poate preda in sala, profesorul are alta clasa in acelasi
+    interval sau mai mult de 7 ore, ori o preferinta a profesorului este incalcata
+    '''
+
+    slots = schedule.data
+    affected = set()
+    teacher_times = {}
+    for slot in range(problem.num_slots):
+        assignment = slots[slot]
+        if not assignment:
+            continue
+
+        teacher, subject = problem.assignment_teacher[assignment], problem.assignment_subject[assignment]
+        time = problem.slot_time[slot]
+        if not problem.can_teach[teacher][subject]\
+            or not problem.can_host[problem.slot_classroom[slot]][subject]\
+            or schedule.hours(teacher) > MAX_TEACHER_HOURS\
+            or problem.teacher_time_conflicts[teacher][time]:
+            affected.add(slot)
+        teacher_times.setdefault((teacher, time), []).append(slot)
+
+    for same_time in teacher_times.values():
+        if len(same_time) > 1:
+            affected.update(same_time)
+    return sorted(affected)
+
+def changed_slots(previous: Schedule, schedule: Schedule):
+    # Numarul sloturilor in care orarul reparat difera de cel anterior
+    num_slots = schedule.problem.num_slots
+    return int(np.count_nonzero(np.frombuffer(previous.data, dtype=np.intc)[:num_slots]
+                                != np.frombuffer(schedule.data, dtype=np.intc)[:num_slots]))
+
+def repair(problem: Problem, previous: Schedule, time_limit: float = TIME_LIMIT, tenure: int = TABU_TENURE,
+           incumbent=None, rng=random):
+    '''
+    Repara un orar anterior pentru problema schimbata, modificand cat mai putine clase:
+    - clasele din sloturile afectate (vezi affected_slots) sunt scoase din orar
+    - orarul partial este completat de construct.py, fara a muta clasele ramase
+    - daca raman conflicte soft, cautarea tabu muta doar clasele reasezate, in prima
+      jumatate a timpului, iar apoi, daca este nevoie, toate clasele
+
+    Daca orarul partial nu mai poate fi completat, se construieste unul nou si se repara
+    cu tabu pe tot orarul.
+
+    Returneaza cea mai buna stare si un dictionar cu clasele afectate, iteratiile si
+    starile evaluate ale cautarii tabu si daca a fost nevoie de un orar nou
+    '''
+
+    start_time = time.time()
+    affected = affected_slots(problem, previous)
+
+    partial = previous.clone()
+    for slot in affected:
+        partial.unassign(slot)
+
+    # Completez orarul partial; clasele pastrate raman fixe in prima faza a cautarii
+    schedule = build_schedule(problem, initial=partial, rng=rng)
+    rebuilt = any(schedule.coverage(subject) < problem.students[subject] for subject in range(problem.num_subjects))
+    if rebuilt:
+        schedule = build_schedule(problem, rng=rng)
+        fixed = None
+    else:
+        fixed = np.frombuffer(partial.data, dtype=np.intc)[:problem.num_slots] != 0
+
+    state = State(problem, schedule, rng=rng)
+    if incumbent is not None:
+        incumbent.offer(state.schedule, state.conflicts_number)
+
+    iters, states = 0, 0
+    if fixed is not None and not state.is_final():
+        time_left = start_time + time_limit / 2 - time.time()
+        _, iters, states, state = tabu_search(state, max(time_left, 0), tenure, incumbent=incumbent, fixed=fixed)
+
+    if not state.is_final():
+        time_left = start_time + time_limit - time.time()
+        _, more_iters, more_states, state = tabu_search(state, max(time_left, 0), tenure, incumbent=incumbent)
+        iters += more_iters
+        states += more_states
+
+    return state, {'affected': len(affected), 'iterations': iters, 'states': states, 'rebuilt': rebuilt}
+
+def start(problem, previous_file, time_limit=TIME_LIMIT, tenure=TABU_TENURE, seed=None, callback=None,
+          previous_input=None):
+    # Reparatia este cea din biblioteca (solver.run_repair); aici raman doar mesajele
+    import solver
+
+    result = solver.solve(problem, 'repair', time_limit=time_limit, seed=seed, callback=callback,
+                          previous=previous_file, tenure=tenure, previous_input=previous_input)
+
+    print("Previous timetable conflicts: ", result.initial_conflicts)
+    print("Dropped classes " + str(result.details['dropped']))
+    print("Affected classes " + str(result.details['affected']))
+    if result.details['rebuilt']:
+        print("Orarul anterior nu a putut fi completat; a fost construit un orar nou")
+    print("Changed slots " + str(result.details['changed']))
+    print("Execution time for repair:", result.solve_time, "seconds")
+    print("Final state conflicts " + str(result.conflicts))
+    print("Total iters ", result.iterations)
+    print("Result shedule:")
+    render.write_text(result.schedule, sys.stdout)
+    return result.schedule
+
+def add_arguments(parser):
+    # Optiunile liniei de comanda pentru repair (vezi orar.py)
+    parser.add_argument('--previous', metavar='FILE', required=True,
+                        help='Orarul anterior (tabel text din outputs/ sau refs/ ori export json) de la care porneste reparatia')
+    parser.add_argument('--previous-input', metavar='FILE',
+                        help='Fisierul yaml din care a fost calculat orarul anterior; initialele profesorilor din '
+                             'tabelul text sunt rezolvate dupa profesorii lui (implicit dupa cei ai intrarii noi)')
+    parser.add_argument('--time-limit', type=float, default=TIME_LIMIT,
+                        help='Timpul maxim al reparatiei in secunde')
+    parser.add_argument('--tenure', type=int, default=TABU_TENURE,
+                        help='Numarul de iteratii in care o mutare inversa este tabu')
+
+def run(problem, args, profiler=None, callback=None, checkpoint=None):
+    return start(problem, args.previous, args.time_limit, args.tenure, args.seed, callback, args.previous_input)
@@ -0,0 +1,90 @@
+import argparse
+import os
+import solver
+from render import TimetableRenderer
+
+# Numarul implicit de rulari dintr-un raport si directorul in care se scriu rapoartele
+RUNS = 20
+OUTPUT_DIR = 'plot_results_hc'
+
+def write_log(results, stream) -> None:
+    # Jurnalul rularilor, in formatul fisierelor din plot_results_hc/
+    renderer = None
+    for run, result in enumerate(results, start=1):
+        stream.write(f'Run {run}:\n')
+        stream.write(f'Number of States Generated: {result.states}\n')
+        stream.write(f'Execution Time: {result.solve_time}\n')
+        stream.write(f'Iteration Number: {result.iterations}\n')
+        stream.write(f'Final State Conflicts: {result.conflicts}\n')
+        stream.write(f'Initial state conflicts number: {result.initial_conflicts}\n')
+        stream.write('Result shedule: \n')
+        if result.schedule is not None:
+            if renderer is None:
+                renderer = TimetableRenderer(result.schedule.problem)
+            renderer.write(result.schedule, stream)
+        stream.write('\n\n')
+
+def plot_results(results, path: str) -> None:
+    '''
+    Deseneaza, pentru fiecare rulare, starile generate, timpul de executie, numarul de
+    iteratii si conflictele starii initiale si finale, ca in plot_results_hc/
+
+    matplotlib se importa doar aici, ca solverele si orar.py sa nu plateasca incarcarea lui
+    '''
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    runs = range(len(results))
+    figure, axes = plt.subplots(2, 2, figsize=(10, 6))
+
+    panels = [
+        (axes[0][0], 'Number of States Generated', [result.states for result in results]),
+        (axes[0][1], 'Execution Time', [result.solve_time for result in results]),
+        (axes[1][0], 'Iteration Number', [result.iterations for result in results]),
+    ]
+    for axis, title, values in panels:
+        axis.plot(runs, values, marker='o')
+        axis.set_title(title)
+
+    axis = axes[1][1]
+    axis.plot(runs, [result.conflicts for result in results], marker='o')
+    axis.plot(runs, [result.initial_conflicts for result in results], marker='o')
+    axis.set_title('Initial State Conflicts\\ Final State Conflicts')
+
+    figure.tight_layout()
+    figure.savefig(path)
+    plt.close(figure)
+
+def report(input_file: str, algorithm: str = 'hc', runs: int = RUNS, output_dir: str = OUTPUT_DIR, **options):
+    # Ruleaza algoritmul de runs ori (seed-urile 0..runs-1) si scrie jurnalul si graficul
+    problem = solver.load_problem(input_file)
+    results = [solver.solve(problem, algorithm, seed=seed, **options) for seed in range(runs)]
+
+    os.makedirs(output_dir, exist_ok=True)
+    name = os.path.splitext(os.path.basename(input_file))[0]
+    with open(os.path.join(output_dir, f'{name}_{algorithm}.txt'), 'w') as file:
+        write_log(results, file)
+    plot_results(results, os.path.join(output_dir, f'{name}_{algorithm}.png'))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Rapoarte (jurnal si grafic) pentru rulari repetate ale unui algoritm')
+    parser.add_argument('algorithm', choices=[algorithm for algorithm in solver.ALGORITHMS
+                                              if algorithm not in solver.WARM_START_ALGORITHMS],
+                        help='Algoritmul rulat')
+    parser.add_argument('input_file', help='Fisierul yaml de intrare')
+    parser.add_argument('--runs', type=int, default=RUNS,
+                        help='Numarul de rulari, cu seed-urile 0..N-1 (implicit 20)')
+    parser.add_argument('--time-limit', type=float, default=None,
+                        help='Timpul maxim al fiecarei rulari, in secunde (implicit cel al algoritmului)')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR,
+                        help='Directorul in care se scriu jurnalul si graficul (implicit plot_results_hc)')
+    args = parser.parse_args()
+
+    results = report(args.input_file, args.algorithm, args.runs, args.output_dir, time_limit=args.time_limit)
+    print(f'{len(results)} rulari, conflicte finale: {[result.conflicts for result in results]}')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import generator
+import solver
+from bench import ALGORITHMS
+from profiling import Profiler
+
+# Factorii cu care se inmultesc salile, profesorii si materiile instantei de baza
+SCALES = [1, 2, 4, 8]
+
+# Directorul instantelor generate si fisierul rezultatelor
+INPUTS_DIR = 'scaling_inputs'
+RESULTS_FILE = 'scaling_results.json'
+
+# Numarul de seed-uri al fiecarui algoritm si limita de timp (in secunde) a fiecarei rulari
+SEEDS = 1
+TIME_LIMIT = 30
+
+# Algoritmii ale caror bucle pot fi cronometrate pe faze (ca in orar.py --profile)
+PROFILED_ALGORITHMS = ('astar', 'hc')
+
+# Exponentul de crestere peste care o marime este semnalata ca super-liniara
+SUPERLINEAR = 1.2
+
+def generate_inputs(base: dict, scales, directory: str):
+    # Instantele sweep-ului: cea de baza, cu salile, profesorii si materiile inmultite cu
+    # fiecare factor; intoarce lista (factor, fisier)
+    os.makedirs(directory, exist_ok=True)
+    inputs = []
+    for scale in scales:
+        params = dict(base, rooms=base['rooms'] * scale, teachers=base['teachers'] * scale,
+                      subjects=base['subjects'] * scale)
+        path = os.path.join(directory, f'scale{scale}.yaml')
+        generator.write_yaml(generator.generate(**params), path)
+        inputs.append((scale, path))
+    return inputs
+
+def scaling_run(scale, input_file, algorithm, seed, time_limit, phases):
+    # O rulare, intr-un proces nou; memoria este masurata ca in bench.py, plus cresterea ei
+    # in timpul cautarii (fara memoria interpretorului si a modulelor)
+    problem = solver.load_problem(input_file)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    profiler = Profiler() if phases and algorithm in PROFILED_ALGORITHMS else None
+    options = {'profiler': profiler} if profiler is not None else {}
+    result = solver.solve(problem, algorithm, time_limit=time_limit, seed=seed, **options)
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        'scale': scale,
+        'slots': problem.num_slots,
+        'algorithm': algorithm,
+        'seed': seed,
+        'time': result.solve_time,
+        'capped': result.solve_time >= time_limit,
+        'states': result.states,
+        'iterations': result.iterations,
+        'conflicts': result.conflicts,
+        'peak_rss_mb': peak_rss,
+        'rss_growth_mb': peak_rss - rss_before,
+        'phases': {phase: row['time'] for phase, row in profiler.report()['phases'].items()} if profiler else {},
+    }
+
+def scaling_starmap(task):
+    return scaling_run(*task)
+
+def growth_exponent(sizes, values):
+    '''
+    Exponentul k din valoare ~ marime^k, ca panta dreptei celor mai mici patrate in
+    coordonate log-log; None daca sunt mai putin de doua valori pozitive
+    '''
+
+    points = [(math.log(size), math.log(value)) for size, value in zip(sizes, values) if value and value > 0]
+    if len(points) < 2 or len({x for x, _ in points}) < 2:
+        return None
+    return statistics.linear_regression([x for x, _ in points], [y for _, y in points]).slope
+
+def summarize(runs):
+    # Mediile rularilor fiecarei perechi (algoritm, factor) si exponentii de crestere ai
+    # timpului, starilor, memoriei si fazelor fiecarui algoritm, dupa numarul de sloturi
+    groups = {}
+    for run in runs:
+        groups.setdefault(run['algorithm'], {}).setdefault(run['scale'], []).append(run)
+
+    summary = {}
+    for algorithm, by_scale in groups.items():
+        rows = []
+        for scale in sorted(by_scale):
+            group = by_scale[scale]
+            conflicts = [run['conflicts'] for run in group if run['conflicts'] is not None]
+            phases = {phase for run in group for phase in run['phases']}
+            rows.append({
+                'scale': scale,
+                'slots': group[0]['slots'],
+                'time': statistics.mean(run['time'] for run in group),
+                'capped': any(run['capped'] for run in group),
+                'states': statistics.mean(run['states'] for run in group),
+                'time_per_state': statistics.mean(run['time'] / run['states'] if run['states'] else 0.0 for run in group),
+                'conflicts': statistics.mean(conflicts) if conflicts else None,
+                'peak_rss_mb': max(run['peak_rss_mb'] for run in group),
+                'rss_growth_mb': max(run['rss_growth_mb'] for run in group),
+                'phases': {phase: statistics.mean(run['phases'].get(phase, 0.0) for run in group) for phase in phases},
+            })
+
+        # Timpul, starile si fazele rularilor oprite de limita de timp nu mai cresc cu instanta,
+        # asa ca intra in exponenti doar rularile terminate; timpul pe stare si memoria raman
+        # comparabile si pentru rularile oprite
+        slots = [row['slots'] for row in rows]
+        finished = [row for row in rows if not row['capped']]
+        finished_slots = [row['slots'] for row in finished]
+        exponents = {metric: growth_exponent(finished_slots, [row[metric] for row in finished])
+                     for metric in ('time', 'states')}
+        for metric in ('time_per_state', 'rss_growth_mb'):
+            exponents[metric] = growth_exponent(slots, [row[metric] for row in rows])
+        for phase in sorted({phase for row in rows for phase in row['phases']}):
+            exponents[f'phase:{phase}'] = growth_exponent(finished_slots, [row['phases'].get(phase) for row in finished])
+            exponents[f'phase:{phase}/state'] = growth_exponent(
+                slots, [row['phases'].get(phase, 0.0) / row['states'] if row['states'] else None for row in rows])
+        summary[algorithm] = {'rows': rows, 'exponents': exponents}
+    return summary
+
+def print_summary(summary):
+    print(f"{'algorithm':<8} {'scale':>5} {'slots':>6} {'time':>10} {'states':>12} {'conflicts':>9} "
+          f"{'rss':>8} {'+rss':>8}")
+    for algorithm, data in sorted(summary.items()):
+        for row in data['rows']:
+            conflicts = f"{row['conflicts']:.2f}" if row['conflicts'] is not None else '-'
+            capped = '*' if row['capped'] else ' '
+            print(f"{algorithm:<8} {row['scale']:>5} {row['slots']:>6} {row['time']:>9.3f}s{capped} {row['states']:>11.0f} "
+                  f"{conflicts:>9} {row['peak_rss_mb']:>8.1f} {row['rss_growth_mb']:>8.1f}")
+    print("* rularea a atins limita de timp; intra in exponenti doar prin timpul pe stare si memorie")
+
+    print()
+    print(f"Exponentii de crestere dupa numarul de sloturi (peste {SUPERLINEAR} = super-liniar):")
+    for algorithm, data in sorted(summary.items()):
+        for metric, exponent in data['exponents'].items():
+            if exponent is None:
+                continue
+            flag = '  super-liniar' if exponent > SUPERLINEAR else ''
+            print(f"  {algorithm:<8} {metric:<28} {exponent:>6.2f}{flag}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de scalare: fiecare algoritm pe instante generate din ce in ce '
+                                                 'mai mari (vezi generator.py)')
+    generator.add_arguments(parser.add_argument_group('instanta de baza'))
+    parser.add_argument('--scales', nargs='+', type=int, default=SCALES,
+                        help='Factorii cu care se inmultesc salile, profesorii si materiile (implicit 1 2 4 8)')
+    parser.add_argument('--algorithms', nargs='+', choices=sorted(ALGORITHMS), default=sorted(ALGORITHMS),
+                        help='Algoritmii rulati (implicit toti, in afara de repair)')
+    parser.add_argument('--seeds', type=int, default=SEEDS,
+                        help='Numarul de seed-uri, 0..N-1, pentru fiecare instanta si algoritm')
+    parser.add_argument('--time-limit', type=float, default=TIME_LIMIT,
+                        help='Timpul maxim al fiecarei rulari, in secunde')
+    parser.add_argument('--phases', action='store_true',
+                        help='Cronometreaza si fazele cautarilor astar si hc, cu exponentii lor de crestere')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Numarul de rulari simultane (timpii sunt comparabili doar cu 1)')
+    parser.add_argument('--inputs-dir', default=INPUTS_DIR,
+                        help='Directorul in care se scriu instantele generate')
+    parser.add_argument('--output', default=RESULTS_FILE,
+                        help='Fisierul json in care se scriu rezultatele')
+    args = parser.parse_args()
+
+    base = {'days': args.days, 'intervals': args.intervals, 'rooms': args.rooms, 'teachers': args.teachers,
+            'subjects': args.subjects, 'tightness': args.tightness, 'preferences': args.preferences, 'seed': args.seed}
+    inputs = generate_inputs(base, args.scales, args.inputs_dir)
+    tasks = [(scale, input_file, algorithm, seed, args.time_limit, args.phases)
+             for scale, input_file in inputs for algorithm in args.algorithms for seed in range(args.seeds)]
+
+    # Fiecare rulare are propriul proces (maxtasksperchild=1), pentru o memorie maxima corecta
+    runs = []
+    with multiprocessing.Pool(args.jobs, maxtasksperchild=1) as pool:
+        for run in pool.imap(scaling_starmap, tasks):
+            print(f"scale {run['scale']}/{run['algorithm']} seed {run['seed']}: {run['time']:.3f}s, "
+                  f"{run['conflicts']} conflicts", file=sys.stderr)
+            runs.append(run)
+
+    summary = summarize(runs)
+    with open(args.output, 'w') as file:
+        json.dump({'config': dict(base, scales=args.scales, algorithms=args.algorithms, seeds=args.seeds,
+                                  time_limit=args.time_limit), 'summary': summary, 'runs': runs}, file, indent=2)
+    print_summary(summary)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+from array import array
+from problem import Problem
+
+
+class Schedule:
+    '''
+    Orar compact, tinut intr-un singur buffer array('i') asezat conform problem.py:
+    - id-ul asignarii din fiecare slot zi x interval x sala (0 = sala goala)
+    - numarul de ore al fiecarui profesor
+    - acoperirea (numarul de studenti) fiecarei materii
+    - mastile de ocupare ale profesorilor pe momente (zi, interval)
+
+    Clonarea unui orar inseamna o singura copiere de buffer.
+    '''
+
+    __slots__ = ('problem', 'data')
+
+    def __init__(self, problem: Problem, data: array | None = None) -> None:
+        self.problem = problem
+        self.data = data if data is not None else array('i', [0]) * problem.schedule_size
+
+    @classmethod
+    def from_assignments(cls, problem: Problem, assignments):
+        # Construieste orarul din tupluri de id-uri (zi, interval, sala, profesor, materie)
+        schedule = cls(problem)
+        for day, interval, classroom, teacher, subject in assignments:
+            schedule.assign(problem.slot(day, interval, classroom), teacher, subject)
+        return schedule
+
+    def clone(self):
+        return Schedule(self.problem, self.data[:])
+
+    def get(self, slot: int):
+        # Intoarce tuplul (profesor, materie) din slot sau None daca sala e goala
+        a = self.data[slot]
+        if not a:
+            return None
+        return self.problem.assignment_teacher[a], self.problem.assignment_subject[a]
+
+    def assign(self, slot: int, teacher: int, subject: int) -> None:
+        problem = self.problem
+        data = self.data
+        time = problem.slot_time[slot]
+
+        data[slot] = teacher * problem.num_subjects + subject + 1
+        data[problem.hours_offset + teacher] += 1
+        data[problem.coverage_offset + subject] += problem.capacity[problem.slot_classroom[slot]]
+        data[problem.busy_offset + teacher * problem.busy_words + problem.time_word[time]] |= problem.time_mask[time]
+
+    def unassign(self, slot: int):
+        # Elibereaza slotul si intoarce asignarea (profesor, materie) care era acolo
+        problem = self.problem
+        data = self.data
+        a = data[slot]
+        if not a:
+            return None
+
+        teacher = problem.assignment_teacher[a]
+        subject = problem.assignment_subject[a]
+        time = problem.slot_time[slot]
+
+        data[slot] = 0
+        data[problem.hours_offset + teacher] -= 1
+        data[problem.coverage_offset + subject] -= problem.capacity[problem.slot_classroom[slot]]
+        data[problem.busy_offset + teacher * problem.busy_words + problem.time_word[time]] &= ~problem.time_mask[time]
+        return teacher, subject
+
+    def is_busy(self, teacher: int, time: int) -> bool:
+        problem = self.problem
+        return bool(self.data[problem.busy_offset + teacher * problem.busy_words + problem.time_word[time]] & problem.time_mask[time])
+
+    def hours(self, teacher: int) -> int:
+        return self.data[self.problem.hours_offset + teacher]
+
+    def coverage(self, subject: int) -> int:
+        return self.data[self.problem.coverage_offset + subject]
+
+    def empty_slots(self) -> int:
+        return self.problem.num_slots - sum(self.data[self.problem.hours_offset:self.problem.coverage_offset])
+
+    def assignments(self):
+        # Asignarile din orar ca tupluri de id-uri (zi, interval, sala, profesor, materie)
+        problem = self.problem
+        data = self.data
+        for slot in range(problem.num_slots):
+            a = data[slot]
+            if a:
+                yield (problem.slot_day[slot], problem.slot_interval[slot], problem.slot_classroom[slot],
+                       problem.assignment_teacher[a], problem.assignment_subject[a])
+
+    def to_timetable(self) -> dict:
+        # Orarul cu numele din fisierul de intrare, pentru afisare
+        return self.problem.timetable_from_assignments(self.assignments())
@@ -0,0 +1,103 @@
+import math
+import time
+import sys
+import numpy as np
+import render
+from hill_climbing import State, Move
+
+# Temperatura initiala si factorul de racire geometrica aplicat la fiecare iteratie
+INITIAL_TEMPERATURE = 2.0
+COOLING = 0.999
+
+# Sub aceasta temperatura, racirea se opreste si cautarea accepta rar mutari mai proaste
+MIN_TEMPERATURE = 0.05
+
+# Timpul maxim de cautare, in secunde
+TIME_LIMIT = 60
+
+def random_move(state):
+    # O mutare aleasa uniform dintre mutarile valide ale unei clase alese random
+    problem = state.problem
+    occupied = np.flatnonzero(np.frombuffer(state.schedule.data, dtype=np.intc)[:problem.num_slots])
+    if not len(occupied):
+        return None
+
+    slot = int(occupied[state.rng.randrange(len(occupied))])
+    targets, deltas, swaps, teachers = state.class_moves(slot)
+    if not len(targets):
+        return None
+
+    index = state.rng.randrange(len(targets))
+    teacher = int(teachers[index])
+    return Move(slot, int(targets[index]), bool(swaps[index]), int(deltas[index]), teacher if teacher >= 0 else None)
+
+def simulated_annealing(
+    initial: State,
+    time_limit: float = TIME_LIMIT,
+    temperature: float = INITIAL_TEMPERATURE,
+    cooling: float = COOLING,
+    max_iters: int | None = None,
+    incumbent = None):
+
+    # Recoacere simulata pe vecinatatea mutarilor, interschimbarilor si schimbarilor de
+    # profesor din hill_climbing (State.class_moves): o mutare care creste conflictele cu
+    # delta este acceptata cu probabilitatea exp(-delta / temperatura), iar temperatura
+    # scade geometric
+    start_time = time.time()
+    state = initial.clone()
+    best_state = state.clone()
+    if incumbent is not None:
+        incumbent.offer(best_state.schedule, best_state.conflicts_number)
+    iters, states = 0, 0
+
+    while not best_state.is_final() and time.time() - start_time < time_limit:
+        if max_iters is not None and iters >= max_iters:
+            break
+        iters += 1
+
+        move = random_move(state)
+        if move is None:
+            continue
+        states += 1
+
+        if move.delta <= 0 or state.rng.random() < math.exp(-move.delta / temperature):
+            state.apply_move(move, in_place=True)
+
+            # Salvez cea mai buna stare intalnita
+            if state.conflicts_number < best_state.conflicts_number:
+                best_state = state.clone()
+                if incumbent is not None:
+                    incumbent.offer(best_state.schedule, best_state.conflicts_number)
+
+        temperature = max(MIN_TEMPERATURE, temperature * cooling)
+
+    return best_state.is_final(), iters, states, best_state
+
+def start(problem, time_limit=TIME_LIMIT, temperature=INITIAL_TEMPERATURE,
+          cooling=COOLING, seed=None, callback=None):
+    # Cautarea este cea din biblioteca (solver.run_simulated_annealing); aici raman doar mesajele
+    import solver
+
+    result = solver.solve(problem, 'sa', time_limit=time_limit, seed=seed, callback=callback,
+                          temperature=temperature, cooling=cooling)
+
+    print("Initial state conflicts number: ", result.initial_conflicts)
+    print("Execution time for sa:", result.solve_time, "seconds")
+    print("Generated states " + str(result.states))
+    print("Final state conflicts " + str(result.conflicts))
+    print("Total iters ", result.iterations)
+    print("Result shedule:")
+    render.write_text(result.schedule, sys.stdout)
+    return result.schedule
+
+def add_arguments(parser):
+    # Optiunile liniei de comanda pentru sa (vezi orar.py)
+    parser.add_argument('--time-limit', type=float, default=TIME_LIMIT,
+                        help='Timpul maxim de cautare in secunde')
+    parser.add_argument('--temperature', type=float, default=INITIAL_TEMPERATURE,
+                        help='Temperatura initiala')
+    parser.add_argument('--cooling', type=float, default=COOLING,
+                        help='Factorul de racire geometrica')
+
+def run(problem, args, profiler=None, callback=None, checkpoint=None):
+    return start(problem, args.time_limit, args.temperature, args.cooling, args.seed, callback)
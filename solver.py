@@ -0,0 +1,307 @@
+import random
+import time
+import multiprocessing
+import astar
+import hill_climbing
+import tabu_search
+import simulated_annealing
+import branch_and_bound
+import repair
+from anytime import IncumbentTracker, stream_incumbents
+from check_constraints import count_mandatory_conflicts
+from problem import Problem, compile_problem, load_problem
+from schedule import Schedule
+
+# Numarul de restart-uri si de iteratii ale fiecarei cautari hc, ca in hill_climbing.start
+MAX_RESTARTS = 50
+RUN_MAX_ITERS = 100
+
+# Algoritmii care pornesc de la un orar anterior (optiunea previous), deci nu pot rula
+# doar pe fisierul de intrare
+WARM_START_ALGORITHMS = ('repair',)
+
+# Problemele compilate ale unui proces din pool-ul lui solve_many
+worker_problems = None
+
+class SolveResult:
+    '''
+    Rezultatul unei rulari a unui algoritm pe o problema:
+    - schedule: orarul gasit (None daca algoritmul nu a gasit niciun orar)
+    - mandatory_conflicts / optional_conflicts: constrangerile obligatorii si optionale incalcate
+    - initial_conflicts: conflictele starii initiale (None pentru algoritmii fara stare initiala)
+    - states / iterations: starile generate si iteratiile algoritmului
+    - compile_time / solve_time: secundele petrecute compiland problema si cautand
+    - details: informatiile proprii algoritmului (de exemplu marginea inferioara a lui exact)
+    '''
+
+    __slots__ = ('algorithm', 'seed', 'schedule', 'mandatory_conflicts', 'optional_conflicts',
+                 'initial_conflicts', 'states', 'iterations', 'compile_time', 'solve_time', 'details')
+
+    def __init__(self, algorithm: str, seed: int | None, schedule: Schedule | None, initial_conflicts: int | None,
+                 states: int, iterations: int, details: dict | None = None) -> None:
+        self.algorithm = algorithm
+        self.seed = seed
+        self.schedule = schedule
+        self.initial_conflicts = initial_conflicts
+        self.states = states
+        self.iterations = iterations
+        self.compile_time = 0.0
+        self.solve_time = 0.0
+        self.details = details if details is not None else {}
+
+        if schedule is None:
+            self.mandatory_conflicts = self.optional_conflicts = None
+        else:
+            problem = schedule.problem
+            self.mandatory_conflicts = count_mandatory_conflicts(problem, schedule.assignments())
+            self.optional_conflicts = sum(problem.teacher_time_conflicts[teacher][day * problem.num_intervals + interval]
+                                          for day, interval, _, teacher, _ in schedule.assignments())
+
+    @property
+    def conflicts(self):
+        # Numarul total de conflicte, ca in conflicts_number al starilor
+        if self.schedule is None:
+            return None
+        return self.mandatory_conflicts + self.optional_conflicts
+
+    @property
+    def is_final(self):
+        return self.conflicts == 0
+
+    def to_timetable(self):
+        # Orarul cu numele din fisierul de intrare, pentru afisare
+        return self.schedule.to_timetable() if self.schedule is not None else None
+
+def run_astar(problem: Problem, time_limit, seed, workers, rng, frontier='bucket', tie_break='depth',
+              successors='all', heuristic='default', weight=1.0, search='astar', memory_limit=astar.MEMORY_LIMIT,
+              profiler=None, incumbent=None, checkpoint=None):
+    start_time = time.time()
+    init_state = astar.State(problem, teacher_hours=heuristic in astar.COUNTED_HEURISTICS)
+    h = astar.get_heuristic(heuristic, weight)
+    if time_limit is None:
+        time_limit = astar.TIME_LIMIT
+
+    # Cu un Checkpointer (vezi checkpoint.py), cautarea astar salveaza periodic frontiera
+    # si lista closed si poate continua din ultimul checkpoint
+    resume = checkpoint.resume_state() if checkpoint is not None else None
+    if resume is not None:
+        start_time = checkpoint.start_time
+    elif checkpoint is not None:
+        checkpoint.start_time = start_time
+
+    if search == 'ida':
+        final_state, states, peak_states, memory_limited = astar.ida_star(
+            init_state, h, start_time, successors, memory_limit, time_limit, profiler, incumbent)
+    else:
+        final_state, states = astar.astar(init_state, h, start_time, frontier, tie_break, successors, time_limit,
+                                          profiler, incumbent, checkpoint, resume)
+        peak_states, memory_limited = states, False
+
+    return SolveResult('astar', seed, final_state.schedule, init_state.conflicts_number, states, states,
+                       {'peak_states': peak_states, 'memory_limited': memory_limited})
+
+def run_hill_climbing(problem: Problem, time_limit, seed, workers, rng, improvement='best',
+                      max_restarts=MAX_RESTARTS, run_max_iters=RUN_MAX_ITERS, profiler=None, incumbent=None,
+                      checkpoint=None):
+    # Hill climbing se opreste dupa numarul de restart-uri sau, cu o limita de timp, la
+    # expirarea ei; procesele paralele isi anunta orarele mai bune prin procesul principal.
+    # Checkpoint-urile sunt disponibile doar cu un singur proces
+    start_time = time.time()
+    resume = checkpoint.resume_state() if checkpoint is not None and workers == 1 else None
+    if resume is not None:
+        start_time = checkpoint.start_time
+    elif checkpoint is not None:
+        checkpoint.start_time = start_time
+    deadline = start_time + time_limit if time_limit is not None else None
+    if workers > 1:
+        _, iters, states, final_state, init_conflicts = hill_climbing.parallel_random_restart_hill_climbing(
+            problem, max_restarts, run_max_iters, workers, seed, improvement, deadline, incumbent)
+    else:
+        init_state = hill_climbing.State(problem, rng=rng)
+        _, iters, states, final_state, init_conflicts = hill_climbing.random_restart_hill_climbing(
+            init_state, max_restarts, run_max_iters, improvement=improvement, profiler=profiler,
+            deadline=deadline, incumbent=incumbent, checkpoint=checkpoint, resume=resume)
+
+    return SolveResult('hc', seed, final_state.schedule, init_conflicts, states, iters)
+
+def run_tabu_search(problem: Problem, time_limit, seed, workers, rng, tenure=tabu_search.TABU_TENURE, incumbent=None):
+    init_state = hill_climbing.State(problem, rng=rng)
+    if time_limit is None:
+        time_limit = tabu_search.TIME_LIMIT
+
+    _, iters, states, final_state = tabu_search.tabu_search(init_state, time_limit, tenure, incumbent=incumbent)
+    return SolveResult('tabu', seed, final_state.schedule, init_state.conflicts_number, states, iters)
+
+def run_simulated_annealing(problem: Problem, time_limit, seed, workers, rng,
+                            temperature=simulated_annealing.INITIAL_TEMPERATURE, cooling=simulated_annealing.COOLING,
+                            incumbent=None):
+    init_state = hill_climbing.State(problem, rng=rng)
+    if time_limit is None:
+        time_limit = simulated_annealing.TIME_LIMIT
+
+    _, iters, states, final_state = simulated_annealing.simulated_annealing(init_state, time_limit, temperature, cooling,
+                                                                          incumbent=incumbent)
+    return SolveResult('sa', seed, final_state.schedule, init_state.conflicts_number, states, iters)
+
+def run_branch_and_bound(problem: Problem, time_limit, seed, workers, rng, incumbent=None):
+    solver = branch_and_bound.BranchAndBound(problem, time_limit if time_limit is not None else branch_and_bound.TIME_LIMIT,
+                                             incumbent)
+    initial = solver.set_greedy_incumbent(rng)
+    placed, cost, lower_bound, optimal = solver.solve()
+
+    schedule = solver.to_schedule(placed) if placed is not None else None
+    return SolveResult('exact', seed, schedule, initial, solver.nodes, solver.nodes,
+                       {'lower_bound': lower_bound, 'optimal': optimal})
+
+def run_repair(problem: Problem, time_limit, seed, workers, rng, previous, tenure=tabu_search.TABU_TENURE,
+               previous_input=None, incumbent=None):
+    # previous este orarul anterior (Schedule) sau calea lui (tabel text sau export json);
+    # previous_input este fisierul yaml al orarului anterior, pentru initialele profesorilor
+    dropped = 0
+    if isinstance(previous, str):
+        previous_teachers = repair.read_previous_teachers(previous_input) if previous_input is not None else None
+        previous, dropped = repair.load_previous(problem, previous, previous_teachers)
+    if time_limit is None:
+        time_limit = repair.TIME_LIMIT
+
+    final_state, details = repair.repair(problem, previous, time_limit, tenure, incumbent, rng)
+    details.update(dropped=dropped, changed=repair.changed_slots(previous, final_state.schedule))
+    return SolveResult('repair', seed, final_state.schedule, hill_climbing.State(problem, previous).conflicts_number,
+                       details.pop('states'), details.pop('iterations'), details)
+
+# Algoritmii disponibili: fiecare primeste problema compilata, limita de timp (None pentru
+# limita implicita a algoritmului), seed-ul, numarul de procese si generatorul aleator al
+# rularii (un random.Random creat din seed), plus optiunile proprii si un IncumbentTracker
+# optional (incumbent), anuntat la fiecare orar mai bun
+ALGORITHMS = {
+    'astar': run_astar,
+    'hc': run_hill_climbing,
+    'tabu': run_tabu_search,
+    'sa': run_simulated_annealing,
+    'exact': run_branch_and_bound,
+    'repair': run_repair,
+}
+
+def as_problem(problem) -> Problem:
+    # Problema compilata din datele de intrare sau din calea fisierului yaml (prin cache)
+    if isinstance(problem, Problem):
+        return problem
+    if isinstance(problem, str):
+        return load_problem(problem)
+    return compile_problem(problem)
+
+def solve(problem, algorithm: str, *, time_limit: float | None = None, deadline: float | None = None,
+          seed: int | None = None, workers: int = 1, callback=None, **options) -> SolveResult:
+    '''
+    Rezolva o problema cu algoritmul dat (vezi ALGORITHMS) si intoarce un SolveResult.
+
+    problem poate fi o problema compilata, datele de intrare citite din yaml sau calea
+    fisierului yaml. Optiunile in plus sunt transmise algoritmului (de exemplu frontier
+    si heuristic pentru astar, improvement pentru hc, tenure pentru tabu, orarul anterior
+    previous pentru repair).
+
+    Daca seed lipseste, se alege unul la intamplare, salvat in rezultat pentru a putea
+    repeta rularea. Rularea foloseste doar generatorul random.Random(seed) creat pentru ea,
+    nu pe cel global, asa ca solve poate fi apelat simultan din mai multe fire de executie.
+
+    deadline este momentul (time.time()) la care cautarea trebuie sa se opreasca; impreuna
+    cu time_limit, se respecta limita care expira prima. callback(Incumbent), daca este dat,
+    primeste fiecare orar mai bun decat cele anterioare, imediat ce este gasit (vezi
+    anytime.py si solve_iter)
+    '''
+
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f'Algoritmul {algorithm} nu exista. Algoritmi: {", ".join(ALGORITHMS)}')
+
+    start_time = time.time()
+    problem = as_problem(problem)
+    compile_time = time.time() - start_time
+
+    # Fiecare rulare are propriul generator aleator, asa ca apelurile simultane (din fire de
+    # executie diferite) nu se influenteaza si raman reproductibile
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    rng = random.Random(seed)
+
+    start_time = time.time()
+    if deadline is not None:
+        time_limit = max(min(time_limit, deadline - start_time) if time_limit is not None else deadline - start_time, 0)
+    if callback is not None:
+        options['incumbent'] = IncumbentTracker(callback, start_time)
+
+    result = ALGORITHMS[algorithm](problem, time_limit, seed, workers, rng, **options)
+    result.compile_time = compile_time
+    result.solve_time = time.time() - start_time
+    return result
+
+def solve_iter(problem, algorithm: str, **kwargs):
+    '''
+    Varianta anytime a lui solve: intoarce, pe masura ce sunt gasite, orarele din ce in ce
+    mai bune (obiecte Incumbent cu orarul, conflictele si secundele scurse). Cautarea
+    ruleaza intr-un fir de executie separat; argumentele sunt cele ale lui solve, de obicei
+    cu un deadline sau un time_limit
+    '''
+
+    return stream_incumbents(lambda callback: solve(problem, algorithm, callback=callback, **kwargs))
+
+def init_worker(problems):
+    # Initializarea unui proces din pool: problemele compilate, primite o singura data
+    global worker_problems
+    worker_problems = problems
+
+def solve_worker(index, algorithm, seed, time_limit, options):
+    # O rulare din solve_many; orarul este intors ca buffer, fara problema, care este
+    # deja in procesul principal
+    result = solve(worker_problems[index], algorithm, time_limit=time_limit, seed=seed, **options)
+    if result.schedule is not None:
+        result.schedule = result.schedule.data
+    return result
+
+def solve_many(inputs, algorithms=('hc',), seeds=(None,), *, time_limit: float | None = None,
+               workers: int = 1, options: dict | None = None) -> list:
+    '''
+    Rezolva fiecare intrare cu fiecare algoritm si fiecare seed.
+
+    inputs este o lista de probleme, date de intrare sau cai de fisiere yaml; fiecare
+    este citita si compilata o singura data si refolosita de toate rularile ei. Rularile
+    sunt impartite intre workers procese, fiecare rulare folosind un singur proces.
+    options[algoritm] sunt optiunile transmise algoritmului, ca in solve.
+
+    Seed-urile lipsa sunt alese aici, inainte de pornirea proceselor, ca rularile sa nu
+    primeasca toate acelasi seed mostenit de la procesul principal.
+
+    Intoarce lista (intrare, rezultate), cu rezultatele in ordinea (algoritm, seed)
+    '''
+
+    # Intrarile sunt parcurse de mai multe ori, asa ca orice iterabil devine lista
+    inputs, algorithms, seeds = list(inputs), list(algorithms), list(seeds)
+
+    problems, compile_times = [], []
+    for problem in inputs:
+        start_time = time.time()
+        problems.append(as_problem(problem))
+        compile_times.append(time.time() - start_time)
+
+    options = options if options is not None else {}
+    tasks = [(index, algorithm, seed if seed is not None else random.randrange(2 ** 32),
+              time_limit, options.get(algorithm, {}))
+             for index in range(len(problems)) for algorithm in algorithms for seed in seeds]
+
+    if workers > 1:
+        with multiprocessing.Pool(min(workers, len(tasks)), initializer=init_worker, initargs=(problems,)) as pool:
+            results = pool.starmap(solve_worker, tasks)
+
+        # Refac orarele din buffer-ele intoarse de procese
+        for (index, _, _, _, _), result in zip(tasks, results):
+            if result.schedule is not None:
+                result.schedule = Schedule(problems[index], result.schedule)
+    else:
+        results = [solve(problems[index], algorithm, time_limit=time_limit, seed=seed, **algorithm_options)
+                   for index, algorithm, seed, _, algorithm_options in tasks]
+
+    # Fiecare rulare raporteaza timpul de compilare al problemei ei, platit o singura data
+    for (index, _, _, _, _), result in zip(tasks, results):
+        result.compile_time = compile_times[index]
+
+    runs = len(algorithms) * len(seeds)
+    return [(inputs[index], results[index * runs:(index + 1) * runs]) for index in range(len(problems))]
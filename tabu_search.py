@@ -0,0 +1,129 @@
+import time
+import sys
+import numpy as np
+import render
+from hill_climbing import State, Move
+
+# Numarul de clase alese la fiecare iteratie, pentru care se evalueaza toate mutarile
+CLASSES_PER_ITERATION = 20
+
+# Numarul de iteratii in care o clasa nu se poate intoarce in slotul din care a plecat
+TABU_TENURE = 10
+
+# Timpul maxim de cautare, in secunde
+TIME_LIMIT = 60
+
+def is_tabu(tabu, move, state, iteration):
+    # O mutare este tabu daca aduce o clasa (profesor, materie) inapoi intr-un slot parasit recent
+    slots = state.schedule.data
+    assignment = slots[move.from_slot]
+    if move.teacher is not None:
+        assignment = state.problem.assignment_id(move.teacher, state.problem.assignment_subject[assignment])
+    if tabu.get((assignment, move.to_slot), 0) > iteration:
+        return True
+    return move.swap_partner and tabu.get((slots[move.to_slot], move.from_slot), 0) > iteration
+
+def best_move(state, tabu, iteration, best_conflicts, fixed=None):
+    # Cea mai buna mutare ne-tabu dintre mutarile claselor alese random; o mutare tabu
+    # este acceptata daca duce la un orar mai bun decat cel mai bun gasit (aspiratie).
+    # Clasele din sloturile fixed (vector boolean) nu se muta si nu sunt interschimbate
+    problem = state.problem
+    occupied = np.flatnonzero(np.frombuffer(state.schedule.data, dtype=np.intc)[:problem.num_slots])
+    if fixed is not None:
+        occupied = occupied[~fixed[occupied]]
+    if not len(occupied):
+        return None, 0
+
+    chosen = state.rng.sample(occupied.tolist(), min(CLASSES_PER_ITERATION, len(occupied)))
+
+    best, evaluated = None, 0
+    for slot in chosen:
+        targets, deltas, swaps, teachers = state.class_moves(slot)
+        if fixed is not None:
+            allowed = ~(swaps & fixed[targets])
+            targets, deltas, swaps, teachers = targets[allowed], deltas[allowed], swaps[allowed], teachers[allowed]
+        evaluated += len(targets)
+
+        # Parcurg mutarile clasei in ordinea crescatoare a diferentei de conflicte, pana la
+        # prima care nu este tabu sau este aspirata
+        for index in np.argsort(deltas, kind='stable').tolist():
+            delta = int(deltas[index])
+            if best is not None and delta >= best.delta:
+                break
+
+            teacher = int(teachers[index])
+            move = Move(slot, int(targets[index]), bool(swaps[index]), delta, teacher if teacher >= 0 else None)
+            if not is_tabu(tabu, move, state, iteration)\
+                or state.conflicts_number + delta < best_conflicts:
+                best = move
+                break
+
+    return best, evaluated
+
+def tabu_search(initial: State, time_limit: float = TIME_LIMIT, tenure: int = TABU_TENURE, max_iters: int | None = None,
+                incumbent=None, fixed=None):
+    # Cautare tabu pe vecinatatea mutarilor, interschimbarilor si schimbarilor de profesor
+    # din hill_climbing (State.class_moves): la fiecare
+    # iteratie se aplica cea mai buna mutare permisa, chiar daca aceasta creste numarul de
+    # conflicte, iar mutarea inversa devine tabu pentru tenure iteratii. Clasele din
+    # sloturile fixed raman pe loc (vezi best_move)
+    start_time = time.time()
+    state = initial.clone()
+    best_state = state.clone()
+    if incumbent is not None:
+        incumbent.offer(best_state.schedule, best_state.conflicts_number)
+
+    # (asignare, slot) -> iteratia pana la care asignarea nu se poate intoarce in slot
+    tabu = {}
+    iters, states = 0, 0
+
+    while not best_state.is_final() and time.time() - start_time < time_limit:
+        if max_iters is not None and iters >= max_iters:
+            break
+        iters += 1
+
+        move, evaluated = best_move(state, tabu, iters, best_state.conflicts_number, fixed)
+        states += evaluated
+        if move is None:
+            break
+
+        # Clasele mutate nu se pot intoarce in sloturile din care pleaca
+        slots = state.schedule.data
+        tabu[(slots[move.from_slot], move.from_slot)] = iters + tenure
+        if move.swap_partner:
+            tabu[(slots[move.to_slot], move.to_slot)] = iters + tenure
+
+        state.apply_move(move, in_place=True)
+
+        # Salvez cea mai buna stare intalnita
+        if state.conflicts_number < best_state.conflicts_number:
+            best_state = state.clone()
+            if incumbent is not None:
+                incumbent.offer(best_state.schedule, best_state.conflicts_number)
+
+    return best_state.is_final(), iters, states, best_state
+
+def start(problem, time_limit=TIME_LIMIT, tenure=TABU_TENURE, seed=None, callback=None):
+    # Cautarea este cea din biblioteca (solver.run_tabu_search); aici raman doar mesajele
+    import solver
+
+    result = solver.solve(problem, 'tabu', time_limit=time_limit, seed=seed, callback=callback, tenure=tenure)
+
+    print("Initial state conflicts number: ", result.initial_conflicts)
+    print("Execution time for tabu:", result.solve_time, "seconds")
+    print("Generated states " + str(result.states))
+    print("Final state conflicts " + str(result.conflicts))
+    print("Total iters ", result.iterations)
+    print("Result shedule:")
+    render.write_text(result.schedule, sys.stdout)
+    return result.schedule
+
+def add_arguments(parser):
+    # Optiunile liniei de comanda pentru tabu (vezi orar.py)
+    parser.add_argument('--time-limit', type=float, default=TIME_LIMIT,
+                        help='Timpul maxim de cautare in secunde')
+    parser.add_argument('--tenure', type=int, default=TABU_TENURE,
+                        help='Numarul de iteratii in care o mutare inversa este tabu')
+
+def run(problem, args, profiler=None, callback=None, checkpoint=None):
+    return start(problem, args.time_limit, args.tenure, args.seed, callback)
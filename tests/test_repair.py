@@ -0,0 +1,66 @@
+import os
+import random
+import sys
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import repair
+from problem import compile_problem
+
+INPUT = os.path.join(ROOT, 'inputs', 'orar_mare_relaxat.yaml')
+PREVIOUS = os.path.join(ROOT, 'refs', 'orar_mare_relaxat.txt')
+
+def changed_problem(change=None):
+    with open(INPUT, 'r', encoding='utf-8') as file:
+        data = yaml.safe_load(file)
+    if change is not None:
+        change(data)
+    return compile_problem(data)
+
+def loaded_classes(problem, schedule):
+    # Clasele orarului, cu numele din intrare: (zi, interval, sala, profesor, materie)
+    return {(problem.days[d], problem.intervals[i], problem.classrooms[r], problem.teachers[t], problem.subjects[s])
+            for d, i, r, t, s in schedule.assignments()}
+
+def previous_classes():
+    # Clasele orarului anterior, pe problema neschimbata
+    problem = changed_problem()
+    schedule, dropped = repair.load_previous(problem, PREVIOUS)
+    assert dropped == 0
+    return loaded_classes(problem, schedule)
+
+def test_removed_teacher_is_dropped():
+    teacher = 'Alexandru Dumitrescu'
+    problem = changed_problem(lambda data: data['Profesori'].pop(teacher))
+
+    classes = previous_classes()
+    schedule, dropped = repair.load_previous(problem, PREVIOUS)
+    removed = {record for record in classes if record[3] == teacher}
+    assert removed and dropped == len(removed)
+    assert loaded_classes(problem, schedule) == classes - removed
+
+    state, _ = repair.repair(problem, schedule, time_limit=5, rng=random.Random(0))
+    assert state.conflicts_number == 0
+
+def test_removed_day_keeps_the_other_days():
+    problem = changed_problem(lambda data: data['Zile'].remove('Marti'))
+
+    classes = previous_classes()
+    schedule, dropped = repair.load_previous(problem, PREVIOUS)
+    removed = {record for record in classes if record[0] == 'Marti'}
+    assert removed and dropped == len(removed)
+    assert loaded_classes(problem, schedule) == classes - removed
+
+def test_previous_input_resolves_shifted_initials():
+    # Elena Adamescu (EA) si Elena Andronescu (EA2) au aceleasi initiale; fara Elena Adamescu,
+    # EA ar fi Elena Andronescu in intrarea noua, asa ca initialele se rezolva dupa intrarea anterioara
+    teacher = 'Elena Adamescu'
+    problem = changed_problem(lambda data: data['Profesori'].pop(teacher))
+
+    classes = previous_classes()
+    schedule, dropped = repair.load_previous(problem, PREVIOUS, repair.read_previous_teachers(INPUT))
+    removed = {record for record in classes if record[3] == teacher}
+    assert removed and dropped == len(removed)
+    assert loaded_classes(problem, schedule) == classes - removed
@@ -9,12 +9,15 @@ MATERII = 'Materii'
 PROFESORI = 'Profesori'
 SALI = 'Sali'
 
+# Incarcatorul yaml implementat in C (libyaml), daca este disponibil; altfel cel din Python
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 def read_yaml_file(file_path : str) -> dict:
     '''
     Citeste un fișier yaml și returnează conținutul său sub formă de dicționar
     '''
     with open(file_path, 'r') as file:
-        return yaml.safe_load(file)
+        return yaml.load(file, Loader=YAML_LOADER)
 
 
 def acces_yaml_attributes(yaml_dict : dict):
@@ -89,54 +92,59 @@ def allign_string_with_spaces(s : str, max_len : int, allignment_type : str = 'c
     return s
 
 
-def pretty_print_timetable_aux_zile(timetable : {str : {(int, int) : {str : (str, str)}}}, input_path : str) -> str:
+def timetable_header(days : list, max_len : int) -> (str, str):
+    '''
+    Primește zilele orarului și lățimea unei coloane
+
+    Returnează antetul tabelului (coloana intervalelor și câte o coloană pentru fiecare zi) și linia de delimitare
+    '''
+
+    columns = ['Interval'] + list(days)
+    header = '|' + '|'.join(allign_string_with_spaces(column, max_len, 'center') for column in columns) + '|\n'
+    return header, '-' * (1 + (max_len + 1) * len(columns)) + '\n'
+
+
+def pretty_print_timetable_aux_zile(timetable : {str : {(int, int) : {str : (str, str)}}}, input_path : str, profs : list = None) -> str:
     '''
     Primește un dicționar ce are chei zilele, cu valori dicționare de intervale reprezentate ca tupluri de int-uri, cu valori dicționare de săli, cu valori tupluri (profesor, materie)
 
     Returnează un string formatat să arate asemenea unui tabel excel cu zilele pe linii, intervalele pe coloane și în intersecția acestora, ferestrele de 2 ore cu materiile alocate în fiecare sală fiecărui profesor
+
+    Dacă lista profesorilor nu este dată, este citită din fișierul de intrare. Pentru orarele solverelor, render.TimetableRenderer scrie același tabel direct dintr-un Schedule
     '''
 
     max_len = 30
 
-    profs = read_yaml_file(input_path)[PROFESORI].keys()
+    if profs is None:
+        profs = read_yaml_file(input_path)[PROFESORI].keys()
     profs_to_initials, _ = get_profs_initials(profs)
 
-    table_str = '|           Interval           |             Luni             |             Marti            |           Miercuri           |              Joi             |            Vineri            |\n'
+    days = list(timetable)
+    intervals = list(timetable[days[0]])
+    classrooms = list(timetable[days[0]][intervals[0]])
 
-    no_classes = len(timetable['Luni']['(8, 10)'])
+    header, delim = timetable_header(days, max_len)
+    lines = [header, delim]
 
-    first_line_len = 187
-    delim = '-' * first_line_len + '\n'
-    table_str = table_str + delim
-    
-    for interval in timetable['Luni']:
-        my_interval = eval(interval)
-        s_interval = '|'
-        
-        crt_str = allign_string_with_spaces(f'{my_interval[0]} - {my_interval[1]}', max_len, 'center')
+    for interval in intervals:
+        start, end = interval if isinstance(interval, tuple) else (int(hour) for hour in interval.strip('() ').split(','))
+        interval_cell = allign_string_with_spaces(f'{start} - {end}', max_len, 'center')
 
-        s_interval += crt_str
+        for class_idx, classroom in enumerate(classrooms):
+            cells = [interval_cell if class_idx == 0 else max_len * ' ']
 
-        for class_idx in range(no_classes):
-            if class_idx != 0:
-                s_interval += f'|{30 * " "}'
-
-            for day in timetable:
-                classes = timetable[day][interval]
-                classroom = list(classes.keys())[class_idx]
-
-                s_interval += '|'
-
-                if not classes[classroom]:
-                    s_interval += allign_string_with_spaces(f'{classroom} - goala', max_len, 'left')
+            for day in days:
+                lesson = timetable[day][interval][classroom]
+                if not lesson:
+                    cells.append(allign_string_with_spaces(f'{classroom} - goala', max_len, 'left'))
                 else:
-                    prof, subject = classes[classroom]
-                    s_interval += allign_string_with_spaces(f'{subject} : ({classroom} - {profs_to_initials[prof]})', max_len, 'left')
-            
-            s_interval += '|\n'
-        table_str += s_interval + delim
+                    prof, subject = lesson
+                    cells.append(allign_string_with_spaces(f'{subject} : ({classroom} - {profs_to_initials[prof]})', max_len, 'left'))
 
-    return table_str
+            lines.append('|' + '|'.join(cells) + '|\n')
+        lines.append(delim)
+
+    return ''.join(lines)
 
 def pretty_print_timetable_aux_intervale(timetable : {(int, int) : {str : {str : (str, str)}}}, input_path : str) -> str:
     '''